@@ -2,6 +2,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db import models
+
+from core.uploads import PictureField
 from .models import UserProfile, TrainerProfile
 
 # Unregister the default User admin
@@ -54,6 +57,9 @@ class TrainerProfileAdmin(admin.ModelAdmin):
     ]
     list_filter = ['specializations', 'is_accepting_clients', 'years_experience']
     search_fields = ['user__username', 'user__first_name', 'user__last_name']
+    formfield_overrides = {
+        models.ImageField: {'form_class': PictureField},
+    }
     
     fieldsets = (
         ('Basic Info', {
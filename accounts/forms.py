@@ -2,6 +2,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+
+from core.uploads import PictureField
 from .models import UserProfile
 
 class CustomUserRegistrationForm(UserCreationForm):
@@ -90,13 +92,19 @@ class UserProfileForm(forms.ModelForm):
     """
     Profile completion form - Character customization
     """
+    profile_picture = PictureField(
+        required=False,
+        help_text="JPEG, PNG or WebP - we resize it for you"
+    )
+
     class Meta:
         model = UserProfile
         fields = [
             'phone_number', 'date_of_birth', 'gender',
             'emergency_contact_name', 'emergency_contact_phone',
             'fitness_level', 'primary_goal', 'medical_conditions',
-            'preferred_training_time', 'newsletter_subscription'
+            'preferred_training_time', 'newsletter_subscription',
+            'profile_picture'
         ]
         widgets = {
             'date_of_birth': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
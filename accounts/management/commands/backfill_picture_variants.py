@@ -0,0 +1,54 @@
+# accounts/management/commands/backfill_picture_variants.py
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.models import TrainerProfile, UserProfile
+from core.images import process_image
+
+PICTURE_MODELS = [UserProfile, TrainerProfile]
+
+
+def backfill(job):
+    try:
+        return process_image(*job)
+    finally:
+        # Each worker thread opened its own connection
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Generate resized picture variants for profile and trainer pictures that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=min(8, os.cpu_count() or 1),
+            help='Pictures resized at once (Pillow releases the GIL while it resizes and encodes)'
+        )
+        parser.add_argument('--force', action='store_true', help='Rebuild variants that already exist')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model in PICTURE_MODELS:
+            rows = model.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            for pk, name, variants in rows.values_list('pk', 'profile_picture', 'picture_variants').iterator():
+                if options['force'] or (variants or {}).get('source') != name:
+                    jobs.append((model._meta.label, pk, 'profile_picture', 'picture_variants'))
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='backfill') as executor:
+            futures = {executor.submit(backfill, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as error:
+                    failed += 1
+                    model_label, pk = futures[future][:2]
+                    self.stderr.write(f'{model_label} {pk}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(f'Built variants for {done:,} pictures ({failed:,} failed)'))
+        if failed:
+            self.stdout.write(self.style.WARNING('Failed pictures keep showing the placeholder - re-upload or fix and run again'))
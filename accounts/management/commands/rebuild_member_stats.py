@@ -0,0 +1,46 @@
+# accounts/management/commands/rebuild_member_stats.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from accounts.models import MemberStats
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every member\'s dashboard stats rollup from their bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rollup rows written per bulk insert'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Completed sessions per member per day, streamed in member order
+        rows = Booking.objects.filter(status='completed').values(
+            'user_id', 'date'
+        ).annotate(sessions=Count('id')).order_by('user_id', 'date')
+
+        written = 0
+        with transaction.atomic():
+            MemberStats.objects.all().delete()
+
+            batch = []
+            current = None
+            for row in rows.iterator(chunk_size=10000):
+                if current is None or current.user_id != row['user_id']:
+                    current = MemberStats(user_id=row['user_id'])
+                    batch.append(current)
+                    if len(batch) > batch_size:
+                        MemberStats.objects.bulk_create(batch[:-1])
+                        written += len(batch) - 1
+                        batch = batch[-1:]
+                current.record_session(row['date'], row['sessions'])
+
+            MemberStats.objects.bulk_create(batch)
+            written += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {written:,} members'))
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
@@ -53,6 +55,8 @@ class UserProfile(models.Model):
     
     # Profile Settings
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Resized copies of profile_picture, filled in by a background job (core/images.py)
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(max_length=500, blank=True)
     
     # Timestamps
@@ -100,8 +104,82 @@ class TrainerProfile(models.Model):
     # Profile
     bio = models.TextField(max_length=1000)
     profile_picture = models.ImageField(upload_to='trainers/', blank=True, null=True)
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"Trainer: {self.user.get_full_name()}"
\ No newline at end of file
+        return f"Trainer: {self.user.get_full_name()}"
+
+
+class MemberStats(models.Model):
+    """
+    Training rollup per member - the player's stat block.
+    Kept current as bookings change status, so the dashboard reads one row
+    instead of recounting the whole booking history on every visit.
+    """
+    # Weekly buckets only feed the 12-week consistency score; older ones are dropped
+    WEEKS_KEPT = 26
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='member_stats')
+    
+    total_sessions = models.IntegerField(default=0)
+    # Completed sessions per month ('2025-09') and per week (Monday, '2025-09-08')
+    monthly_sessions = models.JSONField(default=dict)
+    weekly_sessions = models.JSONField(default=dict)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()}'s Stats"
+    
+    @staticmethod
+    def month_key(day):
+        return day.strftime('%Y-%m')
+    
+    @staticmethod
+    def week_key(day):
+        return (day - timedelta(days=day.weekday())).isoformat()
+    
+    def record_session(self, day, count=1):
+        """Add (or with a negative count, remove) completed sessions on `day`."""
+        self.total_sessions = max(self.total_sessions + count, 0)
+        for buckets, key in ((self.monthly_sessions, self.month_key(day)),
+                             (self.weekly_sessions, self.week_key(day))):
+            value = buckets.get(key, 0) + count
+            if value > 0:
+                buckets[key] = value
+            else:
+                buckets.pop(key, None)
+        
+        # Trim weekly buckets that can no longer affect the dashboard
+        if len(self.weekly_sessions) > self.WEEKS_KEPT:
+            for key in sorted(self.weekly_sessions)[:-self.WEEKS_KEPT]:
+                del self.weekly_sessions[key]
+    
+    def sessions_in_month(self, day):
+        return self.monthly_sessions.get(self.month_key(day), 0)
+    
+    def active_weeks_since(self, day):
+        """Distinct weeks with at least one completed session, from `day` on."""
+        since = self.week_key(day)
+        return sum(1 for key, count in self.weekly_sessions.items() if key >= since and count > 0)
+    
+    @classmethod
+    def rebuild_for(cls, user):
+        """Recount one member's stats from their bookings."""
+        from bookings.models import Booking
+        
+        stats = cls(user=user)
+        for day in Booking.objects.filter(user=user, status='completed').values_list('date', flat=True):
+            stats.record_session(day)
+        
+        stats, _ = cls.objects.update_or_create(
+            user=user,
+            defaults={
+                'total_sessions': stats.total_sessions,
+                'monthly_sessions': stats.monthly_sessions,
+                'weekly_sessions': stats.weekly_sessions,
+            }
+        )
+        return stats
@@ -0,0 +1,76 @@
+# accounts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from core.images import process_image
+from core.tasks import run_in_background
+
+from .models import MemberStats, TrainerProfile, UserProfile
+
+
+def completed_on(booking):
+    """The date a booking counts as a completed session, or None."""
+    return booking.date if booking.status == 'completed' else None
+
+
+@receiver(post_init, sender='bookings.Booking')
+def remember_completion(sender, instance, **kwargs):
+    instance._completed_on = completed_on(instance) if instance.pk else None
+
+
+def apply_completion_change(booking, old, new, rebuild_missing=True):
+    """Move a member's rollup from the booking's old completion date to its new one."""
+    if old == new:
+        return
+    
+    with transaction.atomic():
+        stats = MemberStats.objects.select_for_update().filter(user_id=booking.user_id).first()
+        if stats is None:
+            # First change we have seen for this member - count from scratch,
+            # which already includes this booking
+            if rebuild_missing:
+                MemberStats.rebuild_for(booking.user)
+            return
+        
+        if old:
+            stats.record_session(old, -1)
+        if new:
+            stats.record_session(new, 1)
+        stats.save()
+
+
+@receiver(post_save, sender='bookings.Booking')
+def update_member_stats_on_save(sender, instance, **kwargs):
+    new = completed_on(instance)
+    apply_completion_change(instance, instance._completed_on, new)
+    instance._completed_on = new
+
+
+@receiver(post_delete, sender='bookings.Booking')
+def update_member_stats_on_delete(sender, instance, **kwargs):
+    # Nothing to rebuild if the member (and their stats) are being deleted too
+    apply_completion_change(instance, instance._completed_on, None, rebuild_missing=False)
+    instance._completed_on = None
+
+
+def picture_name(instance):
+    # Straight from __dict__ - never loads a deferred field
+    value = instance.__dict__.get('profile_picture')
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=UserProfile)
+@receiver(post_init, sender=TrainerProfile)
+def remember_picture(sender, instance, **kwargs):
+    instance._picture_name = picture_name(instance) if instance.pk else ''
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=TrainerProfile)
+def queue_picture_variants(sender, instance, **kwargs):
+    """New or removed picture - resize it (or drop the old variants) off the request thread."""
+    name = picture_name(instance)
+    if name != instance._picture_name:
+        run_in_background(process_image, sender._meta.label, instance.pk, 'profile_picture', 'picture_variants')
+    instance._picture_name = name
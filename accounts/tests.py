@@ -1,3 +1,209 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import time, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from bookings.models import Service, Booking
+from .models import MemberStats, TrainerProfile, UserProfile
+
+
+class MemberStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = Service.objects.create(
+            name='Personal Training Session',
+            service_type='personal_training',
+            description='1-on-1 training',
+            price=150,
+        )
+        self.today = timezone.now().date()
+
+    def book(self, days_ago, status='confirmed'):
+        return Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            date=self.today - timedelta(days=days_ago),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            status=status,
+        )
+
+    def stats(self):
+        return MemberStats.objects.get(user=self.user)
+
+    def test_rollup_follows_status_changes(self):
+        booking = self.book(0)
+        self.book(0, status='completed')
+        self.assertEqual(self.stats().total_sessions, 1)
+
+        booking.status = 'completed'
+        booking.save()
+        stats = self.stats()
+        self.assertEqual(stats.total_sessions, 2)
+        self.assertEqual(stats.sessions_in_month(self.today), 2)
+        self.assertEqual(stats.active_weeks_since(self.today - timedelta(weeks=12)), 1)
+
+        booking.status = 'no_show'
+        booking.save()
+        self.assertEqual(self.stats().total_sessions, 1)
+
+        Booking.objects.get(user=self.user, status='completed').delete()
+        self.assertEqual(self.stats().total_sessions, 0)
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        for days_ago in (1, 8, 15, 40, 120):
+            self.book(days_ago, status='completed')
+        self.book(2, status='cancelled')
+        incremental = self.stats()
+
+        call_command('rebuild_member_stats', stdout=StringIO())
+        rebuilt = self.stats()
+
+        self.assertEqual(rebuilt.total_sessions, 5)
+        self.assertEqual(rebuilt.monthly_sessions, incremental.monthly_sessions)
+        self.assertEqual(rebuilt.weekly_sessions, incremental.weekly_sessions)
+
+    def test_dashboard_reads_the_rollup(self):
+        self.book(0, status='completed')
+        self.client.login(username='member', password='pw')
+
+        response = self.client.get('/accounts/dashboard/')
+
+        self.assertEqual(response.context['total_sessions'], 1)
+        self.assertEqual(response.context['sessions_this_month'], 1)
+
+    def test_dashboard_query_count(self):
+        for days_ago in (-3, -2, -1, 1, 2):
+            self.book(days_ago, status='confirmed' if days_ago < 0 else 'completed')
+        self.client.login(username='member', password='pw')
+
+        # session, user, membership, stats row, upcoming, recent, profile
+        with self.assertNumQueries(7):
+            self.client.get('/accounts/dashboard/')
+
+
+def photo(width=2000, height=1500, orientation=None):
+    """A JPEG the way a phone saves one - EXIF with a location and camera."""
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'           # Make
+    exif[0x8825] = {1: 'S', 2: (26.0, 12.0, 0.0)}  # GPSInfo
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(buffer, 'JPEG', exif=exif, quality=95)
+    return buffer.getvalue()
+
+
+class PictureMediaMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_TASKS_EAGER=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def open_variant(self, variants, variant, extension):
+        return Image.open(default_storage.open(variants[variant][extension]))
+
+
+class ProfilePictureTests(PictureMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='member', password='pw', first_name='Thandi')
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.client.login(username='member', password='pw')
+
+    def upload(self, data, name='me.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/accounts/profile/', {
+                'fitness_level': 'beginner',
+                'profile_picture': SimpleUploadedFile(name, data, content_type='image/jpeg'),
+            })
+
+    def test_upload_builds_variants_without_exif(self):
+        # Orientation 6: the camera was held sideways - upright it is portrait
+        response = self.upload(photo(orientation=6))
+        self.assertRedirects(response, '/accounts/profile/')
+
+        self.profile.refresh_from_db()
+        variants = self.profile.picture_variants
+        self.assertEqual(variants['source'], self.profile.profile_picture.name)
+        self.assertEqual(
+            {name: (variants[name]['width'], variants[name]['height']) for name in ['avatar', 'card', 'full']},
+            {'avatar': (96, 128), 'card': (360, 480), 'full': (960, 1280)},
+        )
+        for extension in ['webp', 'jpeg']:
+            with self.open_variant(variants, 'card', extension) as image:
+                self.assertEqual(image.size, (360, 480))
+                self.assertEqual(dict(image.getexif()), {})
+
+    def test_new_picture_replaces_old_variants(self):
+        self.upload(photo())
+        self.profile.refresh_from_db()
+        old = self.profile.picture_variants
+
+        self.upload(photo(800, 800), name='new.jpg')
+        self.profile.refresh_from_db()
+
+        self.assertFalse(default_storage.exists(old['avatar']['webp']))
+        self.assertEqual(self.profile.picture_variants['full']['width'], 800)
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=20 * 1024)
+    def test_oversized_upload_rejected(self):
+        response = self.upload(photo() + b'\0' * 100 * 1024)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'profile_picture', 'Pictures must be 20.0\xa0KB or smaller.')
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.profile_picture)
+
+    def test_template_picks_smallest_variant_that_fits(self):
+        self.upload(photo(1200, 1200))
+        self.profile.refresh_from_db()
+        variants = self.profile.picture_variants
+        template = Template('{% load pictures %}{% picture profile size %}')
+
+        html = template.render(Context({'profile': self.profile, 'size': 64}))
+        self.assertIn(f'src="/media/{variants["avatar"]["jpeg"]}"', html)
+        self.assertIn(f'/media/{variants["full"]["webp"]} 1200w', html)
+        self.assertNotIn(self.profile.profile_picture.name, html)
+
+        html = template.render(Context({'profile': self.profile, 'size': 300}))
+        self.assertIn(f'src="/media/{variants["card"]["jpeg"]}"', html)
+
+        html = template.render(Context({'profile': UserProfile(), 'size': 64}))
+        self.assertIn('fa-user-circle', html)
+
+
+class BackfillPictureVariantsTests(PictureMediaMixin, TransactionTestCase):
+    def test_backfills_in_parallel_once(self):
+        for number in range(3):
+            user = User.objects.create_user(username=f'trainer{number}')
+            trainer = TrainerProfile.objects.create(
+                user=user, certifications='ACE', specializations='mma', hourly_rate=300, bio='Coach',
+            )
+            # Uploaded before variants existed - bypass the save signal
+            name = default_storage.save(f'trainers/coach{number}.jpg', ContentFile(photo(640, 480)))
+            TrainerProfile.objects.filter(pk=trainer.pk).update(profile_picture=name)
+
+        out = StringIO()
+        call_command('backfill_picture_variants', workers=3, stdout=out)
+        self.assertIn('Built variants for 3 pictures (0 failed)', out.getvalue())
+        for trainer in TrainerProfile.objects.all():
+            self.assertEqual(trainer.picture_variants['card']['width'], 480)
+
+        out = StringIO()
+        call_command('backfill_picture_variants', stdout=out)
+        self.assertIn('Built variants for 0 pictures', out.getvalue())
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 from django.db.models import Count
 
 from .forms import CustomUserRegistrationForm, UserProfileForm
-from .models import UserProfile
+from .models import UserProfile, MemberStats
 
 def register_view(request):
     """
@@ -75,38 +75,37 @@ def dashboard_view(request):
     }
     
     # Get user's membership info
-    try:
-        membership = request.user.membership
-        context['membership'] = membership
-    except:
-        context['membership'] = None
+    context['membership'] = request.membership or None
     
     # Get booking statistics
     try:
         from bookings.models import Booking
         
         # Get user's bookings
-        user_bookings = Booking.objects.filter(user=request.user)
+        user_bookings = Booking.objects.with_related().filter(user=request.user)
+        today = timezone.now().date()
+        
+        # Session counts come from the rollup row, not the booking history
+        try:
+            stats = request.user.member_stats
+        except MemberStats.DoesNotExist:
+            stats = MemberStats.rebuild_for(request.user)
+        context['member_stats'] = stats
         
-        # Next upcoming booking
-        next_booking = user_bookings.filter(
-            date__gte=timezone.now().date(),
+        # Upcoming sessions (next 3) - the first one is the next booking
+        upcoming_bookings = list(user_bookings.filter(
+            date__gte=today,
             status__in=['pending', 'confirmed']
-        ).order_by('date', 'start_time').first()
-        context['next_booking'] = next_booking
+        ).order_by('date', 'start_time')[:3])
+        context['upcoming_bookings'] = upcoming_bookings
+        context['next_booking'] = upcoming_bookings[0] if upcoming_bookings else None
         
         # Sessions this month
-        current_month = timezone.now().month
-        current_year = timezone.now().year
-        sessions_this_month = user_bookings.filter(
-            date__month=current_month,
-            date__year=current_year,
-            status='completed'
-        ).count()
+        sessions_this_month = stats.sessions_in_month(today)
         context['sessions_this_month'] = sessions_this_month
         
         # Total completed sessions
-        total_sessions = user_bookings.filter(status='completed').count()
+        total_sessions = stats.total_sessions
         context['total_sessions'] = total_sessions
         
         # Progress calculation
@@ -127,13 +126,6 @@ def dashboard_view(request):
         recent_bookings = user_bookings.order_by('-date', '-start_time')[:5]
         context['recent_bookings'] = recent_bookings
         
-        # Upcoming sessions (next 3)
-        upcoming_bookings = user_bookings.filter(
-            date__gte=timezone.now().date(),
-            status__in=['pending', 'confirmed']
-        ).order_by('date', 'start_time')[:3]
-        context['upcoming_bookings'] = upcoming_bookings
-        
     except ImportError:
         # Bookings app not available, use placeholder data
         context['next_booking'] = None
@@ -167,15 +159,12 @@ def dashboard_view(request):
             context['monthly_progress'] = monthly_progress
             
             # Goal progress based on consistency
-            try:
-                weeks_active = user_bookings.filter(
-                    date__gte=timezone.now().date() - timedelta(weeks=12),
-                    status='completed'
-                ).values('date__week').distinct().count()
-                
-                goal_progress = min(int((weeks_active / 12) * 100), 100)
-                context['goal_progress'] = goal_progress
-            except:
+            if 'member_stats' in context:
+                weeks_active = context['member_stats'].active_weeks_since(
+                    timezone.now().date() - timedelta(weeks=12)
+                )
+                context['goal_progress'] = min(int((weeks_active / 12) * 100), 100)
+            else:
                 context['goal_progress'] = min(context['sessions_this_month'] * 10, 100)
         else:
             context['monthly_target'] = 8
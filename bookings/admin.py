@@ -26,6 +26,9 @@ class ServiceAdmin(admin.ModelAdmin):
         ('Duration & Pricing', {
             'fields': ('duration_minutes', 'price', 'max_participants')
         }),
+        ('Opening Hours', {
+            'fields': ('opens_at', 'closes_at')
+        }),
         ('Requirements', {
             'fields': ('requires_membership', 'minimum_fitness_level')
         }),
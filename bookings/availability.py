@@ -0,0 +1,100 @@
+# bookings/availability.py
+"""
+Slot availability engine - the raid planner's scouting report.
+
+Loads booked participants for a whole date window from the shared
+CapacityIndex (one Slot range scan), and hands out open slots lazily
+so callers can stop as soon as they have enough. Each service offers
+the slots its own opening hours allow.
+"""
+from datetime import timedelta
+
+from .capacity import CapacityIndex
+from .models import DEFAULT_OPENS_AT, DEFAULT_CLOSES_AT, opening_slot_times
+
+
+def slot_times(service=None):
+    """
+    Start times for every bookable slot in a day - the service's own, or
+    the default opening hours for an hour-long session.
+    """
+    if service is not None:
+        return service.slot_times()
+    return opening_slot_times(DEFAULT_OPENS_AT, DEFAULT_CLOSES_AT, 60)
+
+
+class AvailabilityGrid:
+    """
+    Per-service/day/hour capacity grid for a date window.
+    """
+
+    def __init__(self, services, start_date, days=30):
+        self.services = list(services)
+        self.start_date = start_date
+        self.days = days
+        self.service_times = {service.pk: set(service.slot_times()) for service in self.services}
+        # Every start time any of the services offers, in order
+        self.times = sorted(set().union(*self.service_times.values()))
+        self.end_date = start_date + timedelta(days=days - 1)
+        self.capacity = CapacityIndex.build(self.services, self.start_date, self.end_date)
+
+    def dates(self):
+        return [self.start_date + timedelta(days=i) for i in range(self.days)]
+
+    def offers(self, service, start_time):
+        return start_time in self.service_times[service.pk]
+
+    def spots_left(self, service, date, start_time):
+        if not self.offers(service, start_time):
+            return 0
+        return self.capacity.spots_left(service, date, start_time)
+
+    def columns(self, today=None):
+        """
+        Compact columnar form of the grid for the JSON API:
+        spots[service][day][hour] -> spots left, with the axes listed once.
+        Days before `today` and hours the service is closed report no spots.
+        """
+        dates = self.dates()
+        spots = []
+        for service in self.services:
+            spots.append([
+                [
+                    0 if today and current_date < today
+                    else self.spots_left(service, current_date, slot_time)
+                    for slot_time in self.times
+                ]
+                for current_date in dates
+            ])
+        return {
+            'services': [
+                {'id': service.pk, 'name': service.name, 'max_participants': service.max_participants}
+                for service in self.services
+            ],
+            'days': [current_date.isoformat() for current_date in dates],
+            'hours': [slot_time.strftime('%H:%M') for slot_time in self.times],
+            'spots': spots,
+        }
+
+    def __iter__(self):
+        """Yield open slots in calendar order: day, then hour, then service."""
+        for current_date in self.dates():
+            for slot_time in self.times:
+                for service in self.services:
+                    spots_left = self.spots_left(service, current_date, slot_time)
+                    if spots_left > 0:
+                        yield {
+                            'date': current_date,
+                            'time': slot_time,
+                            'service': service,
+                            'spots_left': spots_left,
+                        }
+
+
+def iter_available_slots(services, start_date, days=30):
+    """
+    Lazily yield open slots for the window starting at start_date.
+
+    The capacity query only runs once the caller starts iterating.
+    """
+    yield from AvailabilityGrid(services, start_date, days=days)
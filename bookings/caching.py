@@ -0,0 +1,127 @@
+# bookings/caching.py
+"""
+Availability cache for the available-times API, keyed by (service, date).
+
+Entries hold booked participants per slot rather than spots left, so a
+change to a service's max_participants needs no invalidation. Booking
+saves and deletes invalidate the (service, date) they touch.
+
+Invalidation bumps a per-(service, date) generation number once the
+writing transaction commits. Readers look the generation up before
+querying and store their answer under it, so a reader racing a booking
+can only ever cache under a generation that is already retired.
+
+Generations start from a random number rather than 0. Caches cull old
+keys (LocMemCache's MAX_ENTRIES, for one), and a generation key that was
+evicted and came back as 0 would line up with the entries stored before
+its first bump; a fresh random start can't.
+
+Generations live in the default cache, so invalidation reaches exactly
+the workers that share it. With a per-process cache (the LocMemCache
+default) a booking retires only its own worker's entry; the others serve
+theirs until AVAILABILITY_CACHE_TIMEOUT runs out, which is why that
+timeout defaults to 30 seconds unless CACHE_BACKEND is shared. A stale
+answer can offer a full slot, never overbook it - reserve() checks the
+slot row.
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .capacity import CapacityIndex
+
+KEY_PREFIX = 'availability'
+COUNTERS = ('hits', 'misses')
+
+
+def _timeout():
+    return getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 300)
+
+
+def generation_key(service_id, date):
+    return f'{KEY_PREFIX}:gen:{service_id}:{date.isoformat()}'
+
+
+def entry_key(service_id, date, generation):
+    return f'{KEY_PREFIX}:{service_id}:{date.isoformat()}:{generation}'
+
+
+def new_generation():
+    return secrets.randbits(48)
+
+
+def counter_key(name):
+    return f'{KEY_PREFIX}:stats:{name}'
+
+
+async def aget_capacity(service, date):
+    """
+    CapacityIndex for one service on one day, served from the cache when
+    nothing has been booked, cancelled or moved there since it was stored.
+    """
+    gen_key = generation_key(service.pk, date)
+    generation = await cache.aget(gen_key)
+    if generation is None:
+        seeded = new_generation()
+        # Another reader may seed it first - then use theirs
+        generation = seeded if await cache.aadd(gen_key, seeded, timeout=None) else await cache.aget(gen_key, seeded)
+    key = entry_key(service.pk, date, generation)
+
+    booked = await cache.aget(key)
+    if booked is not None:
+        await _acount('hits')
+        return CapacityIndex([service.pk], date, date, booked=booked)
+
+    await _acount('misses')
+    capacity = await CapacityIndex.abuild([service], date)
+    await cache.aset(key, capacity.slot_totals(), _timeout())
+    return capacity
+
+
+def invalidate(service_id, date):
+    """Retire the cached answer for (service, date) once the current transaction commits."""
+    key = generation_key(service_id, date)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_footprints(old, new):
+    """Invalidate every (service, date) a booking left or entered."""
+    days = set()
+    for footprint in (old, new):
+        if footprint:
+            (service_id, date, _), _ = footprint
+            days.add((service_id, date))
+    for service_id, date in days:
+        invalidate(service_id, date)
+
+
+# Hit/miss counters
+
+async def _acount(name):
+    key = counter_key(name)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def cache_stats():
+    counts = cache.get_many([counter_key(name) for name in COUNTERS])
+    stats = {name: counts.get(counter_key(name), 0) for name in COUNTERS}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    cache.delete_many([counter_key(name) for name in COUNTERS])
@@ -0,0 +1,154 @@
+# bookings/capacity.py
+"""
+Participant-weighted capacity index - the single source of truth for
+"how many spots are left in this slot?".
+
+Every capacity check (calendar, available-times API, booking form and
+create view) reads from a CapacityIndex loaded with one range scan over
+the materialised Slot rows. Live indexes are kept in step with Booking
+saves and deletes through the signal handlers in bookings.signals.
+"""
+import weakref
+
+from .models import Booking, Slot
+
+
+class CapacityIndex:
+    """
+    (service, date, start_time) -> booked participants for a date window.
+    """
+
+    # Indexes still in use somewhere in this process; updated on booking changes
+    _live = weakref.WeakSet()
+
+    def __init__(self, service_ids, start_date, end_date, booked=None, exclude=None):
+        self.service_ids = set(service_ids)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.exclude = exclude
+        self._booked = dict(booked or {})
+        CapacityIndex._live.add(self)
+
+    @classmethod
+    def build(cls, services, start_date, end_date=None, exclude=None):
+        """
+        Load booked participants for every slot of `services` between
+        start_date and end_date (inclusive) with a single Slot range scan.
+
+        `exclude` is a booking pk to leave out - used when editing a booking
+        so it does not count against itself (one extra query).
+        """
+        end_date = end_date or start_date
+        service_ids = cls._service_ids(services)
+        rows = cls._slot_rows(service_ids, start_date, end_date)
+        held = cls._held_rows(exclude) if exclude else []
+        return cls._from_rows(service_ids, start_date, end_date, rows, held, exclude)
+
+    @classmethod
+    async def abuild(cls, services, start_date, end_date=None, exclude=None):
+        """
+        Async twin of build() for async views - same range scan, fetched
+        through the async ORM.
+        """
+        end_date = end_date or start_date
+        service_ids = cls._service_ids(services)
+        rows = [row async for row in cls._slot_rows(service_ids, start_date, end_date)]
+        held = [row async for row in cls._held_rows(exclude)] if exclude else []
+        return cls._from_rows(service_ids, start_date, end_date, rows, held, exclude)
+
+    @staticmethod
+    def _service_ids(services):
+        return [
+            service if isinstance(service, int) else service.pk
+            for service in services
+        ]
+
+    @staticmethod
+    def _slot_rows(service_ids, start_date, end_date):
+        return Slot.objects.filter(
+            service_id__in=service_ids,
+            date__range=(start_date, end_date),
+            booked__gt=0,
+        ).values_list('service_id', 'date', 'start_time', 'booked')
+
+    @staticmethod
+    def _held_rows(booking_id):
+        """The spots an excluded booking holds, to take back off its slot."""
+        return Booking.objects.filter(
+            pk=booking_id, status__in=Booking.ACTIVE_STATUSES
+        ).values_list('service_id', 'date', 'start_time', 'participants')
+
+    @classmethod
+    def _from_rows(cls, service_ids, start_date, end_date, rows, held, exclude):
+        booked = {
+            (service_id, date, start_time): count
+            for service_id, date, start_time, count in rows
+        }
+        index = cls(service_ids, start_date, end_date, booked=booked, exclude=exclude)
+        for service_id, date, start_time, participants in held:
+            index.adjust((service_id, date, start_time), -participants)
+        return index
+
+    # Lookups
+
+    def booked(self, service, date, start_time):
+        return self._booked.get((service.pk, date, start_time), 0)
+
+    def spots_left(self, service, date, start_time):
+        return max(service.max_participants - self.booked(service, date, start_time), 0)
+
+    def has_room(self, service, date, start_time, participants=1):
+        return self.booked(service, date, start_time) + participants <= service.max_participants
+
+    def slot_totals(self):
+        """Booked participants per slot key - the cacheable part of the index."""
+        return dict(self._booked)
+
+    # Maintenance
+
+    def covers(self, key):
+        service_id, date, start_time = key
+        return (
+            service_id in self.service_ids
+            and self.start_date <= date <= self.end_date
+        )
+
+    def adjust(self, key, participants):
+        """Apply a change of `participants` to one slot, if this index covers it."""
+        if not self.covers(key):
+            return
+        booked = self._booked.get(key, 0) + participants
+        if booked > 0:
+            self._booked[key] = booked
+        else:
+            self._booked.pop(key, None)
+
+    @classmethod
+    def booking_changed(cls, booking, old, new):
+        """
+        Push a booking's capacity change to every live index.
+
+        `old` and `new` are (key, participants) pairs, or None when the
+        booking did not hold a spot before/after the change.
+        """
+        if old == new:
+            return
+        for index in list(cls._live):
+            if index.exclude and index.exclude == booking.pk:
+                continue
+            if old:
+                index.adjust(old[0], -old[1])
+            if new:
+                index.adjust(new[0], new[1])
+
+
+def capacity_footprint(booking):
+    """
+    The (slot key, participants) a booking currently occupies, or None if it
+    does not hold a spot (cancelled, completed, no-show or not yet scheduled).
+    """
+    if booking.status not in Booking.ACTIVE_STATUSES:
+        return None
+    if not (booking.service_id and booking.date and booking.start_time):
+        return None
+    return (booking.service_id, booking.date, booking.start_time), booking.participants or 0
@@ -1,16 +1,64 @@
 # bookings/forms.py
 from django import forms
 from django.core.exceptions import ValidationError
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta
+from functools import lru_cache
 from django.utils import timezone
 
-from .models import Booking, Service
-from accounts.models import TrainerProfile
+from .models import Booking, DEFAULT_OPENS_AT, DEFAULT_CLOSES_AT, opening_slot_times
+from .capacity import CapacityIndex
+from .intervals import session_end
+from memberships.models import get_membership
+from core.catalog import CatalogChoiceField, accepting_trainers, active_services
+
+MAX_ADVANCE_DAYS = 60
+
+
+@lru_cache(maxsize=None)
+def time_choices(opens_at=DEFAULT_OPENS_AT, closes_at=DEFAULT_CLOSES_AT, duration_minutes=60):
+    """
+    Choices for a start-time select - built once per set of opening hours
+    and shared by every form after that.
+    """
+    return (('', 'Select a time...'),) + tuple(
+        (time_obj.strftime('%H:%M'), time_obj.strftime('%I:%M %p'))
+        for time_obj in opening_slot_times(opens_at, closes_at, duration_minutes)
+    )
+
+
+def set_date_bounds(field):
+    """Limit a date picker to today..MAX_ADVANCE_DAYS ahead - per request, never at import."""
+    today = timezone.now().date()
+    field.widget.attrs['min'] = today.isoformat()
+    field.widget.attrs['max'] = (today + timedelta(days=MAX_ADVANCE_DAYS)).isoformat()
+
 
 class BookingForm(forms.ModelForm):
     """
     Create and edit bookings - like character creation form
     """
+    # Active services and trainers come from the worker's catalog snapshots
+    service = CatalogChoiceField(
+        active_services,
+        label="Select Service",
+        help_text="Choose the type of training session",
+        widget=forms.Select(attrs={
+            'class': 'form-select',
+            'id': 'id_service',
+            'onchange': 'updateAvailableTimes()'
+        }),
+    )
+    
+    trainer = CatalogChoiceField(
+        accepting_trainers,
+        required=False,
+        label="Preferred Trainer (Optional)",
+        help_text="Leave blank for automatic assignment",
+        widget=forms.Select(attrs={
+            'class': 'form-select',
+            'id': 'id_trainer'
+        }),
+    )
     
     class Meta:
         model = Booking
@@ -24,23 +72,15 @@ class BookingForm(forms.ModelForm):
         ]
         
         widgets = {
-            'service': forms.Select(attrs={
-                'class': 'form-select',
-                'id': 'id_service',
-                'onchange': 'updateAvailableTimes()'
-            }),
-            'trainer': forms.Select(attrs={
-                'class': 'form-select',
-                'id': 'id_trainer'
-            }),
+            # min/max are set per form - see set_date_bounds()
             'date': forms.DateInput(attrs={
                 'class': 'form-control',
                 'type': 'date',
                 'id': 'id_date',
                 'onchange': 'updateAvailableTimes()',
-                'min': timezone.now().date().isoformat()
             }),
-            'start_time': forms.Select(attrs={
+            # Default opening hours; the page narrows them per service
+            'start_time': forms.Select(choices=time_choices(), attrs={
                 'class': 'form-select',
                 'id': 'id_start_time'
             }),
@@ -56,49 +96,32 @@ class BookingForm(forms.ModelForm):
                 'placeholder': 'Any special requests or notes for your trainer...'
             }),
         }
+        
+        labels = {
+            'date': "Preferred Date",
+            'start_time': "Preferred Time",
+            'participants': "Number of Participants",
+        }
+        
+        help_texts = {
+            'date': "Choose your training date",
+            'start_time': "Available times will update based on your date selection",
+            'participants': "How many people will attend? (Including yourself)",
+        }
     
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Filter active services only
-        self.fields['service'].queryset = Service.objects.filter(is_active=True)
-        
-        # Filter available trainers
-        self.fields['trainer'].queryset = TrainerProfile.objects.filter(
-            is_accepting_clients=True
-        )
-        self.fields['trainer'].required = False
-        
-        # Set up time choices (9 AM to 8 PM)
-        time_choices = [('', 'Select a time...')]
-        for hour in range(9, 21):  # 9 AM to 8 PM
-            time_obj = time(hour, 0)
-            time_choices.append((
-                time_obj.strftime('%H:%M'),
-                time_obj.strftime('%I:%M %p')
-            ))
-        
-        self.fields['start_time'].widget.choices = time_choices
-        
-        # Update field labels and help texts
-        self.fields['service'].label = "Select Service"
-        self.fields['service'].help_text = "Choose the type of training session"
-        
-        self.fields['trainer'].label = "Preferred Trainer (Optional)"
-        self.fields['trainer'].help_text = "Leave blank for automatic assignment"
-        
-        self.fields['date'].label = "Preferred Date"
-        self.fields['date'].help_text = "Choose your training date"
-        
-        self.fields['start_time'].label = "Preferred Time"
-        self.fields['start_time'].help_text = "Available times will update based on your date selection"
+        # Only the parts that change from day to day or booking to booking
+        set_date_bounds(self.fields['date'])
         
-        self.fields['participants'].label = "Number of Participants"
-        self.fields['participants'].help_text = "How many people will attend? (Including yourself)"
-        
-        # If editing existing booking, set current values
+        # If editing existing booking, offer its service's times and set current values
         if self.instance and self.instance.pk:
+            service = self.instance.service
+            self.fields['start_time'].widget.choices = time_choices(
+                service.opens_at, service.closes_at, service.duration_minutes
+            )
             self.fields['start_time'].widget.attrs['data-current-time'] = self.instance.start_time.strftime('%H:%M')
     
     def clean_date(self):
@@ -112,10 +135,10 @@ class BookingForm(forms.ModelForm):
         if date < timezone.now().date():
             raise ValidationError("Cannot book sessions in the past.")
         
-        # Don't allow booking more than 60 days in advance
-        max_advance_date = timezone.now().date() + timedelta(days=60)
+        # Don't allow booking more than MAX_ADVANCE_DAYS in advance
+        max_advance_date = timezone.now().date() + timedelta(days=MAX_ADVANCE_DAYS)
         if date > max_advance_date:
-            raise ValidationError("Cannot book more than 60 days in advance.")
+            raise ValidationError(f"Cannot book more than {MAX_ADVANCE_DAYS} days in advance.")
         
         return date
     
@@ -133,13 +156,7 @@ class BookingForm(forms.ModelForm):
             except ValueError:
                 raise ValidationError("Invalid time format.")
         
-        # Check if time is within business hours (9 AM to 8 PM)
-        business_start = time(9, 0)
-        business_end = time(20, 0)
-        
-        if start_time < business_start or start_time >= business_end:
-            raise ValidationError("Sessions are only available between 9:00 AM and 8:00 PM.")
-        
+        # Opening hours depend on the service - checked in clean()
         return start_time
     
     def clean_participants(self):
@@ -170,47 +187,43 @@ class BookingForm(forms.ModelForm):
         if not all([service, date, start_time]):
             return cleaned_data
         
+        end_time = session_end(date, start_time, service.duration_minutes)
+        self.instance.end_time = end_time  # model clean() compares it with start_time
+        
         # Check if user has membership requirement
         if service.requires_membership and self.user:
-            if not hasattr(self.user, 'membership') or not self.user.membership.is_active:
+            membership = get_membership(self.user)
+            if not membership or not membership.is_active:
                 raise ValidationError(
                     f"{service.name} requires an active membership. Please purchase a membership first."
                 )
         
-        # Check for time conflicts (only for new bookings or when time changes)
-        if self.user:
-            existing_bookings = Booking.objects.filter(
-                user=self.user,
-                date=date,
-                start_time=start_time,
-                status__in=['pending', 'confirmed']
+        # Check the service runs a session at this time
+        if start_time not in service.slot_times():
+            raise ValidationError(
+                f"{service.name} sessions run between {service.opens_at.strftime('%I:%M %p')} "
+                f"and {service.closes_at.strftime('%I:%M %p')}. Please pick one of its session times."
             )
-            
-            # Exclude current booking if editing
-            if self.instance and self.instance.pk:
-                existing_bookings = existing_bookings.exclude(pk=self.instance.pk)
-            
-            if existing_bookings.exists():
-                raise ValidationError("You already have a booking at this time.")
         
-        # Check service capacity
-        existing_bookings_count = Booking.objects.filter(
-            service=service,
-            date=date,
-            start_time=start_time,
-            status__in=['pending', 'confirmed']
-        )
+        # Check for time conflicts - anything overlapping the whole session,
+        # not just bookings that start at the same time
+        conflicts = Booking.objects.overlapping(date, start_time, end_time)
         
         # Exclude current booking if editing
         if self.instance and self.instance.pk:
-            existing_bookings_count = existing_bookings_count.exclude(pk=self.instance.pk)
+            conflicts = conflicts.exclude(pk=self.instance.pk)
         
-        current_participants = sum(
-            booking.participants for booking in existing_bookings_count
+        if self.user and conflicts.filter(user=self.user).exists():
+            raise ValidationError("You already have a booking at this time.")
+        
+        # Check service capacity
+        self.capacity_index = CapacityIndex.build(
+            [service], date,
+            exclude=self.instance.pk if self.instance else None
         )
         
-        if current_participants + participants > service.max_participants:
-            available_spots = service.max_participants - current_participants
+        if not self.capacity_index.has_room(service, date, start_time, participants or 1):
+            available_spots = self.capacity_index.spots_left(service, date, start_time)
             if available_spots <= 0:
                 raise ValidationError("This time slot is fully booked.")
             else:
@@ -219,22 +232,10 @@ class BookingForm(forms.ModelForm):
                 )
         
         # Check trainer availability (if trainer selected)
-        if trainer:
-            trainer_bookings = Booking.objects.filter(
-                trainer=trainer,
-                date=date,
-                start_time=start_time,
-                status__in=['pending', 'confirmed']
+        if trainer and conflicts.filter(trainer=trainer).exists():
+            raise ValidationError(
+                f"{trainer.user.get_full_name()} is not available at this time."
             )
-            
-            # Exclude current booking if editing
-            if self.instance and self.instance.pk:
-                trainer_bookings = trainer_bookings.exclude(pk=self.instance.pk)
-            
-            if trainer_bookings.exists():
-                raise ValidationError(
-                    f"{trainer.user.get_full_name()} is not available at this time."
-                )
         
         return cleaned_data
 
@@ -257,8 +258,8 @@ class BookingFilterForm(forms.Form):
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     
-    service = forms.ModelChoiceField(
-        queryset=Service.objects.filter(is_active=True),
+    service = CatalogChoiceField(
+        active_services,
         required=False,
         empty_label="All Services",
         widget=forms.Select(attrs={'class': 'form-select'})
@@ -284,8 +285,8 @@ class QuickBookingForm(forms.Form):
     """
     Simplified booking form for dashboard quick actions
     """
-    service = forms.ModelChoiceField(
-        queryset=Service.objects.filter(is_active=True),
+    service = CatalogChoiceField(
+        active_services,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     
@@ -293,24 +294,14 @@ class QuickBookingForm(forms.Form):
         widget=forms.DateInput(attrs={
             'class': 'form-control',
             'type': 'date',
-            'min': timezone.now().date().isoformat()
         })
     )
     
     time = forms.ChoiceField(
+        choices=time_choices(),
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        
-        # Set up time choices
-        time_choices = [('', 'Select a time...')]
-        for hour in range(9, 21):
-            time_obj = time(hour, 0)
-            time_choices.append((
-                time_obj.strftime('%H:%M'),
-                time_obj.strftime('%I:%M %p')
-            ))
-        
-        self.fields['time'].choices = time_choices
\ No newline at end of file
+        set_date_bounds(self.fields['date'])
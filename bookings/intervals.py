@@ -0,0 +1,23 @@
+# bookings/intervals.py
+"""
+Schedule overlap checks - does [start, end) clash with anything booked?
+
+A booking holds the half-open interval [start_time, end_time) on its day,
+with end_time derived from the service's duration_minutes. A 90-minute
+session at 09:00 holds [09:00, 10:30): it blocks 10:00 but not 10:30.
+Two intervals overlap when each starts before the other ends.
+
+The database does the work through BookingQuerySet.overlapping(), scoped
+to a member, trainer or service first, e.g.
+
+    Booking.objects.filter(trainer=trainer).overlapping(date, start, end)
+
+The (owner, date, start_time) indexes turn that into a range scan over
+the owner's sessions that day, however many they have that week.
+"""
+from datetime import datetime, timedelta
+
+
+def session_end(date, start_time, duration_minutes):
+    """End time of a session starting at start_time on date."""
+    return (datetime.combine(date, start_time) + timedelta(minutes=duration_minutes)).time()
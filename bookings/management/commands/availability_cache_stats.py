@@ -0,0 +1,20 @@
+# bookings/management/commands/availability_cache_stats.py
+from django.core.management.base import BaseCommand
+
+from bookings.caching import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counts for the available-times cache (shared backends only - locmem counts are per process)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        self.stdout.write(
+            f"hits {stats['hits']:,}  misses {stats['misses']:,}  hit rate {stats['hit_rate']:.1%}"
+        )
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
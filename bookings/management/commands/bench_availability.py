@@ -0,0 +1,123 @@
+# bookings/management/commands/bench_availability.py
+import time as timer
+from datetime import time, timedelta
+from io import StringIO
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.availability import iter_available_slots
+from bookings.models import Service, Booking
+
+
+class Rollback(Exception):
+    """Raised to throw away the benchmark's sample data."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the slot availability engine against the old per-slot COUNT loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--services', type=int, nargs='+', default=[1, 5, 20, 50],
+            help='Service counts to benchmark'
+        )
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Days in the availability window'
+        )
+        parser.add_argument(
+            '--skip-legacy', action='store_true',
+            help='Only run the availability engine'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'services':>8} {'mode':>8} {'queries':>8} {'ms':>10} {'slots':>6}")
+
+        for service_count in options['services']:
+            try:
+                with transaction.atomic():
+                    services = self.seed(service_count, options['days'])
+                    self.run('engine', services, options['days'], self.engine)
+                    if not options['skip_legacy']:
+                        self.run('legacy', services, options['days'], self.legacy)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def seed(self, service_count, days):
+        """Create services and fill the first few days so the view has to look ahead."""
+        user = User.objects.create_user(username='bench-availability')
+        services = Service.objects.bulk_create([
+            Service(
+                name=f'Bench Service {i}',
+                service_type='group_class',
+                description='Benchmark service',
+                price=100,
+                max_participants=1,
+            )
+            for i in range(service_count)
+        ])
+
+        today = timezone.now().date()
+        bookings = [
+            Booking(
+                user=user,
+                service=service,
+                date=today + timedelta(days=day),
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                status='confirmed',
+            )
+            for service in services
+            for day in range(min(days, 3))
+            for hour in range(9, 21)
+        ]
+        Booking.objects.bulk_create(bookings, batch_size=1000)
+        # bulk_create skips the signals, so materialise the slots the engine reads
+        call_command('generate_slots', days=days, stdout=StringIO())
+        return Service.objects.filter(id__in=[service.id for service in services])
+
+    def run(self, label, services, days, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = timer.perf_counter()
+            slots = func(services, days)
+            elapsed = (timer.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f"{services.count():>8} {label:>8} {len(queries):>8} {elapsed:>10.1f} {len(slots):>6}"
+        )
+
+    def engine(self, services, days):
+        start_date = timezone.now().date()
+        return list(islice(iter_available_slots(services, start_date, days=days), 50))
+
+    def legacy(self, services, days):
+        """The original booking_calendar loop, kept here for comparison."""
+        available_slots = []
+        start_date = timezone.now().date()
+
+        for i in range(days):
+            current_date = start_date + timedelta(days=i)
+            for hour in range(9, 21):
+                slot_time = time(hour, 0)
+                for service in services:
+                    existing_bookings = Booking.objects.filter(
+                        service=service,
+                        date=current_date,
+                        start_time=slot_time,
+                        status__in=['pending', 'confirmed']
+                    ).count()
+                    if existing_bookings < service.max_participants:
+                        available_slots.append({
+                            'date': current_date,
+                            'time': slot_time,
+                            'service': service,
+                            'spots_left': service.max_participants - existing_bookings
+                        })
+        return available_slots[:50]
@@ -0,0 +1,173 @@
+# bookings/management/commands/bench_booking_indexes.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from bookings.capacity import CapacityIndex
+from bookings.models import Booking, Slot
+from core.benchmarks import scratch_database, measure
+from core.load_data import LoadVolumes, generate_load_data
+
+HOT_PATH_INDEXES = [
+    'booking_slot_status_idx',
+    'booking_trainer_slot_idx',
+    'booking_user_date_idx',
+    'booking_user_status_idx',
+]
+
+
+class Command(BaseCommand):
+    help = 'Seed a scratch database with bookings and compare hot-path queries with and without the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000, help='Bookings to seed')
+        parser.add_argument('--users', type=int, default=20_000, help='Members to spread bookings over')
+        parser.add_argument('--trainers', type=int, default=50, help='Trainers to assign')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query (median is reported)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the scratch database between runs')
+        parser.add_argument('--no-explain', action='store_true', help='Skip EXPLAIN output')
+
+    def handle(self, *args, **options):
+        with scratch_database(keepdb=options['keepdb']):
+            if not Booking.objects.exists():
+                self.seed(options)
+
+            probe = self.pick_probe()
+            queries = self.hot_path_queries(probe)
+
+            self.stdout.write(self.style.MIGRATE_HEADING('With indexes'))
+            after = self.run(queries, options)
+
+            self.drop_indexes()
+            try:
+                self.stdout.write(self.style.MIGRATE_HEADING('Without indexes'))
+                before = self.run(queries, options)
+            finally:
+                self.restore_indexes()
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary (median ms)'))
+            self.stdout.write(f"{'query':<28} {'before':>10} {'after':>10} {'speedup':>8}")
+            for name in queries:
+                speedup = before[name] / after[name] if after[name] else float('inf')
+                self.stdout.write(f"{name:<28} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>7.1f}x")
+
+    # Seeding
+
+    def seed(self, options):
+        self.stdout.write(f"Seeding {options['bookings']:,} bookings...")
+        # Everyone books, over the window the old seed used; the dashboard
+        # rollups aren't part of these queries
+        generate_load_data(
+            LoadVolumes(
+                members=options['users'],
+                trainers=options['trainers'],
+                services=20,
+                bookings=options['bookings'],
+                membership_rate=1,
+                days_back=180,
+                days_ahead=60,
+            ),
+            seed=options['seed'],
+            member_stats=False,
+            # A fresh scratch database - nothing else is querying it
+            drop_indexes=True,
+        )
+
+    def pick_probe(self):
+        """A busy member, trainer and slot to run the hot-path queries for."""
+        booking = Booking.objects.filter(
+            status__in=Booking.ACTIVE_STATUSES, trainer__isnull=False
+        ).order_by('id').first()
+        return {
+            'user': booking.user,
+            'service': booking.service,
+            'trainer': booking.trainer,
+            'date': booking.date,
+            'start_time': booking.start_time,
+        }
+
+    # Queries under test
+
+    def hot_path_queries(self, probe):
+        today = timezone.now().date()
+        month_start = today.replace(day=1)
+        user_bookings = Booking.objects.filter(user=probe['user'])
+
+        def available_times():
+            return CapacityIndex.build([probe['service']], probe['date'])
+
+        def booking_list():
+            page = user_bookings.order_by('-date', '-start_time')
+            return page.count(), list(page[:10])
+
+        def dashboard():
+            return (
+                user_bookings.filter(
+                    date__gte=today, status__in=['pending', 'confirmed']
+                ).order_by('date', 'start_time').first(),
+                user_bookings.filter(status='completed', date__gte=month_start).count(),
+                user_bookings.filter(status='completed').count(),
+            )
+
+        def trainer_conflict():
+            return Booking.objects.filter(
+                trainer=probe['trainer'],
+                date=probe['date'],
+                start_time=probe['start_time'],
+                status__in=['pending', 'confirmed'],
+            ).exists()
+
+        self.explain_targets = {
+            # Reads the materialised slots, so it should not move with these indexes
+            'get_available_times': Slot.objects.filter(
+                service_id__in=[probe['service'].id],
+                date__range=(probe['date'], probe['date']),
+                booked__gt=0,
+            ).values_list('service_id', 'date', 'start_time', 'capacity', 'booked').order_by(),
+            'BookingListView': user_bookings.order_by('-date', '-start_time')[:10],
+            'dashboard (next booking)': user_bookings.filter(
+                date__gte=today, status__in=['pending', 'confirmed']
+            ).order_by('date', 'start_time')[:1],
+            'dashboard (completed)': user_bookings.filter(status='completed'),
+            'trainer conflict': Booking.objects.filter(
+                trainer=probe['trainer'],
+                date=probe['date'],
+                start_time=probe['start_time'],
+                status__in=['pending', 'confirmed'],
+            ),
+        }
+
+        return {
+            'get_available_times': available_times,
+            'BookingListView': booking_list,
+            'dashboard': dashboard,
+            'trainer conflict': trainer_conflict,
+        }
+
+    def run(self, queries, options):
+        if not options['no_explain']:
+            for name, queryset in self.explain_targets.items():
+                self.stdout.write(f'-- {name}')
+                self.stdout.write(queryset.explain())
+
+        results = {}
+        for name, func in queries.items():
+            results[name] = measure(func, repeat=options['repeat'])
+            self.stdout.write(f"{name:<28} {results[name]:>10.2f} ms")
+        return results
+
+    # Index toggling
+
+    def hot_path_index_objects(self):
+        return [index for index in Booking._meta.indexes if index.name in HOT_PATH_INDEXES]
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in self.hot_path_index_objects():
+                editor.remove_index(Booking, index)
+
+    def restore_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in self.hot_path_index_objects():
+                editor.add_index(Booking, index)
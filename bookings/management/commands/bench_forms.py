@@ -0,0 +1,86 @@
+# bookings/management/commands/bench_forms.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import TrainerProfile
+from bookings.forms import BookingFilterForm, BookingForm, QuickBookingForm
+from bookings.models import Service
+from core.benchmarks import measure, scratch_database
+from core.catalog import accepting_trainers, active_services
+
+
+class Command(BaseCommand):
+    help = 'Benchmark building and rendering the booking forms, with cold and warm catalogs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--services', type=int, default=12, help='Active services to seed')
+        parser.add_argument('--trainers', type=int, default=8, help='Trainers taking clients to seed')
+        parser.add_argument('--repeat', type=int, default=500, help='Timed runs per case (median reported)')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            user = self.seed(options)
+            forms = [
+                ('BookingForm', lambda: BookingForm(user=user)),
+                ('QuickBookingForm', QuickBookingForm),
+                ('BookingFilterForm', BookingFilterForm),
+            ]
+
+            self.stdout.write(
+                f"{'form':<18} {'catalogs':>8} {'queries':>8} {'build ms':>9} {'render ms':>10}"
+            )
+            for name, build in forms:
+                for label, prepare in [('cold', self.invalidate), ('warm', self.warm)]:
+                    def built():
+                        prepare()
+                        return build()
+
+                    def rendered():
+                        return str(built())
+
+                    prepare()
+                    with CaptureQueriesContext(connection) as queries:
+                        rendered()
+                    self.stdout.write(
+                        f"{name:<18} {label:>8} {len(queries):>8} "
+                        f"{measure(built, options['repeat']):>9.3f} "
+                        f"{measure(rendered, options['repeat']):>10.3f}"
+                    )
+
+    def invalidate(self):
+        """Every form reloads its catalogs - the per-request querysets of old."""
+        active_services.invalidate()
+        accepting_trainers.invalidate()
+
+    def warm(self):
+        """Steady state: the worker's snapshots are current."""
+        active_services.all()
+        accepting_trainers.all()
+
+    def seed(self, options):
+        Service.objects.bulk_create(
+            Service(
+                name=f'Bench Service {i}',
+                service_type='group_class',
+                description='Benchmark service',
+                price=100,
+            )
+            for i in range(options['services'])
+        )
+        users = User.objects.bulk_create(
+            User(username=f'bench-trainer{i}', first_name='Coach', last_name=str(i))
+            for i in range(options['trainers'])
+        )
+        TrainerProfile.objects.bulk_create(
+            TrainerProfile(
+                user=trainer_user,
+                certifications='Certified',
+                specializations='strength',
+                hourly_rate=300,
+                bio='Benchmark trainer',
+            )
+            for trainer_user in users
+        )
+        return User.objects.create_user(username='bench-member')
@@ -0,0 +1,120 @@
+# bookings/management/commands/bench_trainer_assignment.py
+import random
+from datetime import time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import TrainerProfile
+from bookings.intervals import session_end
+from bookings.models import Service, Booking
+from bookings.trainers import TrainerSchedule, pick_trainer, trainers_for_service
+from core.benchmarks import scratch_database, measure, chunked
+
+SPECIALIZATIONS = [code for code, _ in TrainerProfile.SPECIALIZATIONS]
+DURATIONS = [45, 60, 90]
+
+
+class Command(BaseCommand):
+    help = 'Compare per-trainer conflict queries with the quarter-hour bitmask schedule for trainer auto-assignment'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trainers', type=int, default=200, help='Trainers to seed')
+        parser.add_argument('--bookings', type=int, default=50_000, help='Trainer bookings to seed')
+        parser.add_argument('--days', type=int, default=30, help='Days the bookings are spread over')
+        parser.add_argument('--requests', type=int, default=50, help='Sessions to assign per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per approach (median is reported)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            rng = random.Random(options['seed'])
+            service, member = self.seed(rng, options)
+            day = timezone.now().date() + timedelta(days=1)
+            requests = [
+                (time(rng.randrange(9, 20), rng.choice([0, 15, 30, 45])), rng.choice(DURATIONS))
+                for _ in range(options['requests'])
+            ]
+            requests = [(start, session_end(day, start, minutes)) for start, minutes in requests]
+            trainers = list(trainers_for_service(service))
+
+            def per_trainer_queries():
+                # One conflict query and one client count per trainer tried
+                assigned = []
+                for start_time, end_time in requests:
+                    for trainer in trainers:
+                        bookings = Booking.objects.filter(trainer=trainer)
+                        if bookings.overlapping(day, start_time, end_time).exists():
+                            continue
+                        clients = bookings.filter(
+                            date__gte=day, status__in=Booking.ACTIVE_STATUSES
+                        ).values('user_id').distinct().count()
+                        if clients < trainer.max_clients:
+                            assigned.append(trainer)
+                            break
+                return assigned
+
+            def bitmask_schedule():
+                schedule = TrainerSchedule.build(trainers, day, member_id=member.id)
+                return [
+                    pick_trainer(schedule, day, start_time, end_time)
+                    for start_time, end_time in requests
+                ]
+
+            naive = measure(per_trainer_queries, repeat=options['repeat'])
+            bitmask = measure(bitmask_schedule, repeat=options['repeat'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"Assigning {len(requests)} sessions across {len(trainers)} trainers (median ms)"
+            ))
+            self.stdout.write(f"{'per-trainer queries':<22} {naive:>10.2f}")
+            self.stdout.write(f"{'bitmask schedule':<22} {bitmask:>10.2f}")
+            self.stdout.write(f"{'speedup':<22} {naive / bitmask:>9.1f}x")
+
+    def seed(self, rng, options):
+        self.stdout.write(f"Seeding {options['trainers']} trainers and {options['bookings']:,} bookings...")
+        members = User.objects.bulk_create(
+            User(username=f'member{i}') for i in range(1000)
+        )
+        trainer_users = User.objects.bulk_create(
+            User(username=f'trainer{i}', first_name='Trainer', last_name=str(i))
+            for i in range(options['trainers'])
+        )
+        TrainerProfile.objects.bulk_create(
+            TrainerProfile(
+                user=user,
+                certifications='Certified',
+                specializations=rng.choice(SPECIALIZATIONS),
+                hourly_rate=300,
+                bio='Benchmark trainer',
+                max_clients=1000,
+            )
+            for user in trainer_users
+        )
+        service = Service.objects.create(
+            name='Group Class', service_type='group_class', description='Benchmark service',
+            price=100, max_participants=15,
+        )
+
+        trainer_ids = list(TrainerProfile.objects.values_list('id', flat=True))
+        today = timezone.now().date()
+
+        def bookings():
+            for _ in range(options['bookings']):
+                day = today + timedelta(days=rng.randrange(options['days']))
+                start_time = time(rng.randrange(9, 20), rng.choice([0, 15, 30, 45]))
+                yield Booking(
+                    user=rng.choice(members),
+                    service=service,
+                    trainer_id=rng.choice(trainer_ids),
+                    date=day,
+                    start_time=start_time,
+                    end_time=session_end(day, start_time, rng.choice(DURATIONS)),
+                    status='confirmed',
+                )
+
+        for batch in chunked(bookings(), 10_000):
+            Booking.objects.bulk_create(batch)
+
+        return service, members[0]
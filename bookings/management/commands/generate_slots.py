@@ -0,0 +1,92 @@
+# bookings/management/commands/generate_slots.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from bookings.models import Service, Booking, Slot
+from core.benchmarks import chunked
+
+
+class Command(BaseCommand):
+    help = 'Create Slot rows for every active service over a rolling horizon (run daily from a scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=60, help='Days ahead to cover, starting today')
+        parser.add_argument('--start', help='First day to cover (YYYY-MM-DD, default today)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Slots written per bulk insert')
+        parser.add_argument('--prune', action='store_true', help='Also delete past slots and empty slots outside opening hours')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start']
+                else timezone.now().date()
+            )
+        except ValueError:
+            raise CommandError('--start must be a date in YYYY-MM-DD format')
+        end_date = start_date + timedelta(days=options['days'] - 1)
+        services = list(Service.objects.filter(is_active=True))
+
+        # Bookings made before their slot existed, so new rows start out truthful
+        booked = {
+            (row['service_id'], row['date'], row['start_time']): row['booked']
+            for row in Booking.objects.filter(
+                service__in=services,
+                date__range=(start_date, end_date),
+                status__in=Booking.ACTIVE_STATUSES,
+            ).values('service_id', 'date', 'start_time').annotate(
+                booked=Sum('participants')
+            ).order_by()
+        }
+        existing = set(
+            Slot.objects.filter(
+                service__in=services, date__range=(start_date, end_date)
+            ).values_list('service_id', 'date', 'start_time')
+        )
+
+        def missing_slots():
+            for service in services:
+                times = service.slot_times()
+                for offset in range(options['days']):
+                    day = start_date + timedelta(days=offset)
+                    for start_time in times:
+                        key = (service.pk, day, start_time)
+                        if key not in existing:
+                            yield Slot(
+                                service=service,
+                                date=day,
+                                start_time=start_time,
+                                capacity=service.max_participants,
+                                booked=booked.get(key, 0),
+                            )
+
+        created = 0
+        with transaction.atomic():
+            for batch in chunked(missing_slots(), options['batch_size']):
+                # Reservations may create a slot while this runs - keep theirs
+                Slot.objects.bulk_create(batch, ignore_conflicts=True)
+                created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created:,} slots for {len(services)} services '
+            f'from {start_date} to {end_date}'
+        ))
+
+        if options['prune']:
+            self.prune(services, start_date)
+
+    def prune(self, services, today):
+        """Drop past slots, and future slots nobody holds that fall outside opening hours."""
+        past, _ = Slot.objects.filter(date__lt=today).delete()
+
+        closed = 0
+        for service in Service.objects.all():
+            open_times = service.slot_times() if service in services else []
+            closed += Slot.objects.filter(
+                service=service, date__gte=today, booked__lte=0
+            ).exclude(start_time__in=open_times).delete()[0]
+
+        self.stdout.write(f'Pruned {past:,} past slots and {closed:,} slots outside opening hours')
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('capacity', models.IntegerField()),
+                ('booked', models.IntegerField(default=0)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.service')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('service', 'date', 'start_time'), name='unique_slot_counter')],
+            },
+        ),
+    ]
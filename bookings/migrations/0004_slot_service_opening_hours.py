@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 06:10
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='opens_at',
+            field=models.TimeField(default=datetime.time(9, 0)),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='closes_at',
+            field=models.TimeField(default=datetime.time(21, 0)),
+        ),
+        migrations.RemoveConstraint(
+            model_name='slotcounter',
+            name='unique_slot_counter',
+        ),
+        migrations.RenameModel(
+            old_name='SlotCounter',
+            new_name='Slot',
+        ),
+        migrations.AddConstraint(
+            model_name='slot',
+            constraint=models.UniqueConstraint(fields=('service', 'date', 'start_time'), name='unique_slot'),
+        ),
+    ]
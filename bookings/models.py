@@ -2,7 +2,29 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+
+# Default opening hours - sessions start on the hour and finish by closing
+DEFAULT_OPENS_AT = time(9, 0)
+DEFAULT_CLOSES_AT = time(21, 0)
+SLOT_INTERVAL = timedelta(hours=1)
+
+
+def opening_slot_times(opens_at, closes_at, duration_minutes):
+    """
+    Start times for sessions of `duration_minutes` between opens_at and
+    closes_at, one every SLOT_INTERVAL, each finishing by closing time.
+    """
+    day = date(2000, 1, 1)
+    start = datetime.combine(day, opens_at)
+    closes = datetime.combine(day, closes_at)
+    length = timedelta(minutes=duration_minutes)
+    
+    times = []
+    while start + length <= closes:
+        times.append(start.time())
+        start += SLOT_INTERVAL
+    return times
 
 class Service(models.Model):
     """
@@ -27,11 +49,46 @@ class Service(models.Model):
     requires_membership = models.BooleanField(default=True)
     minimum_fitness_level = models.CharField(max_length=20, blank=True)
     
+    # Opening hours - slots are generated from these (see generate_slots)
+    opens_at = models.TimeField(default=DEFAULT_OPENS_AT)
+    closes_at = models.TimeField(default=DEFAULT_CLOSES_AT)
+    
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.name} ({self.duration_minutes}min - R{self.price})"
+    
+    def slot_times(self):
+        """Start times of this service's bookable slots in a day."""
+        return opening_slot_times(self.opens_at, self.closes_at, self.duration_minutes)
+
+class BookingQuerySet(models.QuerySet):
+    """
+    Booking lookups shared by the booking pages.
+    """
+    
+    def with_related(self):
+        """
+        Pull in everything the booking templates and __str__ touch
+        (service, trainer name, member name) in the same query.
+        """
+        return self.select_related('service', 'trainer__user', 'user')
+    
+    def overlapping(self, date, start_time, end_time):
+        """
+        Bookings still holding their time that overlap [start_time, end_time)
+        on date (see bookings/intervals.py). start_time < end_time is a range
+        on the (owner, date, start_time) indexes; end_time > start_time then
+        filters the handful of rows left.
+        """
+        return self.filter(
+            date=date,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+            status__in=Booking.ACTIVE_STATUSES,
+        )
+
 
 class Booking(models.Model):
     """
@@ -45,6 +102,9 @@ class Booking(models.Model):
         ('no_show', 'No Show'),
     ]
     
+    # Statuses that still hold a spot in the slot
+    ACTIVE_STATUSES = ['pending', 'confirmed']
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     service = models.ForeignKey(Service, on_delete=models.CASCADE)
     trainer = models.ForeignKey('accounts.TrainerProfile', on_delete=models.SET_NULL, null=True, blank=True)
@@ -67,8 +127,35 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BookingQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date', '-start_time']
+        indexes = [
+            # Capacity and available-times lookups: one slot, spots still held.
+            # status is a trailing column rather than a partial-index condition
+            # because SQLite cannot match a bound status IN (...) to a partial index.
+            models.Index(
+                fields=['service', 'date', 'start_time', 'status'],
+                name='booking_slot_status_idx',
+            ),
+            # Trainer double-booking checks; unassigned bookings are left out
+            models.Index(
+                fields=['trainer', 'date', 'start_time', 'status'],
+                condition=models.Q(trainer__isnull=False),
+                name='booking_trainer_slot_idx',
+            ),
+            # My bookings list and the dashboard timeline, in both directions
+            models.Index(
+                fields=['user', 'date', 'start_time'],
+                name='booking_user_date_idx',
+            ),
+            # Dashboard stats (completed sessions per user over a date range)
+            models.Index(
+                fields=['user', 'status', 'date'],
+                name='booking_user_status_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.service.name} on {self.date}"
@@ -80,4 +167,36 @@ class Booking(models.Model):
     
     @property
     def duration(self):
-        return datetime.combine(self.date, self.end_time) - datetime.combine(self.date, self.start_time)
\ No newline at end of file
+        return datetime.combine(self.date, self.end_time) - datetime.combine(self.date, self.start_time)
+
+class Slot(models.Model):
+    """
+    One bookable session - the turnstile at the door.
+    Generated ahead of time for a rolling horizon by `generate_slots`, and
+    kept current as bookings come and go, so availability is a range scan
+    over these rows. Reservations claim spots with a conditional UPDATE on
+    `booked`, so two members grabbing the last spot at once can never both
+    get in.
+    """
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    date = models.DateField()
+    start_time = models.TimeField()
+    
+    capacity = models.IntegerField()
+    booked = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            # Also the index behind availability range scans (service, date range)
+            models.UniqueConstraint(
+                fields=['service', 'date', 'start_time'],
+                name='unique_slot'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.service.name} on {self.date} at {self.start_time} ({self.booked}/{self.capacity})"
+    
+    @property
+    def spots_left(self):
+        return max(self.capacity - self.booked, 0)
@@ -0,0 +1,122 @@
+# bookings/reservations.py
+"""
+Race-free booking reservations - claiming a spot and writing the booking
+happen in one transaction.
+
+Each slot has a Slot row. A reservation claims its participants with a
+single conditional UPDATE (`booked + n <= capacity`), which the database
+applies atomically, and only then inserts the Booking. If the UPDATE
+touches no row the slot is full and nothing is written.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Booking, Slot
+from .trainers import assign_trainer
+
+
+def get_slot(service, date, start_time):
+    """
+    Fetch the row for a slot, creating it from the bookings already in the
+    slot if generate_slots has not reached it yet.
+    """
+    slot = Slot.objects.filter(
+        service=service, date=date, start_time=start_time
+    ).first()
+    if slot:
+        return slot
+
+    booked = Booking.objects.filter(
+        service=service,
+        date=date,
+        start_time=start_time,
+        status__in=Booking.ACTIVE_STATUSES,
+    ).aggregate(total=Sum('participants'))['total'] or 0
+
+    # get_or_create copes with another request creating the row first
+    slot, _ = Slot.objects.get_or_create(
+        service=service,
+        date=date,
+        start_time=start_time,
+        defaults={'capacity': service.max_participants, 'booked': booked},
+    )
+    return slot
+
+
+def reserve(booking, auto_assign=False):
+    """
+    Claim the booking's spots and save it, all or nothing.
+
+    Works for new bookings and for moving an existing one; spots the
+    booking already holds in the same slot count towards the claim.
+    Raises ValidationError if the slot does not have enough room.
+
+    With auto_assign, a booking without a trainer gets one picked once the
+    spots are claimed - the claim's UPDATE holds the slot row until commit,
+    so concurrent bookings for the slot are assigned one at a time.
+    """
+    participants = booking.participants or 1
+    key = (booking.service_id, booking.date, booking.start_time)
+
+    # Spots this booking already holds in the target slot
+    old = getattr(booking, '_capacity_footprint', None)
+    held = old[1] if old and old[0] == key else 0
+
+    with transaction.atomic():
+        slot = get_slot(booking.service, booking.date, booking.start_time)
+
+        claimed = Slot.objects.filter(
+            pk=slot.pk,
+            booked__lte=F('capacity') - participants + held,
+        ).update(booked=F('booked') + participants)
+
+        if not claimed:
+            slot.refresh_from_db(fields=['booked', 'capacity'])
+            spots_left = max(slot.capacity - slot.booked + held, 0)
+            if spots_left <= 0:
+                raise ValidationError("This time slot is fully booked.", code='slot_full')
+            raise ValidationError(
+                f"Only {spots_left} spots available at this time.", code='slot_full'
+            )
+
+        if auto_assign and not booking.trainer_id:
+            booking.trainer = assign_trainer(booking)
+
+        # Tell the post_save handler the new spots are already claimed
+        booking._slot_claimed = True
+        booking.save()
+
+    return booking
+
+
+def sync_slots(booking, old, new):
+    """
+    Apply a booking's capacity change to the slot rows.
+
+    Called from the Booking post_save/post_delete handlers with the booking's
+    (key, participants) footprint before and after. Spots released by a
+    cancel or move are handed back; spots taken outside reserve() (admin
+    edits, fixtures) are added unconditionally so the row stays truthful,
+    creating it if the slot was never generated.
+    """
+    claimed = getattr(booking, '_slot_claimed', False)
+    booking._slot_claimed = False
+
+    if old == new and not claimed:
+        return
+
+    if old:
+        (service_id, date, start_time), participants = old
+        Slot.objects.filter(
+            service_id=service_id, date=date, start_time=start_time
+        ).update(booked=F('booked') - participants)
+
+    if new and not claimed:
+        (service_id, date, start_time), participants = new
+        updated = Slot.objects.filter(
+            service_id=service_id, date=date, start_time=start_time
+        ).update(booked=F('booked') + participants)
+        if not updated:
+            # Counts this booking too - it is already saved
+            get_slot(booking.service, date, start_time)
@@ -0,0 +1,42 @@
+# bookings/signals.py
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Service, Booking, Slot
+from .caching import invalidate_footprints
+from .capacity import CapacityIndex, capacity_footprint
+from .reservations import sync_slots
+
+
+@receiver(post_init, sender=Booking)
+def remember_capacity_footprint(sender, instance, **kwargs):
+    """Snapshot the spot a booking holds as loaded, so saves can diff against it."""
+    instance._capacity_footprint = capacity_footprint(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Booking)
+def update_capacity_on_save(sender, instance, **kwargs):
+    """Keep capacity indexes, slots and cached availability in step with new, moved and cancelled bookings."""
+    old, new = instance._capacity_footprint, capacity_footprint(instance)
+    CapacityIndex.booking_changed(instance, old, new)
+    sync_slots(instance, old, new)
+    if old != new:
+        invalidate_footprints(old, new)
+    instance._capacity_footprint = new
+
+
+@receiver(post_delete, sender=Booking)
+def update_capacity_on_delete(sender, instance, **kwargs):
+    CapacityIndex.booking_changed(instance, instance._capacity_footprint, None)
+    sync_slots(instance, instance._capacity_footprint, None)
+    invalidate_footprints(instance._capacity_footprint, None)
+    instance._capacity_footprint = None
+
+
+@receiver(post_save, sender=Service)
+def update_slot_capacity(sender, instance, created, **kwargs):
+    """Carry a service's new max_participants over to its slots."""
+    if not created:
+        Slot.objects.filter(service=instance).exclude(
+            capacity=instance.max_participants
+        ).update(capacity=instance.max_participants)
@@ -1,3 +1,752 @@
-from django.test import TestCase
+import tempfile
+from io import StringIO
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time, timedelta
+from itertools import islice
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .availability import AvailabilityGrid, iter_available_slots
+from .caching import aget_capacity, cache_stats, generation_key
+from .forms import BookingForm, QuickBookingForm, time_choices
+from .capacity import CapacityIndex
+from accounts.models import TrainerProfile
+from core.catalog import accepting_trainers, active_services
+from .models import Service, Booking, Slot
+from .reservations import reserve
+from .trainers import QUARTERS_PER_DAY, TrainerSchedule, pick_trainer, quarter_mask, trainers_for_service
+from .views import BookingListView
+
+
+def make_service(**kwargs):
+    defaults = {
+        'name': 'HIIT Group Class',
+        'service_type': 'group_class',
+        'description': 'High-intensity interval training',
+        'price': 80,
+        'max_participants': 2,
+    }
+    defaults.update(kwargs)
+    return Service.objects.create(**defaults)
+
+
+def make_booking(user, service, date, start_time, **kwargs):
+    defaults = {
+        'end_time': time(start_time.hour + 1, 0),
+        'status': 'confirmed',
+    }
+    defaults.update(kwargs)
+    return Booking.objects.create(
+        user=user, service=service, date=date, start_time=start_time, **defaults
+    )
+
+
+class AvailabilityEngineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.today = timezone.now().date()
+
+    def test_full_slots_are_skipped_and_spots_counted(self):
+        service = make_service(max_participants=2)
+        make_booking(self.user, service, self.today, time(9, 0))
+        make_booking(self.user, service, self.today, time(9, 0))
+        make_booking(self.user, service, self.today, time(10, 0))
+        make_booking(self.user, service, self.today, time(11, 0), status='cancelled')
+
+        slots = list(islice(iter_available_slots(Service.objects.all(), self.today, days=1), 3))
+
+        self.assertEqual(
+            [(slot['time'], slot['spots_left']) for slot in slots],
+            [(time(10, 0), 1), (time(11, 0), 2), (time(12, 0), 2)],
+        )
+
+    def test_query_count_is_constant_in_number_of_services(self):
+        for i in range(10):
+            make_service(name=f'Service {i}')
+
+        for count in (1, 10):
+            services = Service.objects.all()[:count]
+            with self.assertNumQueries(2):
+                list(iter_available_slots(services, self.today, days=30))
+
+
+class CapacityIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = make_service(max_participants=5)
+        self.date = timezone.now().date() + timedelta(days=3)
+        self.slot = time(9, 0)
+
+    def test_counts_participants_not_bookings(self):
+        make_booking(self.user, self.service, self.date, self.slot, participants=3)
+        make_booking(self.user, self.service, self.date, self.slot, participants=1)
+
+        with self.assertNumQueries(1):
+            index = CapacityIndex.build([self.service], self.date)
+
+        self.assertEqual(index.booked(self.service, self.date, self.slot), 4)
+        self.assertEqual(index.spots_left(self.service, self.date, self.slot), 1)
+        self.assertFalse(index.has_room(self.service, self.date, self.slot, participants=2))
+
+    def test_live_index_follows_saves_and_cancellations(self):
+        index = CapacityIndex.build([self.service], self.date)
+
+        booking = make_booking(self.user, self.service, self.date, self.slot, participants=2)
+        self.assertEqual(index.booked(self.service, self.date, self.slot), 2)
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(index.booked(self.service, self.date, self.slot), 0)
+
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.status = 'confirmed'
+        booking.start_time = time(10, 0)
+        booking.save()
+        self.assertEqual(index.booked(self.service, self.date, time(10, 0)), 2)
+
+        booking.delete()
+        self.assertEqual(index.booked(self.service, self.date, time(10, 0)), 0)
+
+
+class AvailableTimesApiTests(TestCase):
+    """
+    The async available-times endpoint, driven through the ASGI handler
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = make_service(max_participants=2)
+        self.date = timezone.now().date() + timedelta(days=1)
+        make_booking(self.user, self.service, self.date, time(9, 0), participants=2)
+        make_booking(self.user, self.service, self.date, time(10, 0))
+
+    async def test_lists_open_slots_with_spots_left(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse('bookings:get_available_times'),
+            {'service_id': self.service.id, 'date': self.date.isoformat()},
+        )
+
+        times = response.json()['times']
+        self.assertNotIn('09:00', [slot['time'] for slot in times])
+        self.assertEqual(times[0], {'time': '10:00', 'display': '10:00 AM', 'spots_left': 1})
+
+    async def test_rejects_unknown_service(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse('bookings:get_available_times'),
+            {'service_id': 0, 'date': self.date.isoformat()},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(reverse('bookings:get_available_times'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_async_build_matches_sync_build(self):
+        index = await CapacityIndex.abuild([self.service], self.date)
+        self.assertEqual(index.booked(self.service, self.date, time(9, 0)), 2)
+        self.assertEqual(index.spots_left(self.service, self.date, time(10, 0)), 1)
+
+
+class AvailabilityGridApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.client.force_login(self.user)
+        self.service = make_service(max_participants=3)
+        self.other = make_service(name='Boxing', max_participants=1)
+        self.today = timezone.now().date()
+        make_booking(self.user, self.service, self.today + timedelta(days=1), time(10, 0), participants=2)
+        self.url = reverse('bookings:availability_grid')
+
+    def test_returns_columnar_grid(self):
+        with self.assertNumQueries(2 + 3):  # session, user, services, etag, capacity
+            response = self.client.get(self.url, {'days': 2})
+
+        grid = response.json()
+        self.assertEqual(grid['days'], [self.today.isoformat(), (self.today + timedelta(days=1)).isoformat()])
+        self.assertEqual(grid['hours'][:2], ['09:00', '10:00'])
+        self.assertEqual([service['id'] for service in grid['services']], [self.service.id, self.other.id])
+        self.assertEqual(grid['spots'][0][1][:2], [3, 1])
+        self.assertEqual(grid['spots'][1][1][:2], [1, 1])
+
+    def test_unchanged_window_is_not_modified(self):
+        response = self.client.get(self.url, {'days': 60})
+        etag = response['ETag']
+
+        response = self.client.get(self.url, {'days': 60}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make_booking(self.user, self.other, self.today + timedelta(days=30), time(9, 0))
+        response = self.client.get(self.url, {'days': 60}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_opening_hours_change_the_etag(self):
+        etag = self.client.get(self.url, {'days': 2})['ETag']
+
+        self.service.closes_at = time(12, 0)
+        self.service.save()
+        response = self.client.get(self.url, {'days': 2}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['hours'][-1], '20:00')  # Boxing still runs until closing
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rejects_windows_over_sixty_days(self):
+        response = self.client.get(self.url, {'days': 61})
+        self.assertEqual(response.status_code, 400)
+
+
+class AvailabilityCacheTestsMixin:
+    """
+    Cached available-times answers, run against each supported cache backend
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = make_service(max_participants=3)
+        self.date = timezone.now().date() + timedelta(days=2)
+        self.slot = time(9, 0)
+
+    def spots_left(self):
+        capacity = async_to_sync(aget_capacity)(self.service, self.date)
+        return capacity.spots_left(self.service, self.date, self.slot)
+
+    def book(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_booking(self.user, self.service, kwargs.pop('date', self.date), self.slot, **kwargs)
+
+    def test_second_lookup_is_a_hit(self):
+        self.assertEqual(self.spots_left(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.spots_left(), 3)
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_booking_changes_invalidate_the_day(self):
+        self.spots_left()
+
+        booking = self.book(participants=2)
+        self.assertEqual(self.spots_left(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertEqual(self.spots_left(), 3)
+        self.assertEqual(cache_stats()['misses'], 3)
+
+    def test_bookings_on_other_days_keep_the_entry(self):
+        self.spots_left()
+        self.book(date=self.date + timedelta(days=1))
+
+        self.spots_left()
+        self.assertEqual(cache_stats()['hits'], 1)
+
+    def test_evicted_generation_never_matches_old_entries(self):
+        self.spots_left()
+        # Entry stored before any bump; then the generation key is culled
+        cache.delete(generation_key(self.service.pk, self.date))
+        Booking.objects.create(
+            user=self.user, service=self.service, date=self.date, start_time=self.slot,
+            end_time=time(10, 0), participants=2,
+        )
+
+        self.assertEqual(self.spots_left(), 1)
+
+    def test_capacity_changes_need_no_invalidation(self):
+        self.spots_left()
+        self.service.max_participants = 5
+        self.service.save()
+
+        self.assertEqual(self.spots_left(), 5)
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'availability-tests',
+}})
+class LocMemAvailabilityCacheTests(AvailabilityCacheTestsMixin, TestCase):
+    pass
+
+
+class FileAvailabilityCacheTests(AvailabilityCacheTestsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.cache_dir.name,
+        }}))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_dir.cleanup()
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'availability_test_cache',
+}})
+class DatabaseAvailabilityCacheTests(AvailabilityCacheTestsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('createcachetable', verbosity=0)
+
+    def test_second_lookup_is_a_hit(self):
+        # Every lookup reads the cache table itself, so only check the counters
+        self.spots_left()
+        self.spots_left()
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class OverlapDetectionTests(TestCase):
+    """
+    Conflicts cover the whole session, not just a shared start time
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.other = User.objects.create_user(username='other', password='pw')
+        self.mma = make_service(
+            name='MMA Training', duration_minutes=90, max_participants=10, requires_membership=False
+        )
+        self.trainer = TrainerProfile.objects.create(
+            user=User.objects.create_user(username='coach', first_name='Coach', last_name='Carter'),
+            certifications='Certified',
+            specializations='mma',
+            hourly_rate=300,
+            bio='Coach',
+        )
+        self.date = timezone.now().date() + timedelta(days=3)
+        # Holds [09:00, 10:30)
+        make_booking(self.other, self.mma, self.date, time(9, 0), end_time=time(10, 30), trainer=self.trainer)
+
+    def form(self, start_time, user=None, **data):
+        data = {
+            'service': self.mma.id,
+            'date': self.date.isoformat(),
+            'start_time': start_time,
+            'participants': 1,
+            **data,
+        }
+        return BookingForm(data, user=user or self.user)
+
+    def test_trainer_is_busy_until_the_session_ends(self):
+        form = self.form('10:00', trainer=self.trainer.id)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Coach Carter is not available at this time.', form.non_field_errors())
+
+        self.assertTrue(self.form('11:00', trainer=self.trainer.id).is_valid())
+
+    def test_member_cannot_double_book_overlapping_sessions(self):
+        form = self.form('10:00', user=self.other)
+        self.assertFalse(form.is_valid())
+        self.assertIn('You already have a booking at this time.', form.non_field_errors())
+
+    def test_overlapping_treats_sessions_as_half_open(self):
+        bookings = Booking.objects.filter(trainer=self.trainer)
+        self.assertTrue(bookings.overlapping(self.date, time(8, 0), time(9, 30)).exists())
+        self.assertTrue(bookings.overlapping(self.date, time(10, 0), time(11, 0)).exists())
+        self.assertFalse(bookings.overlapping(self.date, time(10, 30), time(11, 30)).exists())
+        self.assertFalse(bookings.overlapping(self.date, time(8, 0), time(9, 0)).exists())
+
+    def test_editing_a_booking_ignores_itself(self):
+        booking = Booking.objects.get(user=self.other)
+        form = BookingForm(
+            {'service': self.mma.id, 'date': self.date.isoformat(), 'start_time': '09:00',
+             'participants': 1, 'trainer': self.trainer.id},
+            instance=booking, user=self.other,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+class TrainerScheduleTests(TestCase):
+    """
+    Quarter-hour trainer masks and automatic assignment
+    """
+
+    def setUp(self):
+        self.member = User.objects.create_user(username='member', password='pw')
+        self.other = User.objects.create_user(username='other', password='pw')
+        self.service = make_service(
+            name='MMA Training', service_type='mma_session', duration_minutes=90,
+            max_participants=10, requires_membership=False,
+        )
+        self.date = timezone.now().date() + timedelta(days=2)
+        self.busy = self.make_trainer('busy', 'mma')
+        self.light = self.make_trainer('light', 'boxing')
+        self.yogi = self.make_trainer('yogi', 'yoga')
+        # busy holds [09:00, 10:30); light holds [15:00, 16:00)
+        make_booking(self.other, self.service, self.date, time(9, 0), end_time=time(10, 30), trainer=self.busy)
+        make_booking(self.other, self.service, self.date, time(15, 0), end_time=time(16, 0), trainer=self.light)
+
+    def make_trainer(self, name, specialization, **kwargs):
+        return TrainerProfile.objects.create(
+            user=User.objects.create_user(username=name),
+            certifications='Certified',
+            specializations=specialization,
+            hourly_rate=300,
+            bio='Coach',
+            **kwargs,
+        )
+
+    def test_quarter_mask_rounds_partial_quarters_up(self):
+        self.assertEqual(quarter_mask(time(0, 0), time(0, 15)), 0b1)
+        self.assertEqual(quarter_mask(time(0, 15), time(0, 40)), 0b110)
+        self.assertEqual(quarter_mask(time(23, 45), time(0, 0)).bit_length(), QUARTERS_PER_DAY)
+
+    def test_free_trainers_respects_whole_session(self):
+        trainers = list(trainers_for_service(self.service))
+        with self.assertNumQueries(3):
+            schedule = TrainerSchedule.build(trainers, self.date, member_id=self.member.id)
+
+        self.assertEqual(schedule.free_trainers(self.date, time(10, 0), time(11, 30)), [self.light])
+        self.assertEqual(schedule.free_trainers(self.date, time(10, 30), time(12, 0)), [self.busy, self.light])
+
+    def test_picks_the_lightest_free_trainer(self):
+        schedule = TrainerSchedule.build([self.busy, self.light], self.date, member_id=self.member.id)
+
+        self.assertEqual(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)), self.light)
+        # The claim counts towards the next pick
+        self.assertEqual(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)), self.busy)
+        self.assertIsNone(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)))
+
+    def test_full_trainers_only_take_existing_clients(self):
+        full = self.make_trainer('full', 'mma', max_clients=1)
+        make_booking(self.member, self.service, self.date + timedelta(days=1), time(9, 0), trainer=full)
+        newcomer = User.objects.create_user(username='newcomer')
+
+        schedule = TrainerSchedule.build([full], self.date, member_id=newcomer.id)
+        self.assertIsNone(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)))
+
+        schedule = TrainerSchedule.build([full], self.date, member_id=self.member.id)
+        self.assertEqual(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)), full)
+
+    def test_client_counts_load_with_the_schedule(self):
+        full = [self.make_trainer(f'full{i}', 'mma', max_clients=1) for i in range(6)]
+        for trainer in full:
+            make_booking(self.other, self.service, self.date + timedelta(days=1), time(9, 0), trainer=trainer)
+        newcomer = User.objects.create_user(username='newcomer')
+
+        # Masks, regulars and every candidate's client count - however many are checked
+        with self.assertNumQueries(3):
+            schedule = TrainerSchedule.build(full, self.date, member_id=newcomer.id)
+            self.assertIsNone(pick_trainer(schedule, self.date, time(12, 0), time(13, 30)))
+        self.assertEqual([schedule.client_count(trainer) for trainer in full], [1] * 6)
+
+    def test_create_view_assigns_a_trainer(self):
+        self.client.force_login(self.member)
+        self.client.post(reverse('bookings:booking_create'), {
+            'service': self.service.id,
+            'date': self.date.isoformat(),
+            'start_time': '10:00',
+            'participants': 1,
+        })
+
+        booking = Booking.objects.get(start_time=time(10, 0))
+        self.assertEqual(booking.trainer, self.light)
+        self.assertEqual(booking.end_time, time(11, 30))
+
+    def test_group_class_keeps_the_sessions_trainer(self):
+        hiit = make_service(max_participants=10)
+        trainers = []
+        for member in [self.member, self.other, User.objects.create_user(username='third')]:
+            booking = reserve(Booking(
+                user=member, service=hiit, date=self.date, start_time=time(12, 0), end_time=time(13, 0),
+            ), auto_assign=True)
+            trainers.append(booking.trainer)
+
+        # The lightest day would have moved on to another trainer each time
+        self.assertIsNotNone(trainers[0])
+        self.assertEqual(trainers, [trainers[0]] * 3)
+
+    def test_trainer_is_picked_once_the_spot_is_claimed(self):
+        solo = make_service(name='Solo', max_participants=1)
+        make_booking(self.other, solo, self.date, time(12, 0))
+
+        with mock.patch('bookings.reservations.assign_trainer') as assign, self.assertRaises(ValidationError):
+            reserve(Booking(
+                user=self.member, service=solo, date=self.date, start_time=time(12, 0), end_time=time(13, 0),
+            ), auto_assign=True)
+        assign.assert_not_called()
+
+
+class SlotGenerationTests(TestCase):
+    """
+    Slots are materialised ahead of time from each service's opening hours
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.today = timezone.now().date()
+        self.early = make_service(name='Sunrise Yoga', opens_at=time(6, 0), closes_at=time(9, 0), max_participants=4)
+
+    def test_service_slot_times_finish_by_closing(self):
+        mma = make_service(name='MMA', duration_minutes=90, opens_at=time(17, 0), closes_at=time(21, 0))
+        self.assertEqual(mma.slot_times(), [time(17, 0), time(18, 0), time(19, 0)])
+
+    def test_generate_slots_covers_horizon_and_counts_existing_bookings(self):
+        make_booking(self.user, self.early, self.today + timedelta(days=1), time(7, 0), participants=3)
+        Slot.objects.all().delete()
+
+        call_command('generate_slots', days=3, stdout=StringIO())
+
+        self.assertEqual(Slot.objects.filter(service=self.early).count(), 3 * 3)
+        slot = Slot.objects.get(service=self.early, date=self.today + timedelta(days=1), start_time=time(7, 0))
+        self.assertEqual((slot.capacity, slot.booked), (4, 3))
+
+        # Re-running leaves existing rows alone
+        call_command('generate_slots', days=3, stdout=StringIO())
+        self.assertEqual(Slot.objects.filter(service=self.early).count(), 3 * 3)
+
+    def test_prune_drops_empty_slots_outside_opening_hours(self):
+        call_command('generate_slots', days=2, stdout=StringIO())
+        self.early.closes_at = time(8, 0)
+        self.early.save()
+
+        call_command('generate_slots', days=2, prune=True, stdout=StringIO())
+
+        self.assertFalse(Slot.objects.filter(service=self.early, start_time=time(8, 0)).exists())
+
+    def test_availability_follows_opening_hours(self):
+        late = make_service(name='Night Boxing', opens_at=time(19, 0), closes_at=time(21, 0))
+        grid = AvailabilityGrid([self.early, late], self.today, days=1)
+
+        self.assertEqual(grid.times, [time(6, 0), time(7, 0), time(8, 0), time(19, 0), time(20, 0)])
+        self.assertEqual(grid.spots_left(late, self.today, time(7, 0)), 0)
+        self.assertEqual(
+            [(slot['service'], slot['time']) for slot in grid][:3],
+            [(self.early, time(6, 0)), (self.early, time(7, 0)), (self.early, time(8, 0))],
+        )
+
+    def test_form_rejects_times_outside_opening_hours(self):
+        self.early.requires_membership = False
+        self.early.save()
+        form = BookingForm({
+            'service': self.early.id,
+            'date': (self.today + timedelta(days=1)).isoformat(),
+            'start_time': '10:00',
+            'participants': 1,
+        }, user=self.user)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('Sunrise Yoga sessions run between', form.non_field_errors()[0])
+
+
+class ReservationStressTests(TransactionTestCase):
+    """
+    Class-release rush: many members grab the same HIIT slot at once.
+    """
+    workers = 8
+    attempts = 60
+
+    def setUp(self):
+        self.service = make_service(max_participants=15)
+        self.users = [
+            User.objects.create_user(username=f'member{i}') for i in range(self.attempts)
+        ]
+        self.date = timezone.now().date() + timedelta(days=2)
+        self.slot = time(18, 0)
+
+    def grab_slot(self, user):
+        try:
+            reserve(Booking(
+                user=user,
+                service=self.service,
+                date=self.date,
+                start_time=self.slot,
+                end_time=time(19, 0),
+            ))
+            return True
+        except ValidationError:
+            return False
+        finally:
+            connection.close()
+
+    def test_concurrent_reservations_never_overbook(self):
+        started = timer.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.grab_slot, self.users))
+        elapsed = timer.perf_counter() - started
+
+        booked = Booking.objects.filter(
+            service=self.service, date=self.date, start_time=self.slot
+        ).count()
+        slot = Slot.objects.get(service=self.service, date=self.date, start_time=self.slot)
+
+        self.assertEqual(results.count(True), 15)
+        self.assertEqual(booked, 15)
+        self.assertEqual(slot.booked, 15)
+        # Generous ceiling - the point is that contention does not serialize into seconds per request
+        self.assertLess(elapsed, 10, f'{self.attempts} reservations took {elapsed:.2f}s')
+
+    def test_cancellation_frees_the_spot(self):
+        service = make_service(name='Personal Training', max_participants=1)
+        booking = reserve(Booking(
+            user=self.users[0], service=service, date=self.date,
+            start_time=self.slot, end_time=time(19, 0),
+        ))
+        with self.assertRaises(ValidationError):
+            reserve(Booking(
+                user=self.users[1], service=service, date=self.date,
+                start_time=self.slot, end_time=time(19, 0),
+            ))
+
+        booking.status = 'cancelled'
+        booking.save()
+        reserve(Booking(
+            user=self.users[1], service=service, date=self.date,
+            start_time=self.slot, end_time=time(19, 0),
+        ))
+        self.assertEqual(Slot.objects.get(service=service).booked, 1)
+
+
+class BookingListViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = make_service(max_participants=15)
+        today = timezone.now().date()
+        for i, status in enumerate(['confirmed', 'pending', 'completed', 'completed', 'cancelled'] * 3):
+            make_booking(self.user, self.service, today + timedelta(days=i - 5), time(9, 0), status=status)
+
+    def get(self, **params):
+        request = RequestFactory().get('/bookings/my-bookings/', params)
+        request.user = self.user
+        return BookingListView.as_view()(request)
+
+    def test_stats_and_page_take_two_queries(self):
+        active_services.all()
+        for params in ({}, {'status': 'completed'}, {'status': 'confirmed', 'service': self.service.id}):
+            with self.assertNumQueries(2):
+                response = self.get(**params)
+                list(response.context_data['bookings'])
+
+    def test_stats_match_filtered_bookings(self):
+        stats = self.get().context_data['stats']
+        self.assertEqual(stats['total_bookings'], 15)
+        self.assertEqual(stats['completed_sessions'], 6)
+        self.assertEqual(stats['cancelled_sessions'], 3)
+
+        response = self.get(status='completed')
+        self.assertEqual(response.context_data['paginator'].count, 6)
+        self.assertEqual(response.context_data['stats']['total_bookings'], 6)
+
+
+class BookingPageQueryCountTests(TestCase):
+    """
+    Lock in the query count of every booking page. Bookings here each have a
+    different trainer, so a lazy FK lookup in a template shows up as extra queries.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='member', password='pw', first_name='Jane', last_name='Doe'
+        )
+        self.service = make_service(max_participants=15)
+        today = timezone.now().date()
+        for i in range(4):
+            trainer_user = User.objects.create_user(
+                username=f'trainer{i}', first_name='Coach', last_name=str(i)
+            )
+            trainer = TrainerProfile.objects.create(
+                user=trainer_user,
+                certifications='Certified',
+                specializations='strength',
+                hourly_rate=300,
+                bio='Coach',
+            )
+            make_booking(self.user, self.service, today + timedelta(days=i + 1), time(9, 0), trainer=trainer)
+            make_booking(self.user, self.service, today - timedelta(days=i + 1), time(9, 0),
+                         trainer=trainer, status='completed')
+        self.client.force_login(self.user)
+
+    def assertPageQueries(self, url, num):
+        # Steady state: the service and trainer catalogs are already loaded in this worker
+        active_services.all()
+        accepting_trainers.all()
+        # session and user, then the page's own queries
+        with self.assertNumQueries(2 + num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_booking_list(self):
+        # stats aggregate, page of bookings
+        self.assertPageQueries('/bookings/my-bookings/', 2)
+
+    def test_booking_calendar(self):
+        # capacity for the slot grid
+        self.assertPageQueries('/bookings/calendar/', 1)
+
+    def test_booking_create(self):
+        self.assertPageQueries('/bookings/create/', 0)
+
+    def test_booking_success(self):
+        self.assertPageQueries('/bookings/success/', 1)
+
+
+class BookingFormConstructionTests(TestCase):
+    """
+    Booking forms are built from shared choice lists and catalog snapshots;
+    only the date bounds are worked out per form
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', password='pw')
+        self.service = make_service(opens_at=time(7, 0), closes_at=time(10, 0))
+        trainer_user = User.objects.create_user(username='coach', first_name='Coach', last_name='Carter')
+        self.trainer = TrainerProfile.objects.create(
+            user=trainer_user, certifications='Certified', specializations='strength',
+            hourly_rate=300, bio='Coach',
+        )
+
+    def test_render_needs_no_queries(self):
+        active_services.all()
+        accepting_trainers.all()
+
+        with self.assertNumQueries(0):
+            html = str(BookingForm(user=self.user)) + str(QuickBookingForm())
+
+        self.assertIn('Coach Carter', html)
+        self.assertIn('HIIT Group Class', html)
+        self.assertIn('08:00 PM', html)
+
+    def test_date_bounds_follow_the_clock(self):
+        later = timezone.now() + timedelta(days=400)
+        with mock.patch('bookings.forms.timezone.now', return_value=later):
+            attrs = BookingForm(user=self.user).fields['date'].widget.attrs
+
+        self.assertEqual(attrs['min'], later.date().isoformat())
+        self.assertEqual(attrs['max'], (later.date() + timedelta(days=60)).isoformat())
+
+    def test_editing_offers_the_services_times(self):
+        booking = make_booking(self.user, self.service, timezone.now().date() + timedelta(days=1), time(8, 0))
+
+        choices = BookingForm(instance=booking, user=self.user).fields['start_time'].widget.choices
+
+        self.assertEqual([value for value, _ in choices], ['', '07:00', '08:00', '09:00'])
+        # Built once for these opening hours
+        self.assertIs(time_choices(time(7, 0), time(10, 0), 60), time_choices(time(7, 0), time(10, 0), 60))
+
+    def test_trainer_name_change_reaches_the_choices(self):
+        accepting_trainers.all()
+        self.trainer.user.last_name = 'Kent'
+        self.trainer.user.save()
+
+        self.assertIn('Coach Kent', str(BookingForm(user=self.user)['trainer']))
@@ -0,0 +1,203 @@
+# bookings/trainers.py
+"""
+Trainer availability - who is free to run this session?
+
+Each trainer's day is an int bitmask of occupied quarter-hours (bit 0 is
+00:00-00:15, bit 95 is 23:45-24:00). A session is free for a trainer when
+its own mask ANDs to zero with theirs, so checking every trainer for a
+slot is one bit operation each. The masks for any number of trainers and
+dates are built in bulk - two Booking queries, whatever the team size.
+"""
+from collections import defaultdict
+
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.models import TrainerProfile
+
+from .models import Booking
+
+QUARTER_MINUTES = 15
+QUARTERS_PER_DAY = 24 * 60 // QUARTER_MINUTES
+
+# Trainer specialisations that can run each service type (None: anyone)
+SERVICE_SPECIALIZATIONS = {
+    'personal_training': ['personal_training', 'strength'],
+    'group_class': None,
+    'mma_session': ['mma', 'boxing'],
+    'consultation': ['nutrition', 'personal_training'],
+    'assessment': ['physiotherapy', 'strength', 'personal_training'],
+}
+
+# Service types run as one session for everyone booked into the slot
+GROUP_SERVICE_TYPES = ['group_class']
+
+
+def quarter_mask(start_time, end_time):
+    """
+    Bitmask of the quarter-hours [start_time, end_time) touches. A session
+    ending mid-quarter still occupies that quarter; one running past
+    midnight occupies the rest of the day.
+    """
+    first = (start_time.hour * 60 + start_time.minute) // QUARTER_MINUTES
+    end_minutes = end_time.hour * 60 + end_time.minute
+    if end_time <= start_time:
+        end_minutes = QUARTERS_PER_DAY * QUARTER_MINUTES
+    last = -(-end_minutes // QUARTER_MINUTES)  # round up
+    return ((1 << last) - 1) ^ ((1 << first) - 1)
+
+
+def trainers_for_service(service):
+    """Trainers accepting clients whose specialisation fits the service."""
+    trainers = TrainerProfile.objects.filter(is_accepting_clients=True).order_by('id')
+    specializations = SERVICE_SPECIALIZATIONS.get(service.service_type)
+    if specializations:
+        trainers = trainers.filter(specializations__in=specializations)
+    return trainers
+
+
+class TrainerSchedule:
+    """
+    Occupied quarter-hours per trainer per day, for one member looking for
+    a trainer. max_clients is checked per candidate: trainers who already
+    train the member always have room, anyone else needs fewer than
+    max_clients members with upcoming sessions.
+    """
+
+    def __init__(self, trainers, busy=None, member_id=None, regulars=(), clients_from=None, client_counts=None):
+        self.trainers = list(trainers)
+        self.member_id = member_id
+        self.clients_from = clients_from
+        self._busy = busy or {}
+        self._regulars = set(regulars)
+        # Loaded up front by build(); otherwise one query per trainer asked about
+        self._counts_loaded = client_counts is not None
+        self._client_counts = dict(client_counts or {})
+
+    @classmethod
+    def build(cls, trainers, start_date, end_date=None, member_id=None, clients_from=None):
+        """
+        Load masks for `trainers` between start_date and end_date
+        (inclusive), the member's current trainers and every trainer's
+        client count - three queries, however many trainers there are.
+
+        Clients are counted from bookings on or after `clients_from`
+        (default: start_date).
+        """
+        trainers = list(trainers)
+        end_date = end_date or start_date
+        clients_from = clients_from or start_date
+        active = Booking.objects.filter(
+            trainer_id__in=[trainer.pk for trainer in trainers],
+            status__in=Booking.ACTIVE_STATUSES,
+        )
+
+        busy = defaultdict(int)
+        sessions = active.filter(date__range=(start_date, end_date)).values_list(
+            'trainer_id', 'date', 'start_time', 'end_time'
+        ).order_by()
+        for trainer_id, day, start_time, end_time in sessions.iterator(chunk_size=5000):
+            busy[trainer_id, day] |= quarter_mask(start_time, end_time)
+
+        regulars = ()
+        if member_id is not None:
+            regulars = active.filter(date__gte=clients_from, user_id=member_id).values_list(
+                'trainer_id', flat=True
+            ).distinct().order_by()
+
+        client_counts = active.filter(date__gte=clients_from).values('trainer').annotate(
+            clients=Count('user', distinct=True)
+        ).values_list('trainer', 'clients').order_by()
+
+        return cls(
+            trainers, busy=dict(busy), member_id=member_id,
+            regulars=regulars, clients_from=clients_from, client_counts=dict(client_counts),
+        )
+
+    # Lookups
+
+    def busy_mask(self, trainer, day):
+        return self._busy.get((trainer.pk, day), 0)
+
+    def is_free(self, trainer, day, mask):
+        return not self.busy_mask(trainer, day) & mask
+
+    def free_trainers(self, day, start_time, end_time):
+        """Trainers with nothing booked in [start_time, end_time) - one AND each."""
+        mask = quarter_mask(start_time, end_time)
+        return [trainer for trainer in self.trainers if self.is_free(trainer, day, mask)]
+
+    def booked_quarters(self, trainer, day):
+        return self.busy_mask(trainer, day).bit_count()
+
+    def client_count(self, trainer):
+        """Members with upcoming sessions with the trainer."""
+        if trainer.pk not in self._client_counts:
+            if self._counts_loaded:
+                return 0
+            self._client_counts[trainer.pk] = Booking.objects.filter(
+                trainer=trainer,
+                date__gte=self.clients_from,
+                status__in=Booking.ACTIVE_STATUSES,
+            ).values('user_id').distinct().order_by().count()
+        return self._client_counts[trainer.pk]
+
+    def has_room(self, trainer):
+        """Under max_clients, or already training this schedule's member."""
+        return trainer.pk in self._regulars or self.client_count(trainer) < trainer.max_clients
+
+    # Maintenance
+
+    def claim(self, trainer, day, start_time, end_time):
+        """Record an assignment so later lookups on this schedule see it."""
+        key = (trainer.pk, day)
+        self._busy[key] = self._busy.get(key, 0) | quarter_mask(start_time, end_time)
+        if trainer.pk not in self._regulars:
+            self._regulars.add(trainer.pk)
+            self._client_counts[trainer.pk] = self.client_count(trainer) + 1
+
+
+def pick_trainer(schedule, day, start_time, end_time):
+    """
+    The free trainer with the lightest day (fewest booked quarter-hours)
+    who has room for the member, so auto-assigned sessions spread across
+    the team. None if nobody is free.
+    """
+    free = schedule.free_trainers(day, start_time, end_time)
+    for trainer in sorted(free, key=lambda trainer: schedule.booked_quarters(trainer, day)):
+        if schedule.has_room(trainer):
+            schedule.claim(trainer, day, start_time, end_time)
+            return trainer
+    return None
+
+
+def session_trainer(booking):
+    """The trainer already running the booking's group session, or None."""
+    return TrainerProfile.objects.filter(
+        booking__service_id=booking.service_id,
+        booking__date=booking.date,
+        booking__start_time=booking.start_time,
+        booking__status__in=Booking.ACTIVE_STATUSES,
+    ).order_by('booking__created_at').first()
+
+
+def assign_trainer(booking, today=None):
+    """
+    Pick a trainer for a booking left on "automatic assignment". Returns
+    the trainer (not saved on the booking) or None if nobody is free.
+
+    Group sessions keep the trainer the slot's earlier bookings were given.
+    Call it while holding the slot (see reservations.reserve), so members
+    booking the same class at once can't each get a different trainer.
+    """
+    if booking.service.service_type in GROUP_SERVICE_TYPES:
+        trainer = session_trainer(booking)
+        if trainer is not None:
+            return trainer
+
+    today = today or timezone.now().date()
+    schedule = TrainerSchedule.build(
+        trainers_for_service(booking.service), booking.date,
+        member_id=booking.user_id, clients_from=min(today, booking.date),
+    )
+    return pick_trainer(schedule, booking.date, booking.start_time, booking.end_time)
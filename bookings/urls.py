@@ -24,4 +24,5 @@ urlpatterns = [
     
     # AJAX endpoints
     path('api/available-times/', views.get_available_times, name='get_available_times'),
+    path('api/availability-grid/', views.availability_grid, name='availability_grid'),
 ]
\ No newline at end of file
@@ -6,34 +6,47 @@ from django.views.generic import ListView, CreateView
 from django.utils.decorators import method_decorator
 from django.urls import reverse_lazy
 from django.http import JsonResponse
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from datetime import datetime, timedelta, time
+from itertools import islice
+import hashlib
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, Count, Max
+from django.views.decorators.http import condition
 
 from .models import Service, Booking
 from .forms import BookingForm
+from .availability import AvailabilityGrid, iter_available_slots, slot_times
+from .caching import aget_capacity
+from .capacity import CapacityIndex
+from .intervals import session_end
+from .reservations import reserve
 from accounts.models import TrainerProfile
+from core.caching import cache_anonymous_page
+from core.catalog import active_services
 
+@cache_anonymous_page(catalogs=[active_services])
 def services_list(request):
     """
     Public services catalog - quest selection screen
     No login required for browsing.
     """
-    services = Service.objects.filter(is_active=True)
+    services = active_services.all()
     
     # Filter by service type
     service_type = request.GET.get('type')
     if service_type:
-        services = services.filter(service_type=service_type)
+        services = [service for service in services if service.service_type == service_type]
     
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        services = services.filter(
-            Q(name__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
+        needle = search_query.casefold()
+        services = [
+            service for service in services
+            if needle in service.name.casefold() or needle in service.description.casefold()
+        ]
     
     # Pagination
     paginator = Paginator(services, 9)  # 9 services per page
@@ -42,6 +55,7 @@ def services_list(request):
     
     context = {
         'services': page_obj,
+        'page_obj': page_obj,
         'service_types': Service.SERVICE_TYPES,
         'current_filters': {
             'type': service_type or '',
@@ -58,46 +72,26 @@ def booking_calendar(request):
     Interactive calendar view - like a raid planner for gym sessions.
     Shows all available services and time slots.
     """
-    services = Service.objects.filter(is_active=True)
+    services = active_services.all()
     service_filter = request.GET.get('service', '')
     
     if service_filter:
-        services = services.filter(id=service_filter)
+        services = [service for service in services if str(service.id) == service_filter]
     
-    available_slots = []
     start_date = timezone.now().date()
     
-    for i in range(30):  # Next 30 days
-        current_date = start_date + timedelta(days=i)
-        
-        for hour in range(9, 21):  # 9 AM to 8 PM
-            slot_time = time(hour, 0)
-            
-            for service in services:
-                existing_bookings = Booking.objects.filter(
-                    service=service,
-                    date=current_date,
-                    start_time=slot_time,
-                    status__in=['pending', 'confirmed']
-                ).count()
-                
-                if existing_bookings < service.max_participants:
-                    available_slots.append({
-                        'date': current_date,
-                        'time': slot_time,
-                        'service': service,
-                        'spots_left': service.max_participants - existing_bookings
-                    })
-    
-    user_bookings = Booking.objects.filter(
+    # One grouped query for the whole window; stop once we have 50 open slots
+    available_slots = list(islice(iter_available_slots(services, start_date, days=30), 50))
+    
+    user_bookings = Booking.objects.with_related().filter(
         user=request.user,
         date__gte=timezone.now().date(),
         status__in=['pending', 'confirmed']
     ).order_by('date', 'start_time')[:5]
     
     context = {
-        'services': Service.objects.filter(is_active=True),
-        'available_slots': available_slots[:50],
+        'services': active_services.all(),
+        'available_slots': available_slots,
         'user_bookings': user_bookings,
         'selected_service': service_filter,
         'today': start_date,
@@ -125,47 +119,49 @@ class BookingCreateView(CreateView):
         form.instance.user = self.request.user
         
         service = form.instance.service
-        start_datetime = datetime.combine(form.instance.date, form.instance.start_time)
-        end_datetime = start_datetime + timedelta(minutes=service.duration_minutes)
-        form.instance.end_time = end_datetime.time()
+        form.instance.end_time = session_end(
+            form.instance.date, form.instance.start_time, service.duration_minutes
+        )
         form.instance.amount_paid = service.price
         
-        # Check for user conflicts
-        conflicting_bookings = Booking.objects.filter(
-            user=self.request.user,
-            date=form.instance.date,
-            start_time=form.instance.start_time,
-            status__in=['pending', 'confirmed']
+        # Check for user conflicts - any session overlapping this one
+        conflicting_bookings = Booking.objects.filter(user=self.request.user).overlapping(
+            form.instance.date, form.instance.start_time, form.instance.end_time
         )
         if conflicting_bookings.exists():
             messages.error(self.request, 'You already have a booking at this time!')
             return self.form_invalid(form)
         
-        # Check capacity
-        existing_bookings = Booking.objects.filter(
-            service=service,
-            date=form.instance.date,
-            start_time=form.instance.start_time,
-            status__in=['pending', 'confirmed']
-        ).count()
-        if existing_bookings >= service.max_participants:
+        # Check capacity - reuse the index the form already loaded
+        capacity = getattr(form, 'capacity_index', None) or CapacityIndex.build(
+            [service], form.instance.date
+        )
+        if not capacity.has_room(service, form.instance.date, form.instance.start_time, form.instance.participants):
             messages.error(self.request, 'This time slot is fully booked!')
             return self.form_invalid(form)
         
+        # Claim the spot and insert the booking in one transaction; no
+        # trainer picked means automatic assignment, done inside it
+        try:
+            self.object = reserve(form.instance, auto_assign=True)
+        except ValidationError as e:
+            messages.error(self.request, e.messages[0])
+            return self.form_invalid(form)
+        
         messages.success(self.request, f'Booking created successfully! Your {service.name} session is scheduled.')
-        return super().form_valid(form)
+        return redirect(self.get_success_url())
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         service_id = self.request.GET.get('service_id')
         if service_id:
             try:
-                context['selected_service'] = get_object_or_404(Service, id=service_id)
-            except Exception:
+                context['selected_service'] = active_services.get(int(service_id))
+            except ValueError:
                 pass
         
-        context['services'] = Service.objects.filter(is_active=True)
-        context['trainers'] = TrainerProfile.objects.filter(is_accepting_clients=True)
+        context['services'] = active_services.all()
+        context['trainers'] = TrainerProfile.objects.select_related('user').filter(is_accepting_clients=True)
         return context
 
 # ---
@@ -175,7 +171,7 @@ def booking_success(request):
     """
     Booking confirmation page - quest accepted screen.
     """
-    latest_booking = Booking.objects.filter(user=request.user).order_by('-created_at').first()
+    latest_booking = Booking.objects.with_related().filter(user=request.user).order_by('-created_at').first()
     context = {'booking': latest_booking}
     return render(request, 'bookings/booking_success.html', context)
 
@@ -192,7 +188,7 @@ class BookingListView(ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        queryset = Booking.objects.filter(user=self.request.user).order_by('-date', '-start_time')
+        queryset = Booking.objects.with_related().filter(user=self.request.user).order_by('-date', '-start_time')
         
         status_filter = self.request.GET.get('status')
         if status_filter and status_filter != 'all':
@@ -204,9 +200,29 @@ class BookingListView(ListView):
         
         return queryset
     
+    def get_stats(self, queryset):
+        """All four journal stats in one conditional-aggregate query."""
+        today = timezone.now().date()
+        return queryset.aggregate(
+            total_bookings=Count('id'),
+            completed_sessions=Count('id', filter=Q(status='completed')),
+            upcoming_sessions=Count('id', filter=Q(
+                date__gte=today,
+                status__in=['pending', 'confirmed']
+            )),
+            cancelled_sessions=Count('id', filter=Q(status='cancelled')),
+        )
+    
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        # The stats total is the same filtered count - spare the paginator its COUNT(*)
+        self.stats = self.get_stats(queryset)
+        paginator.count = self.stats['total_bookings']
+        return paginator
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['services'] = Service.objects.filter(is_active=True)
+        context['services'] = active_services.all()
         context['status_choices'] = Booking.STATUS_CHOICES
         context['current_filters'] = {
             'status': self.request.GET.get('status', 'all'),
@@ -214,16 +230,9 @@ class BookingListView(ListView):
         }
         context['today'] = timezone.now().date()
         
-        bookings = self.get_queryset()
-        context['stats'] = {
-            'total_bookings': bookings.count(),
-            'completed_sessions': bookings.filter(status='completed').count(),
-            'upcoming_sessions': bookings.filter(
-                date__gte=timezone.now().date(),
-                status__in=['pending', 'confirmed']
-            ).count(),
-            'cancelled_sessions': bookings.filter(status='cancelled').count(),
-        }
+        if not hasattr(self, 'stats'):
+            self.stats = self.get_stats(self.object_list)
+        context['stats'] = self.stats
         return context
 
 # ---
@@ -295,30 +304,36 @@ def booking_reschedule(request, booking_id):
         form = BookingForm(request.POST, instance=booking, user=request.user)
         if form.is_valid():
             service = form.instance.service
-            start_datetime = datetime.combine(form.instance.date, form.instance.start_time)
-            end_datetime = start_datetime + timedelta(minutes=service.duration_minutes)
-            form.instance.end_time = end_datetime.time()
+            form.instance.end_time = session_end(
+                form.instance.date, form.instance.start_time, service.duration_minutes
+            )
             
-            form.save()
-            messages.success(request, 'Your booking has been rescheduled successfully!')
-            return redirect('bookings:booking_detail', booking_id=booking_id)
+            try:
+                reserve(form.instance)
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                messages.success(request, 'Your booking has been rescheduled successfully!')
+                return redirect('bookings:booking_detail', booking_id=booking_id)
     else:
         form = BookingForm(instance=booking, user=request.user)
     
     context = {
         'form': form,
         'booking': booking,
-        'services': Service.objects.filter(is_active=True),
-        'trainers': TrainerProfile.objects.filter(is_accepting_clients=True),
+        'services': active_services.all(),
+        'trainers': TrainerProfile.objects.select_related('user').filter(is_accepting_clients=True),
     }
     return render(request, 'bookings/booking_reschedule.html', context)
 
 # ---
 
 @login_required
-def get_available_times(request):
+async def get_available_times(request):
     """
     AJAX endpoint to get available times for a specific date and service.
+    Async - the booking form polls it on every dropdown change, so under
+    ASGI it should not hold a worker thread while the database answers.
     """
     service_id = request.GET.get('service_id')
     date_str = request.GET.get('date')
@@ -327,7 +342,7 @@ def get_available_times(request):
         return JsonResponse({'error': 'Missing parameters'}, status=400)
     
     try:
-        service = Service.objects.get(id=service_id, is_active=True)
+        service = await Service.objects.aget(id=service_id, is_active=True)
         booking_date = datetime.strptime(date_str, '%Y-%m-%d').date()
     except (Service.DoesNotExist, ValueError):
         return JsonResponse({'error': 'Invalid parameters'}, status=400)
@@ -335,21 +350,99 @@ def get_available_times(request):
     if booking_date < timezone.now().date():
         return JsonResponse({'times': []})
     
+    capacity = await aget_capacity(service, booking_date)
+    
     available_times = []
-    for hour in range(9, 21):
-        slot_time = time(hour, 0)
-        existing_bookings = Booking.objects.filter(
-            service=service,
-            date=booking_date,
-            start_time=slot_time,
-            status__in=['pending', 'confirmed']
-        ).count()
-        
-        if existing_bookings < service.max_participants:
+    for slot_time in slot_times(service):
+        spots_left = capacity.spots_left(service, booking_date, slot_time)
+        if spots_left > 0:
             available_times.append({
                 'time': slot_time.strftime('%H:%M'),
                 'display': slot_time.strftime('%I:%M %p'),
-                'spots_left': service.max_participants - existing_bookings
+                'spots_left': spots_left
             })
     
-    return JsonResponse({'times': available_times})
\ No newline at end of file
+    return JsonResponse({'times': available_times})
+
+# ---
+
+# Longest window the availability grid API will return
+MAX_GRID_DAYS = 60
+
+def _grid_request(request):
+    """
+    Parse ?start=YYYY-MM-DD&days=N&service_id=... for the grid API.
+    Returns (services, start_date, days), or None when the parameters are
+    invalid. Memoised on the request so the ETag check and the view share it.
+    """
+    if not hasattr(request, '_availability_grid'):
+        request._availability_grid = None
+        try:
+            start_str = request.GET.get('start')
+            start_date = (
+                datetime.strptime(start_str, '%Y-%m-%d').date() if start_str
+                else timezone.now().date()
+            )
+            days = int(request.GET.get('days', 30))
+            service_ids = [int(service_id) for service_id in request.GET.getlist('service_id')]
+        except ValueError:
+            return None
+        if not 1 <= days <= MAX_GRID_DAYS:
+            return None
+
+        services = active_services.all()
+        if service_ids:
+            services = [service for service in services if service.id in service_ids]
+        request._availability_grid = (list(services), start_date, days)
+    return request._availability_grid
+
+def availability_grid_etag(request):
+    """
+    ETag for the grid API - changes whenever a booking in the window is
+    created, edited, moved or deleted, or a service's name, capacity,
+    opening hours or session length (which set its slot times) change.
+    """
+    params = _grid_request(request)
+    if params is None:
+        return None
+    services, start_date, days = params
+    end_date = start_date + timedelta(days=days - 1)
+
+    changes = Booking.objects.filter(
+        service__in=services,
+        date__range=(start_date, end_date),
+    ).aggregate(latest=Max('updated_at'), total=Count('id'))
+
+    signature = [
+        start_date.isoformat(),
+        str(days),
+        timezone.now().date().isoformat(),
+        *(
+            f'{service.pk}:{service.max_participants}:{service.name}:'
+            f'{service.opens_at}:{service.closes_at}:{service.duration_minutes}'
+            for service in services
+        ),
+        str(changes['latest']),
+        str(changes['total']),
+    ]
+    return hashlib.md5('|'.join(signature).encode(), usedforsecurity=False).hexdigest()
+
+@login_required
+@condition(etag_func=availability_grid_etag)
+def availability_grid(request):
+    """
+    AJAX endpoint for the calendar - spots left for every service, day and
+    hour in a window of up to 60 days, as a compact columnar grid.
+    Supports conditional GET, so re-fetching an unchanged window is a 304.
+    """
+    params = _grid_request(request)
+    if params is None:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    
+    services, start_date, days = params
+    grid = AvailabilityGrid(services, start_date, days=days)
+    
+    return JsonResponse({
+        'start': start_date.isoformat(),
+        **grid.columns(today=timezone.now().date()),
+    })
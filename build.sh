@@ -4,6 +4,9 @@ set -e
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+echo "Building asset bundles..."
+python manage.py build_assets
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
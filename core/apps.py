@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks  # noqa: F401
+        from .catalog import CATALOGS
+        from .database import tune_sqlite
+
+        connection_created.connect(tune_sqlite, dispatch_uid='core.tune_sqlite')
+        for catalog in CATALOGS:
+            catalog.connect()
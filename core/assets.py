@@ -0,0 +1,168 @@
+# core/assets.py
+"""
+Static asset pipeline - one stylesheet, one script and a handful of icon
+fonts, all served from our own origin.
+
+build() writes into static/dist:
+
+    app.css     Bootstrap + the Font Awesome rules for icons the templates
+                use + our own CSS, minified
+    app.js      Bootstrap's bundle + our own scripts, minified
+    webfonts/   the Font Awesome fonts cut down to those same icons
+
+Sources live in assets/ (vendor/ holds the upstream builds, src/ ours), so
+collectstatic only ever publishes the bundles. collectstatic then gives
+every file a content-hashed name and writes .gz and .br copies next to it
+(see core/storage.py); WhiteNoise serves the hashed names with a
+far-future immutable Cache-Control.
+"""
+import gzip
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import brotli
+import rcssmin
+import rjsmin
+from django.conf import settings
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+VENDOR_CSS = ['vendor/bootstrap/bootstrap.min.css', 'vendor/fontawesome/all.min.css']
+VENDOR_JS = ['vendor/bootstrap/bootstrap.bundle.min.js']
+FONTS = ['fa-solid-900', 'fa-regular-400', 'fa-brands-400', 'fa-v4compatibility']
+
+# Where icon class names can appear
+ICON_SOURCES = ['templates/**/*.html', '*/templates/**/*.html', 'assets/src/*.js', 'assets/src/*.css']
+
+ICON_NAME = re.compile(r'\bfa-[a-z0-9]+(?:-[a-z0-9]+)*')
+# `.fa-house:before,.fa-home:before{content:"\f015"}` - one icon, every alias
+ICON_RULE = re.compile(r'((?:\.fa-[a-z0-9-]+:{1,2}before,?)+)\{content:"([^"]*)"\}')
+CSS_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6}) ?|\\(.)')
+SOURCE_MAP = re.compile(r'^\s*(?:/\*# sourceMappingURL=\S+ \*/|//# sourceMappingURL=\S+)\s*$', re.MULTILINE)
+
+
+@dataclass
+class Asset:
+    name: str
+    size: int
+    gzip_size: int
+    brotli_size: int
+
+
+def assets_dir():
+    return Path(settings.BASE_DIR) / 'assets'
+
+
+def used_icons(base_dir=None):
+    """Every fa-* class name the templates and our scripts mention."""
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    names = set()
+    for pattern in ICON_SOURCES:
+        for path in base_dir.glob(pattern):
+            names.update(ICON_NAME.findall(path.read_text(encoding='utf-8')))
+    return names
+
+
+def split_rules(css):
+    """Top-level CSS blocks, braces balanced (keeps @keyframes and @media whole)."""
+    rules = []
+    depth = start = 0
+    for i, char in enumerate(css):
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:i + 1])
+                start = i + 1
+    return rules
+
+
+def css_text(content):
+    """Unescape a CSS string: "\\f015" -> ""."""
+    return CSS_ESCAPE.sub(
+        lambda match: chr(int(match.group(1), 16)) if match.group(1) else match.group(2), content
+    )
+
+
+def subset_icon_css(css, icons):
+    """
+    Keep the icon rules for `icons` (and everything that isn't an icon
+    rule - sizing, animations, @font-face). Returns (css, codepoints).
+    """
+    kept = []
+    codepoints = set()
+    for rule in split_rules(css):
+        match = ICON_RULE.fullmatch(rule.strip())
+        if match is None:
+            kept.append(rule)
+            continue
+        selectors = [
+            selector for selector in match.group(1).split(',')
+            if selector.split(':')[0][1:] in icons
+        ]
+        if selectors:
+            kept.append(f'{",".join(selectors)}{{content:"{match.group(2)}"}}')
+            codepoints.update(ord(char) for char in css_text(match.group(2)))
+    return ''.join(kept), codepoints
+
+
+def point_fonts_at_subsets(css):
+    """@font-face sources: our woff2 subsets only (every browser we support reads woff2)."""
+    css = re.sub(r',url\(\.\./webfonts/[\w-]+\.ttf\) format\("truetype"\)', '', css)
+    return css.replace('url(../webfonts/', 'url(webfonts/')
+
+
+def subset_font(source, target, codepoints):
+    font = TTFont(source)
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    font.flavor = 'woff2'
+    font.save(target)
+
+
+def vendor_text(path):
+    # Source maps aren't shipped - a dangling reference would also break
+    # the manifest storage's post-processing
+    return SOURCE_MAP.sub('', (assets_dir() / path).read_text(encoding='utf-8')).strip()
+
+
+def build(output=None, base_dir=None):
+    """Write the bundles and font subsets; returns the Assets written."""
+    output = Path(output or Path(settings.BASE_DIR) / 'static' / 'dist')
+    (output / 'webfonts').mkdir(parents=True, exist_ok=True)
+    src = assets_dir() / 'src'
+
+    bootstrap_css, icon_css = (vendor_text(path) for path in VENDOR_CSS)
+    icon_css, codepoints = subset_icon_css(icon_css, used_icons(base_dir))
+    own_css = [rcssmin.cssmin(path.read_text(encoding='utf-8')) for path in sorted(src.glob('*.css'))]
+    css = '\n'.join([bootstrap_css, point_fonts_at_subsets(icon_css), *own_css])
+
+    own_js = [rjsmin.jsmin(path.read_text(encoding='utf-8')) for path in sorted(src.glob('*.js'))]
+    # Each part is a complete script - keep them from running together
+    js = ';\n'.join([*(vendor_text(path) for path in VENDOR_JS), *own_js])
+
+    written = [output / 'app.css', output / 'app.js']
+    written[0].write_text(css, encoding='utf-8')
+    written[1].write_text(js, encoding='utf-8')
+    for font in FONTS:
+        target = output / 'webfonts' / f'{font}.woff2'
+        subset_font(assets_dir() / 'vendor' / 'fontawesome' / 'webfonts' / f'{font}.ttf', target, codepoints)
+        written.append(target)
+
+    return [describe(path, output) for path in written]
+
+
+def describe(path, root):
+    data = path.read_bytes()
+    return Asset(
+        name=str(path.relative_to(root)),
+        size=len(data),
+        gzip_size=len(gzip.compress(data, 9)),
+        brotli_size=len(brotli.compress(data)),
+    )
@@ -0,0 +1,50 @@
+# core/benchmarks.py
+"""
+Shared helpers for the bench_* management commands.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def scratch_database(keepdb=False, verbosity=0):
+    """
+    Run a benchmark against a throwaway copy of the schema.
+
+    Uses the same machinery as the test runner (the TEST settings of the
+    default database), so benchmarks can seed millions of rows and drop
+    indexes without touching real data.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, serialize=False, keepdb=keepdb
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=keepdb)
+
+
+def measure(func, repeat=20):
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items - keeps bulk_create batches bounded."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
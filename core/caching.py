@@ -0,0 +1,76 @@
+# core/caching.py
+"""
+Whole-page cache for the public marketing pages.
+
+Anonymous visitors all see the same page for a given URL, so the rendered
+response is cached under the full URL (query string included - filters
+and pagination get their own entries) plus the versions of the catalogs
+the page shows. Saving a plan or service moves its catalog's version, so
+stale pages are never served again; they just age out. The versions come
+from the database (core/catalog.py), so with a per-process cache a change
+made in another worker retires this worker's pages within
+CATALOG_VERSION_TIMEOUT seconds, not PAGE_CACHE_TIMEOUT.
+
+Logged-in members always get a fresh render - those pages show their
+name, membership and messages. Templates cache the shared parts (plan
+cards, the feature matrix) with {% cache %} fragments instead.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+
+KEY_PREFIX = 'page'
+
+
+def _timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+
+def page_key(request, catalogs=()):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    versions = '.'.join(str(catalog.version()) for catalog in catalogs)
+    return f'{KEY_PREFIX}:{url}:{versions}'
+
+
+def cache_anonymous_page(catalogs=()):
+    """
+    Serve anonymous GETs of the decorated view from the cache, keyed on the
+    URL and the versions of `catalogs`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+                or messages.get_messages(request)  # flash messages are per visitor
+            ):
+                return view(request, *args, **kwargs)
+
+            key = page_key(request, catalogs)
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not _sets_cookies(request, response):
+                cache.set(key, response, _timeout())
+            return response
+        return wrapper
+    return decorator
+
+
+def _sets_cookies(request, response):
+    """
+    Whether the response carries something for this visitor only - a CSRF
+    token or session the middleware will set a cookie for on the way out.
+    """
+    session = getattr(request, 'session', None)
+    return bool(
+        response.cookies
+        or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        or (session is not None and session.modified)
+    )
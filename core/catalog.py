@@ -0,0 +1,226 @@
+# core/catalog.py
+"""
+Per-worker snapshots of the small catalogs nearly every page shows -
+active membership plans, active services and the trainers taking clients.
+
+A catalog is loaded once into a tuple and reused by every request the
+worker serves. Saving or deleting a plan or service (admin, shell,
+fixtures) writes a new version for the catalog to its CatalogVersion row;
+a worker whose snapshot carries a different version reloads it on next
+use. Workers keep the version they read in the cache for
+CATALOG_VERSION_TIMEOUT seconds, so with the default per-process cache a
+change made in another worker shows up within that long. Steady-state
+page loads cost one cache get, plus one small query each time the cached
+version runs out.
+
+Snapshot instances are shared between requests - treat them as read-only
+and copy one before setting attributes on it.
+"""
+import secrets
+import threading
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+KEY_PREFIX = 'catalog'
+
+
+def _version_timeout():
+    return getattr(settings, 'CATALOG_VERSION_TIMEOUT', 5)
+
+
+class Catalog:
+    def __init__(self, name, model, ordering, filters=None, related=(), depends_on=(), affects=None):
+        self.name = name
+        self.model_label = model
+        self.ordering = ordering
+        self.filters = {'is_active': True} if filters is None else filters
+        # select_related() lookups, and the models they load - saving one
+        # of those retires the snapshot too
+        self.related = related
+        self.depends_on = depends_on
+        # Optional affects(catalog, sender=..., instance=..., **signal kwargs):
+        # False for a save or delete that can't change the snapshot
+        self.affects = affects
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def version_key(self):
+        return f'{KEY_PREFIX}:{self.name}:version'
+
+    def queryset(self):
+        return self.model._default_manager.filter(**self.filters).select_related(
+            *self.related
+        ).order_by(*self.ordering)
+
+    def version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            CatalogVersion = apps.get_model('core.CatalogVersion')
+            version = CatalogVersion.objects.filter(name=self.name).values_list('version', flat=True).first() or ''
+            cache.set(self.version_key, version, _version_timeout())
+        return version
+
+    def snapshot(self):
+        """(version, items, items by pk) - reloaded when the version has moved on."""
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != version:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot[0] != version:
+                    # Version read before loading: a write landing mid-load
+                    # leaves this snapshot already out of date
+                    items = tuple(self.queryset())
+                    snapshot = self._snapshot = (version, items, {item.pk: item for item in items})
+        return snapshot
+
+    def all(self):
+        return self.snapshot()[1]
+
+    def get(self, pk):
+        """The active item with primary key `pk`, or None."""
+        return self.snapshot()[2].get(pk)
+
+    def invalidate(self, **kwargs):
+        """
+        Retire every worker's snapshot. Bumps now, so this worker's next
+        read sees the write, and again on commit, in case another worker
+        reloaded the uncommitted state in between. A rolled-back bump
+        leaves the row on its old version, which retires the snapshot
+        taken from the rolled-back state too.
+        """
+        if self.affects is not None and not self.affects(self, **kwargs):
+            return
+        self._bump()
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(self._bump)
+
+    def _bump(self):
+        # Random rather than counted: a version undone by a rollback can't
+        # come back later and match a snapshot of the rolled-back state
+        version = secrets.token_hex(8)
+        CatalogVersion = apps.get_model('core.CatalogVersion')
+        if not CatalogVersion.objects.filter(name=self.name).update(version=version):
+            CatalogVersion.objects.update_or_create(name=self.name, defaults={'version': version})
+        cache.set(self.version_key, version, _version_timeout())
+
+    def connect(self):
+        uid = f'{KEY_PREFIX}:{self.name}'
+        for sender in [self.model_label, *self.depends_on]:
+            post_save.connect(self.invalidate, sender=sender, weak=False, dispatch_uid=uid)
+            post_delete.connect(self.invalidate, sender=sender, weak=False, dispatch_uid=uid)
+
+
+active_plans = Catalog('plans', 'memberships.MembershipPlan', ordering=('sort_order', 'monthly_price'))
+active_services = Catalog('services', 'bookings.Service', ordering=('id',))
+
+
+# What the trainer labels show of the user
+TRAINER_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def trainer_user_changed(catalog, sender, instance, update_fields=None, **kwargs):
+    """
+    Whether a user save or delete touches a listed trainer. Logins
+    (update_fields={'last_login'}) and members without a trainer profile
+    leave the snapshot alone.
+    """
+    if sender._meta.label != 'auth.User':
+        return True
+    if update_fields is not None and not TRAINER_USER_FIELDS & set(update_fields):
+        return False
+    return catalog.model._default_manager.filter(user_id=instance.pk, **catalog.filters).exists()
+
+
+# Labels show the trainer's name, so user edits count too
+accepting_trainers = Catalog(
+    'trainers', 'accounts.TrainerProfile', ordering=('id',),
+    filters={'is_accepting_clients': True}, related=('user',), depends_on=('auth.User',),
+    affects=trainer_user_changed,
+)
+
+CATALOGS = [active_plans, active_services, accepting_trainers]
+
+
+class CatalogChoiceIterator(forms.models.ModelChoiceIterator):
+    """Choices straight from the snapshot - rendering the field runs no query."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.items():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.items()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.items())
+
+
+class CatalogChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField over a catalog. Choices render from the snapshot and
+    submitted values are looked up in it, so neither costs a query.
+
+    Set `limit_to` to a predicate to offer only some of the catalog's items.
+    """
+    iterator = CatalogChoiceIterator
+
+    def __init__(self, catalog, limit_to=None, **kwargs):
+        self.catalog = catalog
+        self.limit_to = limit_to
+        super().__init__(queryset=None, **kwargs)
+
+    # Only built when something asks for it - declaring the field at
+    # import touches neither the app registry nor the ORM
+    @property
+    def queryset(self):
+        return self.catalog.queryset()
+
+    @queryset.setter
+    def queryset(self, value):
+        # Always the catalog's - just point the widget at this field's choices
+        self.widget.choices = self.choices
+
+    def __deepcopy__(self, memo):
+        result = super(forms.ChoiceField, self).__deepcopy__(memo)
+        result.widget.choices = result.choices
+        return result
+
+    def items(self):
+        items = self.catalog.all()
+        if self.limit_to is not None:
+            items = tuple(item for item in items if self.limit_to(item))
+        return items
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.catalog.model):
+            value = value.pk
+        try:
+            obj = self.catalog.get(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None or (self.limit_to is not None and not self.limit_to(obj)):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
@@ -0,0 +1,48 @@
+# core/checks.py
+"""
+System checks - configuration mistakes that should stop `runserver` (and
+every other manage.py command) with a clear message instead of failing
+quietly later.
+"""
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Written by `python manage.py build_assets` (core/assets.py) - not in git
+BUNDLES = ['app.css', 'app.js']
+
+
+@register(Tags.staticfiles)
+def check_asset_bundle(app_configs, **kwargs):
+    """With DEBUG on the bundles are served straight from static/dist."""
+    if not settings.DEBUG:
+        return []
+    dist = Path(settings.BASE_DIR) / 'static' / 'dist'
+    missing = [name for name in BUNDLES if not (dist / name).exists()]
+    if not missing:
+        return []
+    return [Error(
+        f"static/dist/{' and '.join(missing)} not built - every page would load without styles or Bootstrap JS",
+        hint='Run `python manage.py build_assets` (again after pulling new icons, styles or scripts).',
+        id='core.E001',
+    )]
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """Cache-backed sessions need a cache every worker process sees."""
+    if not settings.SESSION_ENGINE.endswith(('.cache', '.cached_db')):
+        return []
+    backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']
+    # Same default as gunicorn.conf.py
+    workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+    if workers <= 1 or backend not in settings.PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'{settings.SESSION_ENGINE} keeps sessions in {backend}, which each of the '
+        f'{workers} workers holds separately - a logout would only reach one of them',
+        hint='Point SESSION_CACHE_BACKEND at a shared cache, or use django.contrib.sessions.backends.db.',
+        id='core.E002',
+    )]
@@ -0,0 +1,138 @@
+# core/images.py
+"""
+Resized copies of uploaded pictures.
+
+Every uploaded picture gets a few variants - avatar, card and full - each
+saved as WebP and JPEG next to the original (profiles/me.jpg ->
+profiles/variants/me-card.webp). Variants are turned upright from the
+EXIF orientation and saved without the EXIF block, so a phone photo's
+location and camera details never reach the browser. Templates link the
+variants and leave the original alone (see the {% picture %} tag).
+
+process_image() is the background job - uploads queue it through
+core.tasks, and `python manage.py backfill_picture_variants` runs it over
+pictures uploaded before variants existed. Pillow is imported on first
+use, not at start-up.
+"""
+import io
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+
+# Longest side in pixels - twice the size they are shown at, for high-DPI screens
+VARIANTS = {
+    'avatar': 128,
+    'card': 480,
+    'full': 1280,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(name, variant, extension):
+    path = PurePosixPath(name)
+    return str(path.parent / 'variants' / f'{path.stem}-{variant}.{extension}')
+
+
+def render_variants(file):
+    """
+    Resize an image file to every variant. Returns
+    {variant: (width, height, {extension: bytes})}.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(file) as image:
+        # JPEGs can decode straight at a fraction of their size - far less
+        # memory and time for a 12-megapixel phone photo
+        largest = max(VARIANTS.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        icc_profile = image.info.get('icc_profile')
+
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+        else:
+            image = image.convert('RGB')
+
+        rendered = {}
+        # Largest first, each smaller variant resized from the one before
+        for variant, size in sorted(VARIANTS.items(), key=lambda item: item[1], reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+            encoded = {}
+            for extension, (image_format, options) in FORMATS.items():
+                frame = image
+                if image_format == 'JPEG' and image.mode == 'RGBA':
+                    frame = Image.new('RGB', image.size, 'white')
+                    frame.paste(image, mask=image.getchannel('A'))
+                buffer = io.BytesIO()
+                # No exif= - the metadata stays behind
+                frame.save(buffer, image_format, icc_profile=icc_profile, **options)
+                encoded[extension] = buffer.getvalue()
+            rendered[variant] = (*image.size, encoded)
+    return rendered
+
+
+def generate_variants(field_file, storage=None):
+    """Render and save the variants of a FieldFile; returns what to store on the row."""
+    storage = storage or default_storage
+    with field_file.open('rb') as file:
+        rendered = render_variants(file)
+
+    variants = {'source': field_file.name}
+    for variant, (width, height, encoded) in rendered.items():
+        variants[variant] = {'width': width, 'height': height}
+        for extension, data in encoded.items():
+            name = variant_name(field_file.name, variant, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[variant][extension] = storage.save(name, ContentFile(data))
+    return variants
+
+
+def variant_files(variants):
+    return [
+        name
+        for variant in VARIANTS if variant in variants
+        for extension, name in variants[variant].items() if extension in FORMATS
+    ]
+
+
+def delete_variants(variants, keep=(), storage=None):
+    storage = storage or default_storage
+    for name in variant_files(variants):
+        if name not in keep:
+            storage.delete(name)
+
+
+def process_image(model_label, pk, field_name, variants_field):
+    """
+    Background job: (re)build the variants for one row's picture and
+    record them in its `variants_field`. Returns the variants, or None if
+    the row is gone or the picture changed again while this ran.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return None
+
+    picture = getattr(instance, field_name)
+    old = getattr(instance, variants_field) or {}
+    variants = generate_variants(picture) if picture else {}
+
+    if picture:
+        unchanged = Q(**{field_name: picture.name})
+    else:
+        unchanged = Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})
+    # A plain update - no save signals, so this doesn't queue itself again
+    if not model.objects.filter(unchanged, pk=pk).update(**{variants_field: variants}):
+        delete_variants(variants, keep=variant_files(old))
+        return None
+
+    delete_variants(old, keep=variant_files(variants))
+    return variants
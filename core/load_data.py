@@ -0,0 +1,392 @@
+# core/load_data.py
+"""
+Synthetic data at production scale, for load tests and benchmarks.
+
+generate_load_data() fills the database with members (each with a
+profile), trainers, services, memberships across every plan and status,
+and bookings spread over a year or more. Every table is written with
+chunked bulk_create, so a hundred thousand members and millions of
+bookings take minutes. The same seed always produces the same data
+(dates are relative to today).
+
+The spread is meant to look like a real gym:
+
+    - a few members book a lot and most book now and then
+    - bookings cluster on weekdays, before work and after work
+    - past sessions ended up completed, cancelled or no-shows, while
+      upcoming ones are pending, confirmed or cancelled
+
+Capacity isn't enforced. At millions of bookings most slots end up full,
+which is the worst case the availability code has to handle anyway.
+
+bulk_create skips the model signals, so the slots and the members'
+dashboard stats are rebuilt at the end with generate_slots and
+rebuild_member_stats.
+
+With drop_indexes the booking indexes are dropped for the bulk insert and
+built once at the end - much faster, but every query on the bookings
+table goes unindexed meanwhile, so it is refused on a table that already
+has bookings unless forced.
+"""
+import random
+import time as clock
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import MemberStats, TrainerProfile, UserProfile
+from bookings.models import Booking, Service, Slot
+from memberships.models import Membership, MembershipPlan
+
+from .benchmarks import chunked
+
+FIRST_NAMES = ['Thabo', 'Lerato', 'Sipho', 'Naledi', 'Johan', 'Aisha', 'Pieter', 'Zanele', 'Kagiso', 'Megan', 'Ayanda', 'Ruan']
+LAST_NAMES = ['Mokoena', 'Naidoo', 'van der Merwe', 'Dlamini', 'Botha', 'Khumalo', 'Pillay', 'Smith', 'Nkosi', 'Jacobs']
+
+# Relative popularity of each start hour - before work and after work
+HOUR_WEIGHTS = {6: 6, 7: 8, 8: 5, 9: 3, 10: 3, 11: 3, 12: 4, 13: 3, 14: 2, 15: 3, 16: 5, 17: 9, 18: 10, 19: 7, 20: 3}
+# Monday first
+WEEKDAY_WEIGHTS = [10, 10, 9, 9, 7, 5, 3]
+
+PAST_STATUSES = {'completed': 80, 'cancelled': 13, 'no_show': 7}
+UPCOMING_STATUSES = {'confirmed': 70, 'pending': 18, 'cancelled': 12}
+PAYMENT_STATUSES = {'completed': 'paid', 'no_show': 'paid', 'confirmed': 'paid', 'pending': 'pending', 'cancelled': 'refunded'}
+
+MEMBERSHIP_STATUSES = {'active': 70, 'expired': 15, 'cancelled': 10, 'suspended': 5}
+PLAN_WEIGHTS = {'basic': 50, 'premium': 30, 'vip': 15, 'corporate': 5}
+PLAN_PRICES = {'basic': 299, 'premium': 599, 'vip': 999, 'corporate': 450}
+
+# service_type: (capacity, price, trainer assigned how often)
+SERVICE_SHAPES = {
+    'personal_training': (1, 350, 1.0),
+    'group_class': (15, 100, 0.5),
+    'mma_session': (10, 150, 1.0),
+    'consultation': (1, 0, 0.8),
+    'assessment': (1, 200, 0.8),
+}
+
+FITNESS_LEVELS = {'beginner': 45, 'intermediate': 35, 'advanced': 15, 'athlete': 5}
+
+
+@dataclass
+class LoadVolumes:
+    members: int = 100_000
+    trainers: int = 500
+    services: int = 40
+    bookings: int = 5_000_000
+    # Share of members with a membership (any status) - only they book
+    membership_rate: float = 0.7
+    days_back: int = 365
+    days_ahead: int = 60
+
+
+def weighted(options):
+    """(values, cumulative weights) for rng.choices."""
+    values = list(options)
+    cumulative = []
+    total = 0
+    for value in values:
+        total += options[value]
+        cumulative.append(total)
+    return values, cumulative
+
+
+class LoadDataGenerator:
+    """
+    One run of the generator. generate() writes everything and returns
+    the row counts; the steps can also be run on their own.
+    """
+
+    def __init__(self, volumes=None, seed=42, prefix='load', batch_size=10_000, password='loadtest', log=None,
+                 drop_indexes=False, force=False):
+        self.volumes = volumes or LoadVolumes()
+        self.drop_indexes = drop_indexes
+        self.force = force
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password = password
+        self.log = log or (lambda message: None)
+        self.today = timezone.now().date()
+
+    def generate(self, member_stats=True):
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise ValueError(f"Load data with prefix '{self.prefix}' already exists - pick another prefix")
+        if self.drop_indexes and not self.force:
+            existing = Booking.objects.count()
+            if existing:
+                raise ValueError(
+                    f'The bookings table already has {existing:,} rows - dropping its indexes would leave '
+                    f'every query on it unindexed until they are rebuilt (force it, or keep the indexes)'
+                )
+
+        steps = [
+            ('plans', self.create_plans),
+            ('services', self.create_services),
+            ('members', self.create_members),
+            ('trainers', self.create_trainers),
+            ('memberships', self.create_memberships),
+            ('bookings', self.create_bookings),
+            ('slots', self.create_slots),
+        ]
+        if member_stats:
+            steps.append(('member stats', self.rebuild_member_stats))
+
+        for name, step in steps:
+            started = clock.perf_counter()
+            step()
+            self.log(f'{name:<14} {clock.perf_counter() - started:>8.1f} s')
+
+        self.analyze()
+        return self.counts()
+
+    # Catalog
+
+    def create_plans(self):
+        self.plans = list(MembershipPlan.objects.filter(is_active=True))
+        if not self.plans:
+            self.plans = MembershipPlan.objects.bulk_create(
+                MembershipPlan(
+                    name=label,
+                    plan_type=plan_type,
+                    description=f'{label} membership',
+                    monthly_price=PLAN_PRICES[plan_type],
+                    sort_order=order,
+                )
+                for order, (plan_type, label) in enumerate(MembershipPlan.PLAN_TYPES)
+            )
+
+    def create_services(self):
+        service_types = list(SERVICE_SHAPES)
+        services = []
+        for i in range(self.volumes.services):
+            service_type = service_types[i % len(service_types)]
+            capacity, price, _ = SERVICE_SHAPES[service_type]
+            label = dict(Service.SERVICE_TYPES)[service_type]
+            services.append(Service(
+                name=f'{label} {i // len(service_types) + 1}',
+                service_type=service_type,
+                description=f'{label} (load data)',
+                price=price,
+                max_participants=capacity,
+                opens_at=time(6, 0),
+                closes_at=time(21, 0),
+            ))
+        self.services = Service.objects.bulk_create(services)
+
+    # People
+
+    def users(self, kind, count):
+        password = make_password(self.password)  # hashed once, shared by everyone
+        now = timezone.now()
+        for i in range(count):
+            first_name = self.rng.choice(FIRST_NAMES)
+            last_name = self.rng.choice(LAST_NAMES)
+            username = f'{self.prefix}-{kind}{i}'
+            yield User(
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                email=f'{username}@example.com',
+                password=password,
+                date_joined=now - timedelta(days=self.rng.randrange(3 * 365)),
+            )
+
+    def user_ids(self, kind):
+        return list(
+            User.objects.filter(username__startswith=f'{self.prefix}-{kind}').order_by('id').values_list('id', flat=True)
+        )
+
+    def create_members(self):
+        with transaction.atomic():
+            for batch in chunked(self.users('member', self.volumes.members), self.batch_size):
+                User.objects.bulk_create(batch)
+        self.member_ids = self.user_ids('member')
+
+        levels, level_weights = weighted(FITNESS_LEVELS)
+        goals = [goal for goal, _ in UserProfile.GOALS]
+
+        def profiles():
+            for user_id in self.member_ids:
+                yield UserProfile(
+                    user_id=user_id,
+                    fitness_level=self.rng.choices(levels, cum_weights=level_weights)[0],
+                    primary_goal=self.rng.choice(goals),
+                    newsletter_subscription=self.rng.random() < 0.6,
+                )
+
+        with transaction.atomic():
+            for batch in chunked(profiles(), self.batch_size):
+                UserProfile.objects.bulk_create(batch)
+
+    def create_trainers(self):
+        with transaction.atomic():
+            User.objects.bulk_create(self.users('trainer', self.volumes.trainers), batch_size=self.batch_size)
+            specializations = [code for code, _ in TrainerProfile.SPECIALIZATIONS]
+            TrainerProfile.objects.bulk_create(
+                (
+                    TrainerProfile(
+                        user_id=user_id,
+                        certifications='Certified personal trainer',
+                        specializations=self.rng.choice(specializations),
+                        years_experience=self.rng.randrange(1, 20),
+                        hourly_rate=self.rng.choice([250, 300, 350, 450]),
+                        is_accepting_clients=self.rng.random() < 0.9,
+                        bio='Load test trainer',
+                    )
+                    for user_id in self.user_ids('trainer')
+                ),
+                batch_size=self.batch_size,
+            )
+        self.trainer_ids = list(
+            TrainerProfile.objects.filter(user__username__startswith=f'{self.prefix}-trainer').values_list('id', flat=True)
+        )
+
+    def create_memberships(self):
+        by_type = {}
+        for plan in self.plans:
+            by_type.setdefault(plan.plan_type, []).append(plan)
+        # Every plan gets members, the popular tiers more of them
+        plan_choices = [
+            (plan, PLAN_WEIGHTS.get(plan_type, 10) / len(plans))
+            for plan_type, plans in by_type.items() for plan in plans
+        ]
+        plans, plan_weights = weighted(dict(plan_choices))
+        statuses, status_weights = weighted(MEMBERSHIP_STATUSES)
+
+        members = self.member_ids[:round(len(self.member_ids) * self.volumes.membership_rate)]
+        self.booking_member_ids = members
+
+        def memberships():
+            for i, user_id in enumerate(members):
+                # The first few rows cover every plan and status, however small the run
+                if i < len(plans) * len(statuses):
+                    plan, status = plans[i % len(plans)], statuses[i // len(plans)]
+                else:
+                    plan = self.rng.choices(plans, cum_weights=plan_weights)[0]
+                    status = self.rng.choices(statuses, cum_weights=status_weights)[0]
+                yield Membership(user_id=user_id, plan=plan, status=status, **self.membership_dates(status))
+
+        with transaction.atomic():
+            for batch in chunked(memberships(), self.batch_size):
+                Membership.objects.bulk_create(batch)
+
+    def membership_dates(self, status):
+        today = self.today
+        if status in ('expired', 'cancelled'):
+            end_date = today - timedelta(days=self.rng.randrange(1, 365))
+            next_billing_date = end_date
+        elif status == 'suspended':
+            end_date = today + timedelta(days=self.rng.randrange(1, 31))
+            next_billing_date = today - timedelta(days=self.rng.randrange(1, 30))  # missed payment
+        else:
+            end_date = today + timedelta(days=self.rng.randrange(1, 31))
+            next_billing_date = end_date
+        start_date = end_date - timedelta(days=30 * self.rng.randrange(1, 24))
+        return {'start_date': start_date, 'end_date': end_date, 'next_billing_date': next_billing_date}
+
+    # Bookings
+
+    def create_bookings(self):
+        volumes = self.volumes
+        days = [self.today + timedelta(days=offset) for offset in range(-volumes.days_back, volumes.days_ahead + 1)]
+        _, day_weights = weighted({day: WEEKDAY_WEIGHTS[day.weekday()] for day in days})
+
+        services = []
+        for service in self.services:
+            starts = service.slot_times()
+            _, start_weights = weighted({start: HOUR_WEIGHTS.get(start.hour, 1) for start in starts})
+            length = timedelta(minutes=service.duration_minutes)
+            ends = [(datetime.combine(self.today, start) + length).time() for start in starts]
+            services.append((service, starts, start_weights, ends, SERVICE_SHAPES[service.service_type][2]))
+
+        past, past_weights = weighted(PAST_STATUSES)
+        upcoming, upcoming_weights = weighted(UPCOMING_STATUSES)
+        members = self.booking_member_ids
+        trainers = self.trainer_ids
+        rng = self.rng
+
+        def bookings():
+            for _ in range(volumes.bookings):
+                service, starts, start_weights, ends, trainer_rate = rng.choice(services)
+                slot = rng.choices(range(len(starts)), cum_weights=start_weights)[0]
+                day = rng.choices(days, cum_weights=day_weights)[0]
+                if day < self.today:
+                    status = rng.choices(past, cum_weights=past_weights)[0]
+                else:
+                    status = rng.choices(upcoming, cum_weights=upcoming_weights)[0]
+                payment_status = PAYMENT_STATUSES[status]
+                yield Booking(
+                    # Skewed towards the front of the list - regulars book far more often
+                    user_id=members[int(len(members) * rng.random() ** 1.5)],
+                    service=service,
+                    trainer_id=rng.choice(trainers) if trainers and rng.random() < trainer_rate else None,
+                    date=day,
+                    start_time=starts[slot],
+                    end_time=ends[slot],
+                    status=status,
+                    amount_paid=service.price if payment_status == 'paid' else Decimal(0),
+                    payment_status=payment_status,
+                )
+
+        if not members:
+            return
+        if not self.drop_indexes:
+            self.insert_bookings(bookings())
+            return
+        # Building the composite indexes once at the end is far cheaper than
+        # updating all four on every insert
+        with connection.schema_editor() as editor:
+            for index in Booking._meta.indexes:
+                editor.remove_index(Booking, index)
+        try:
+            self.insert_bookings(bookings())
+        finally:
+            with connection.schema_editor() as editor:
+                for index in Booking._meta.indexes:
+                    editor.add_index(Booking, index)
+
+    def insert_bookings(self, bookings):
+        created = 0
+        for batch in chunked(bookings, self.batch_size):
+            with transaction.atomic():
+                Booking.objects.bulk_create(batch)
+            created += len(batch)
+            if created % (self.batch_size * 50) == 0:
+                self.log(f'  {created:,} bookings')
+
+    def create_slots(self):
+        call_command(
+            'generate_slots',
+            start=(self.today - timedelta(days=self.volumes.days_back)).isoformat(),
+            days=self.volumes.days_back + self.volumes.days_ahead + 1,
+            batch_size=self.batch_size,
+            stdout=StringIO(),
+        )
+
+    def rebuild_member_stats(self):
+        call_command('rebuild_member_stats', batch_size=self.batch_size, stdout=StringIO())
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            if connection.vendor in ('sqlite', 'postgresql'):
+                cursor.execute('ANALYZE')
+
+    def counts(self):
+        return {
+            model._meta.label: model.objects.count()
+            for model in [User, UserProfile, TrainerProfile, Service, Membership, Booking, Slot, MemberStats]
+        }
+
+
+def generate_load_data(volumes=None, seed=42, **options):
+    """Shortcut for benchmarks: LoadDataGenerator(volumes, seed, ...).generate()."""
+    member_stats = options.pop('member_stats', True)
+    return LoadDataGenerator(volumes, seed, **options).generate(member_stats=member_stats)
@@ -0,0 +1,169 @@
+# core/management/commands/bench_asgi.py
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Service
+from core.benchmarks import scratch_database
+from core.database import database_url
+from memberships.models import MembershipPlan, Membership
+
+SERVER_MODES = ['wsgi', 'asgi']
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec for the polled JSON endpoints under gunicorn WSGI and ASGI (uvicorn) workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per server mode')
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous clients')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn worker processes')
+        parser.add_argument('--port', type=int, default=8765, help='Port to run the servers on')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            urls, cookie = self.seed()
+
+            results = {}
+            for mode in SERVER_MODES:
+                with self.server(mode, options):
+                    # Warm up imports and connections before timing
+                    self.load(urls, cookie, options, total=options['concurrency'] * 2)
+                    results[mode] = self.load(urls, cookie, options, total=options['requests'])
+                self.stdout.write(
+                    f"{mode:<5} {results[mode]['rps']:>8.1f} req/s, "
+                    f"p50 {results[mode]['p50']:.1f} ms, p95 {results[mode]['p95']:.1f} ms, "
+                    f"{results[mode]['errors']} errors"
+                )
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+            self.stdout.write(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+            for mode, result in results.items():
+                self.stdout.write(f"{mode:<6} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f}")
+
+    def seed(self):
+        service = Service.objects.create(
+            name='Bench Class', service_type='group_class', description='Benchmark service',
+            price=100, max_participants=15,
+        )
+        plan = MembershipPlan.objects.create(
+            name='Bench Plan', plan_type='basic', description='Benchmark plan', monthly_price=299,
+        )
+        user = User.objects.create_user('bench-member')
+        today = timezone.now().date()
+        Membership.objects.create(
+            user=user, plan=plan, start_date=today,
+            end_date=today + timedelta(days=30), next_billing_date=today + timedelta(days=30),
+        )
+
+        client = Client()
+        client.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        urls = [
+            f"{reverse('bookings:get_available_times')}?service_id={service.id}&date={tomorrow}",
+            reverse('memberships:membership_status_api'),
+        ]
+        return urls, cookie
+
+    # Server process
+
+    class server:
+        def __init__(self, mode, options):
+            self.mode = mode
+            self.port = options['port']
+            self.workers = options['workers']
+
+        def __enter__(self):
+            env = {
+                **os.environ,
+                'SERVER_MODE': self.mode,
+                'PORT': str(self.port),
+                'WEB_CONCURRENCY': str(self.workers),
+                'DATABASE_URL': database_url(connection.settings_dict),
+                'DEBUG': 'False',
+            }
+            self.process = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '--log-level', 'warning'],
+                cwd=settings.BASE_DIR,
+                env=env,
+            )
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise CommandError(f'{self.mode} server exited with code {self.process.returncode}')
+                try:
+                    socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                    return self
+                except OSError:
+                    time.sleep(0.1)
+            self.process.kill()
+            raise CommandError(f'{self.mode} server did not start on port {self.port}')
+
+        def __exit__(self, *exc):
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    # Load generator
+
+    def load(self, urls, cookie, options, total):
+        base = f"http://127.0.0.1:{options['port']}"
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        timings = []
+        errors = []
+
+        def client():
+            while True:
+                with lock:
+                    n = next(remaining, None)
+                if n is None:
+                    return
+                request = urllib.request.Request(
+                    base + urls[n % len(urls)],
+                    headers={'Cookie': cookie, 'Host': '127.0.0.1'},
+                )
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                        ok = response.status == 200
+                except OSError:
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    (timings if ok else errors).append(elapsed)
+
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        timings.sort()
+        return {
+            'rps': len(timings) / wall if wall else 0,
+            'p50': statistics.median(timings) if timings else 0,
+            'p95': timings[max(int(len(timings) * 0.95) - 1, 0)] if timings else 0,
+            'errors': len(errors),
+        }
@@ -0,0 +1,92 @@
+# core/management/commands/bench_cold_start.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.models import Service
+from core.benchmarks import scratch_database
+from core.database import database_url
+from memberships.models import MembershipPlan
+
+# Runs in a fresh interpreter: import the entry point, then answer two events
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, 'api')
+import index
+if {eager}:
+    index.app.load()  # what the old entry point did at import
+imported = time.perf_counter()
+event = {{'rawPath': {path!r}, 'headers': {{'host': 'localhost'}}, 'requestContext': {{'http': {{'method': 'GET'}}}}}}
+first = index.lambda_handler(event)
+answered = time.perf_counter()
+index.lambda_handler(event)
+warm = time.perf_counter()
+print(json.dumps({{
+    'status': first['statusCode'],
+    'import': (imported - started) * 1000,
+    'first': (answered - imported) * 1000,
+    'warm': (warm - answered) * 1000,
+}}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure time-to-first-response of the serverless entry point (api/index.py) from a fresh interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters per mode')
+        parser.add_argument('--path', default='/memberships/plans/', help='Path the probe requests')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            self.seed()
+            env = {
+                **os.environ,
+                'DATABASE_URL': database_url(connection.settings_dict),
+                'DEBUG': 'False',
+            }
+
+            self.stdout.write(
+                f"{'mode':<6} {'import ms':>10} {'first ms':>9} {'to first ms':>12} {'process ms':>11} {'warm ms':>8}"
+            )
+            for mode in ['lazy', 'eager']:
+                runs = [self.probe(mode, options['path'], env) for _ in range(options['runs'])]
+                median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+                self.stdout.write(
+                    f"{mode:<6} {median['import']:>10.1f} {median['first']:>9.1f} "
+                    f"{median['import'] + median['first']:>12.1f} {median['process']:>11.1f} {median['warm']:>8.2f}"
+                )
+
+    def probe(self, mode, path, env):
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-c', PROBE.format(eager=mode == 'eager', path=path)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        # Interpreter start-up included - what a cold container actually pays
+        elapsed = (time.perf_counter() - started) * 1000
+        if process.returncode:
+            raise CommandError(f'{mode} probe failed:\n{process.stderr}')
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        if result['status'] != 200:
+            raise CommandError(f"{mode} probe got status {result['status']} for {path}")
+        return {**result, 'process': elapsed}
+
+    def seed(self):
+        MembershipPlan.objects.create(
+            name='Bench Plan', plan_type='basic', description='Benchmark plan', monthly_price=299,
+        )
+        Service.objects.create(
+            name='Bench Class', service_type='group_class', description='Benchmark service', price=100,
+        )
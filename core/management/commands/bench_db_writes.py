@@ -0,0 +1,182 @@
+# core/management/commands/bench_db_writes.py
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from bookings.capacity import CapacityIndex
+from bookings.intervals import session_end
+from bookings.models import Service, Booking
+from bookings.reservations import reserve
+from core.benchmarks import scratch_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare concurrent booking writes on SQLite (default journal vs WAL tuning) '
+        'and PostgreSQL (connection per request, persistent connections, psycopg pool)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--postgres-url', help='PostgreSQL DATABASE_URL to benchmark against (its test_ database is used)')
+        parser.add_argument('--writers', type=int, default=16, help='Simultaneous requests')
+        parser.add_argument('--requests', type=int, default=800, help='Requests per mode (availability read + reservation)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            return self.worker(options)
+
+        sqlite_url = f"sqlite:///{settings.BASE_DIR / 'db.sqlite3'}"
+        modes = [
+            ('sqlite', {'DATABASE_URL': sqlite_url, 'SQLITE_TUNING': 'False'}),
+            ('sqlite-wal', {'DATABASE_URL': sqlite_url, 'SQLITE_TUNING': 'True'}),
+        ]
+        if options['postgres_url']:
+            postgres = {'DATABASE_URL': options['postgres_url'], 'DATABASE_POOL': 'False'}
+            modes += [
+                ('pg-per-request', {**postgres, 'CONN_MAX_AGE': '0'}),
+                ('pg-persistent', {**postgres, 'CONN_MAX_AGE': '60'}),
+                ('pg-pool', {
+                    **postgres,
+                    'DATABASE_POOL': 'True',
+                    'DATABASE_POOL_MIN_SIZE': str(options['writers']),
+                    'DATABASE_POOL_MAX_SIZE': str(options['writers']),
+                }),
+            ]
+        else:
+            self.stdout.write('No --postgres-url given, benchmarking SQLite only')
+
+        results = {}
+        for mode, env in modes:
+            results[mode] = result = self.run_mode(mode, env, options)
+            self.stdout.write(
+                f"{mode:<15} {result['rps']:>8.1f} req/s, p50 {result['p50']:.1f} ms, "
+                f"p95 {result['p95']:.1f} ms, {result['connects']} connects, {result['errors']} errors"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+        self.stdout.write(f"{'mode':<15} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'connects':>9} {'errors':>7}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<15} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                f"{result['connects']:>9} {result['errors']:>7}"
+            )
+
+    def run_mode(self, mode, env, options):
+        """Each mode gets its own process, so settings are read fresh from the environment."""
+        process = subprocess.run(
+            [
+                sys.executable, 'manage.py', 'bench_db_writes', '--worker',
+                '--writers', str(options['writers']),
+                '--requests', str(options['requests']),
+                '--seed', str(options['seed']),
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **env},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(f'{mode} run failed:\n{process.stderr}')
+        return json.loads(process.stdout.strip().splitlines()[-1])
+
+    # Worker process
+
+    def worker(self, options):
+        with scratch_database():
+            services, users = self.seed(options)
+            connection.close()
+
+            connects = []
+            connection_created.connect(lambda **kwargs: connects.append(1), weak=False)
+            rng = random.Random(options['seed'])
+            today = timezone.now().date()
+            requests = [
+                (
+                    rng.choice(users),
+                    service := rng.choice(services),
+                    today + timedelta(days=rng.randrange(1, 8)),
+                    rng.choice(service.slot_times()),
+                )
+                for _ in range(options['requests'])
+            ]
+            errors = []
+            lock = threading.Lock()
+
+            def request(args):
+                user, service, date, start_time = args
+                started = time.perf_counter()
+                try:
+                    # What a booking page does: read availability, then reserve
+                    CapacityIndex.build([service], date)
+                    reserve(Booking(
+                        user=user, service=service, date=date, start_time=start_time,
+                        end_time=session_end(date, start_time, service.duration_minutes),
+                        status='confirmed',
+                    ))
+                except ValidationError:
+                    pass  # slot full - a normal answer
+                except DatabaseError as e:
+                    with lock:
+                        errors.append(str(e))
+                finally:
+                    # request_finished: closes the connection unless it persists or pools
+                    close_old_connections()
+                return (time.perf_counter() - started) * 1000
+
+            def run(chunk):
+                try:
+                    return [request(args) for args in chunk]
+                finally:
+                    connection.close()
+
+            chunks = [requests[i::options['writers']] for i in range(options['writers'])]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['writers']) as pool:
+                timings = sorted(t for chunk in pool.map(run, chunks) for t in chunk)
+            wall = time.perf_counter() - started
+
+            self.stdout.write(json.dumps({
+                'rps': len(timings) / wall,
+                'p50': statistics.median(timings),
+                'p95': timings[int(len(timings) * 0.95) - 1],
+                'connects': len(connects),
+                'errors': len(errors),
+            }))
+
+    def seed(self, options):
+        services = Service.objects.bulk_create(
+            Service(
+                name=f'Bench Class {i}',
+                service_type='group_class',
+                description='Benchmark service',
+                price=100,
+                max_participants=20,
+                requires_membership=False,
+            )
+            for i in range(5)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'writer{i}') for i in range(options['requests'])
+        )
+        call_command('generate_slots', days=8, stdout=StringIO())
+        return services, users
@@ -0,0 +1,24 @@
+# core/management/commands/build_assets.py
+from django.core.management.base import BaseCommand
+
+from core.assets import build, used_icons
+
+
+class Command(BaseCommand):
+    help = 'Bundle and minify the CSS/JS and subset the icon fonts into static/dist (run before collectstatic)'
+    # Fixes core.E001 (bundle missing), so it must run while that check fails
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Directory to write to (default static/dist)')
+
+    def handle(self, *args, **options):
+        assets = build(options['output'])
+
+        self.stdout.write(f"{'asset':<32} {'bytes':>9} {'gzip':>9} {'brotli':>9}")
+        for asset in assets:
+            self.stdout.write(f'{asset.name:<32} {asset.size:>9,} {asset.gzip_size:>9,} {asset.brotli_size:>9,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {len(assets)} assets with {len(used_icons())} icon classes - '
+            f'run collectstatic to hash and precompress them'
+        ))
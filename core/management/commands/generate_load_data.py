@@ -0,0 +1,65 @@
+# core/management/commands/generate_load_data.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.load_data import LoadDataGenerator, LoadVolumes
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with seeded, production-scale synthetic members, trainers, memberships and bookings'
+
+    def add_arguments(self, parser):
+        defaults = LoadVolumes()
+        parser.add_argument('--members', type=int, default=defaults.members, help='Members, each with a profile')
+        parser.add_argument('--trainers', type=int, default=defaults.trainers, help='Trainers')
+        parser.add_argument('--services', type=int, default=defaults.services, help='Services, spread over every service type')
+        parser.add_argument('--bookings', type=int, default=defaults.bookings, help='Bookings')
+        parser.add_argument(
+            '--membership-rate', type=float, default=defaults.membership_rate,
+            help='Share of members with a membership (only they book)'
+        )
+        parser.add_argument('--days-back', type=int, default=defaults.days_back, help='Days of booking history')
+        parser.add_argument('--days-ahead', type=int, default=defaults.days_ahead, help='Days of upcoming bookings')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed - the same seed gives the same data')
+        parser.add_argument('--prefix', default='load', help='Username prefix (load-member0, load-trainer0, ...)')
+        parser.add_argument('--password', default='loadtest', help='Password every generated user can log in with')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Rows written per bulk insert')
+        parser.add_argument('--no-member-stats', action='store_true', help='Skip rebuilding the dashboard stats rollups')
+        parser.add_argument(
+            '--drop-indexes', action='store_true',
+            help='Drop the booking indexes while inserting and rebuild them at the end (faster; empty databases only)'
+        )
+        parser.add_argument('--force', action='store_true', help='Allow --drop-indexes on a database that has bookings')
+
+    def handle(self, *args, **options):
+        volumes = LoadVolumes(
+            members=options['members'],
+            trainers=options['trainers'],
+            services=options['services'],
+            bookings=options['bookings'],
+            membership_rate=options['membership_rate'],
+            days_back=options['days_back'],
+            days_ahead=options['days_ahead'],
+        )
+        generator = LoadDataGenerator(
+            volumes,
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+            log=self.stdout.write,
+            drop_indexes=options['drop_indexes'],
+            force=options['force'],
+        )
+
+        try:
+            counts = generator.generate(member_stats=not options['no_member_stats'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write('')
+        for label, count in counts.items():
+            self.stdout.write(f'{label:<26} {count:>12,}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated load data with seed {options['seed']} - log in as "
+            f"{options['prefix']}-member0 / {options['password']}"
+        ))
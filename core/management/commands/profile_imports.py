@@ -0,0 +1,50 @@
+# core/management/commands/profile_imports.py
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import LAZY_MODULES, STARTUP_BUDGET_MS, profile_startup
+
+
+class Command(BaseCommand):
+    help = 'Report a -X importtime breakdown of importing timmy_gym_demo.wsgi in a fresh interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Modules to list')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative', help='Order modules by')
+        parser.add_argument('--no-urls', action='store_true', help='Stop after the WSGI app - skip the URLconf the first request loads')
+        parser.add_argument('--check', action='store_true', help=f'Fail if start-up takes longer than {STARTUP_BUDGET_MS} ms')
+
+    def handle(self, *args, **options):
+        profile = profile_startup(first_request=not options['no_urls'])
+        what = 'timmy_gym_demo.wsgi' + ('' if options['no_urls'] else ' + URLconf')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{what}: {profile.ms:.0f} ms, {len(profile.imports)} modules imported'
+        ))
+
+        self.stdout.write('\nOwn import time by top-level package')
+        packages = Counter()
+        for record in profile.imports:
+            packages[record.package] += record.self_us
+        for package, us in packages.most_common(options['limit'] // 2 or 1):
+            self.stdout.write(f'{us / 1000:>9.1f} ms  {package}')
+
+        self.stdout.write(f"\nSlowest modules ({options['sort']})")
+        self.stdout.write(f"{'self ms':>9} {'cum ms':>9}  module")
+        key = 'self_us' if options['sort'] == 'self' else 'cumulative_us'
+        slowest = sorted(profile.imports, key=lambda record: getattr(record, key), reverse=True)
+        for record in slowest[:options['limit']]:
+            indent = '  ' * record.depth if options['sort'] == 'cumulative' else ''
+            self.stdout.write(f'{record.self_us / 1000:>9.1f} {record.cumulative_us / 1000:>9.1f}  {indent}{record.name}')
+
+        eager = [module for module in LAZY_MODULES if module in profile.modules]
+        self.stdout.write('')
+        if eager:
+            self.stdout.write(self.style.WARNING(f"Imported at start-up but meant to load lazily: {', '.join(eager)}"))
+        else:
+            self.stdout.write(f"Deferred until first use: {', '.join(LAZY_MODULES)}")
+
+        if options['check']:
+            if profile.ms > STARTUP_BUDGET_MS or eager:
+                raise CommandError(f'Start-up over budget: {profile.ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms)')
+            self.stdout.write(self.style.SUCCESS(f'Within the {STARTUP_BUDGET_MS} ms start-up budget'))
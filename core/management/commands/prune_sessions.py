@@ -0,0 +1,35 @@
+# core/management/commands/prune_sessions.py
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small batches (run daily from a scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessions deleted per statement')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+
+        if not hasattr(store, 'get_model_class'):
+            # Cache and cookie sessions expire on their own; file sessions know how to clean up
+            store.clear_expired()
+            self.stdout.write(f'{settings.SESSION_ENGINE} has no session table to prune')
+            return
+
+        # Like clearsessions, but one short DELETE per batch instead of one
+        # long one - SQLite holds its write lock for the whole statement
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted:,} expired sessions'))
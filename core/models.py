@@ -1,3 +1,14 @@
 from django.db import models
 
-# Create your models here.
+
+class CatalogVersion(models.Model):
+    """
+    The current version of one core.catalog snapshot. Rewritten whenever a
+    plan, service or trainer changes; every worker compares its snapshot
+    against this row, so a change made in one process reaches all of them.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f"{self.name} catalog at {self.version}"
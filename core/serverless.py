@@ -0,0 +1,175 @@
+# core/serverless.py
+"""
+Serverless entry point plumbing (see api/index.py).
+
+A function container starts cold for its first invocation and then stays
+warm for many more. LazyWSGIApplication puts off importing Django and the
+project until the first request actually needs it, then keeps the loaded
+app for every warm invocation after that.
+
+Platforms that speak WSGI call the app directly and iterate the response,
+so large and streaming responses go out chunk by chunk. Platforms that
+hand over an event (API Gateway style: rawPath, headers, body, ...) go
+through handle_event, which builds a WSGI environ, runs the app and turns
+the status, headers and body - base64 for binary content - back into
+the response dict they expect - cookies in `cookies` for the 2.0 payload
+format, in `multiValueHeaders` for 1.0.
+
+Only the standard library is imported here, so importing the entry
+point stays cheap.
+"""
+import base64
+import io
+import os
+import sys
+import threading
+from urllib.parse import unquote, urlencode
+
+TEXT_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+class LazyWSGIApplication:
+    """
+    WSGI callable that builds the Django app on its first call and reuses
+    it for the life of the process.
+    """
+
+    def __init__(self, settings_module='timmy_gym_demo.settings'):
+        self.settings_module = settings_module
+        self._app = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._app is not None
+
+    def load(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    os.environ.setdefault('DJANGO_SETTINGS_MODULE', self.settings_module)
+                    from django.core.wsgi import get_wsgi_application
+                    self._app = get_wsgi_application()
+        return self._app
+
+    def __call__(self, environ, start_response):
+        return self.load()(environ, start_response)
+
+
+def event_environ(event):
+    """WSGI environ for an API Gateway (v2 or v1) style event."""
+    http = event.get('requestContext', {}).get('http', {})
+    method = http.get('method') or event.get('httpMethod') or event.get('method') or 'GET'
+    if event.get('rawPath'):
+        # Still percent-encoded; WSGI wants PATH_INFO decoded, as latin-1 bytes
+        path = unquote(event['rawPath']).encode('utf-8').decode('latin-1')
+    else:
+        path = event.get('path') or '/'
+    query = event.get('rawQueryString')
+    if query is None:
+        query = urlencode(event.get('multiValueQueryStringParameters') or event.get('queryStringParameters') or {}, doseq=True)
+
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    # 1.0 events with multi-value headers on (ALB) may carry nothing else
+    for name, values in (event.get('multiValueHeaders') or {}).items():
+        if values:
+            headers[name.lower()] = '; '.join(values) if name.lower() == 'cookie' else ', '.join(values)
+    if event.get('cookies'):
+        # v2 events move the Cookie header into a list
+        headers['cookie'] = '; '.join(event['cookies'])
+
+    body = event.get('body') or b''
+    if isinstance(body, str):
+        body = base64.b64decode(body) if event.get('isBase64Encoded') else body.encode('utf-8')
+
+    host, _, port = headers.get('host', 'localhost').partition(':')
+    scheme = headers.get('x-forwarded-proto', 'https')
+    environ = {
+        'REQUEST_METHOD': method.upper(),
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': host,
+        'SERVER_PORT': port or ('443' if scheme == 'https' else '80'),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': http.get('sourceIp', headers.get('x-forwarded-for', '').split(',')[0].strip() or '127.0.0.1'),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scheme,
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in headers.items():
+        key = name.upper().replace('-', '_')
+        if key == 'CONTENT_TYPE':
+            environ[key] = value
+        elif key != 'CONTENT_LENGTH':  # worked out from the body
+            environ[f'HTTP_{key}'] = value
+    return environ
+
+
+def run_wsgi(app, environ):
+    """Call `app` and return (status code, header list, body bytes)."""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+        return chunks.append
+
+    chunks = []
+    result = app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        # Fires request_finished, which returns database connections
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], b''.join(chunks)
+
+
+def is_text(headers):
+    content_type = headers.get('content-type', '')
+    return not headers.get('content-encoding') and content_type.startswith(TEXT_TYPES)
+
+
+def is_v1(event):
+    """Whether the event uses the 1.0 payload format (REST APIs, ALB) rather than 2.0."""
+    return event.get('version') == '1.0' or 'httpMethod' in event
+
+
+def handle_event(app, event, context=None):
+    """Run an event through the WSGI app and build the platform's response dict."""
+    status, header_list, body = run_wsgi(app, event_environ(event))
+
+    headers = {}
+    cookies = []
+    for name, value in header_list:
+        if name.lower() == 'set-cookie':
+            cookies.append(value)
+        elif name.lower() in headers:
+            headers[name.lower()] += f', {value}'
+        else:
+            headers[name.lower()] = value
+
+    response = {'statusCode': status, 'headers': headers}
+    if is_v1(event):
+        # No `cookies` in the 1.0 format, and one header value per name -
+        # each cookie has to be its own entry in multiValueHeaders
+        if cookies:
+            response['multiValueHeaders'] = {'set-cookie': cookies}
+    else:
+        response['cookies'] = cookies
+    if is_text(headers):
+        response['body'] = body.decode(headers.get('content-type', '').partition('charset=')[2] or 'utf-8')
+        response['isBase64Encoded'] = False
+    else:
+        response['body'] = base64.b64encode(body).decode('ascii')
+        response['isBase64Encoded'] = True
+    return response
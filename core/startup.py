@@ -0,0 +1,97 @@
+# core/startup.py
+"""
+Start-up profiling - what a gunicorn worker or serverless cold start
+imports before it can answer, and how long that takes.
+
+profile_startup() imports timmy_gym_demo.wsgi (and, by default, the
+URLconf, which the first request loads) in a fresh interpreter under
+`python -X importtime`. Django loads apps through importlib.import_module,
+which -X importtime does not time, so the probe routes those imports
+through the import statement first.
+"""
+import json
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# Wall time a fresh worker may spend importing the project and its URLconf
+STARTUP_BUDGET_MS = 1500
+
+# Loaded on demand - nothing at start-up should import these
+LAZY_MODULES = [
+    'PIL',                    # image handling
+    'memberships.forms',      # billing and purchase forms
+    'memberships.payments',   # payment pipeline
+    'accounts.admin',         # admin customisations
+    'bookings.admin',
+    'memberships.admin',
+]
+
+PROBE = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+
+_import_module = importlib.import_module
+def import_module(name, package=None):
+    if package is None and not name.startswith('.'):
+        __import__(name)
+        return sys.modules[name]
+    return _import_module(name, package)
+importlib.import_module = import_module
+
+import timmy_gym_demo.wsgi
+if {first_request}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+print(json.dumps({{'ms': (time.perf_counter() - started) * 1000, 'modules': sorted(sys.modules)}}))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self):
+        return self.name.split('.')[0]
+
+
+@dataclass
+class StartupProfile:
+    ms: float
+    modules: set
+    imports: list = field(default_factory=list)
+
+    def total_us(self, packages):
+        """Own import time of every module in `packages`."""
+        return sum(record.self_us for record in self.imports if record.package in packages)
+
+
+def profile_startup(first_request=True, env=None):
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(first_request=first_request)],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        raise RuntimeError(f'Start-up probe failed:\n{process.stderr}')
+
+    imports = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(ImportRecord(name, int(self_us), int(cumulative_us), len(indent) // 2))
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return StartupProfile(ms=result['ms'], modules=set(result['modules']), imports=imports)
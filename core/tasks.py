@@ -0,0 +1,53 @@
+# core/tasks.py
+"""
+Tiny in-process background job runner.
+
+Jobs run on a shared thread pool so request threads never wait on slow
+work (payment gateways, image processing). Jobs are queued after the
+surrounding transaction commits, so they always see the rows the request
+created. With BACKGROUND_TASKS_EAGER on, jobs run inline - handy in tests.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 4),
+                thread_name_prefix='background',
+            )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background job %s failed', getattr(func, '__name__', func))
+        raise
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Queue func(*args, **kwargs) to run once the current transaction commits.
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
@@ -0,0 +1,40 @@
+# core/templatetags/pictures.py
+from django import template
+from django.core.files.storage import default_storage
+
+from core.images import VARIANTS
+
+register = template.Library()
+
+
+@register.inclusion_tag('core/picture.html')
+def picture(owner, size, alt='', css_class=''):
+    """
+    {% picture profile 64 alt=user.get_full_name css_class="avatar" %}
+
+    Shows `owner`'s picture `size` CSS pixels wide. The browser picks the
+    smallest variant that fits from the srcset (WebP where it can); `src`
+    is the smallest that fits at 1x. Until the variants exist - the job is
+    still running, or there is no picture - a placeholder icon is shown.
+    """
+    variants = getattr(owner, 'picture_variants', None) or {}
+    available = []
+    for name in VARIANTS:
+        variant = variants.get(name)
+        # A small original gives several variants the same size - list it once
+        if variant and all(variant['width'] != other['width'] for other in available):
+            available.append(variant)
+    available.sort(key=lambda variant: variant['width'])
+
+    context = {'size': size, 'alt': alt, 'css_class': css_class}
+    if not available:
+        return context
+
+    fits = next((variant for variant in available if variant['width'] >= size), available[-1])
+    context.update(
+        src=default_storage.url(fits['jpeg']),
+        height=round(size * fits['height'] / fits['width']),
+        webp_srcset=', '.join(f"{default_storage.url(variant['webp'])} {variant['width']}w" for variant in available),
+        jpeg_srcset=', '.join(f"{default_storage.url(variant['jpeg'])} {variant['width']}w" for variant in available),
+    )
+    return context
@@ -0,0 +1,67 @@
+# core/uploads.py
+"""
+Upload size limit, enforced while the request body streams in.
+
+SizeLimitUploadHandler sits first in FILE_UPLOAD_HANDLERS and counts each
+file's bytes as Django reads them. Once a file passes
+FILE_UPLOAD_MAX_SIZE the rest of it is read off the socket and dropped,
+so a 20 MB phone photo costs a few MB of temporary file, never 20 MB of
+memory. The form then gets an OversizedUpload in place of the file, and
+PictureField turns that into a normal validation error.
+"""
+import io
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+
+def max_upload_size():
+    return getattr(settings, 'FILE_UPLOAD_MAX_SIZE', 5 * 1024 * 1024)
+
+
+class OversizedUpload(UploadedFile):
+    """Stands in for a file that went over the limit - the name, no content."""
+
+    def __init__(self, name, content_type, size, charset=None):
+        super().__init__(io.BytesIO(), name, content_type, size, charset)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            # Returning None keeps the chunk from the handlers after us
+            self.oversized = True
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.oversized:
+            return OversizedUpload(self.file_name, self.content_type, self.received, self.charset)
+        return None
+
+
+class PictureField(forms.ImageField):
+    """ImageField that reports oversized uploads before trying to read them."""
+
+    default_error_messages = {
+        'too_large': 'Pictures must be %(max)s or smaller.',
+    }
+
+    def to_python(self, data):
+        if data and (isinstance(data, OversizedUpload) or data.size > max_upload_size()):
+            raise forms.ValidationError(
+                self.error_messages['too_large'],
+                code='too_large',
+                params={'max': filesizeformat(max_upload_size())},
+            )
+        return super().to_python(data)
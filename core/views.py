@@ -1,5 +1,8 @@
 from django.shortcuts import render
 
+from .caching import cache_anonymous_page
+
+@cache_anonymous_page()
 def home(request):
     """
     Home screen controller - the main hub of your game world
@@ -0,0 +1,22 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings - plain `gunicorn` serves the site.
+
+SERVER_MODE picks the interface:
+- wsgi (default): sync workers, one request per worker at a time
+- asgi: Django's ASGI app on uvicorn workers, so the async JSON endpoints
+  that the browser polls are served concurrently within each worker
+"""
+import os
+
+_server_mode = os.environ.get('SERVER_MODE', 'wsgi').lower()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+
+if _server_mode == 'asgi':
+    wsgi_app = 'timmy_gym_demo.asgi:application'
+    # uvicorn.workers is deprecated - the worker lives in uvicorn-worker now
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'timmy_gym_demo.wsgi:application'
@@ -1,6 +1,6 @@
 # memberships/admin.py
 from django.contrib import admin
-from .models import MembershipPlan, Membership
+from .models import MembershipPlan, Membership, PaymentAttempt
 
 @admin.register(MembershipPlan)
 class MembershipPlanAdmin(admin.ModelAdmin):
@@ -71,4 +71,14 @@ class MembershipAdmin(admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing existing membership
             return ['user', 'created_at']
-        return ['created_at']
\ No newline at end of file
+        return ['created_at']
+
+@admin.register(PaymentAttempt)
+class PaymentAttemptAdmin(admin.ModelAdmin):
+    """
+    Receipts for every checkout charge
+    """
+    list_display = ['user', 'plan', 'amount', 'status', 'card_last4', 'created_at']
+    list_filter = ['status', 'plan']
+    search_fields = ['user__username', 'gateway_reference']
+    readonly_fields = ['created_at', 'updated_at']
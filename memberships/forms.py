@@ -4,7 +4,9 @@ from django.contrib.auth.models import User
 from datetime import datetime, timedelta
 from django.utils import timezone
 from decimal import Decimal
-from .models import MembershipPlan, Membership
+from core.catalog import CatalogChoiceField, active_plans
+
+from .models import get_membership
 
 class MembershipPurchaseForm(forms.Form):
     """
@@ -73,17 +75,19 @@ class MembershipPurchaseForm(forms.Form):
         
         # Check if user already has active membership
         if self.user:
-            try:
-                existing_membership = Membership.objects.get(user=self.user)
-                if existing_membership.is_active:
-                    raise ValidationError(
-                        "You already have an active membership. Please cancel your current membership before purchasing a new one."
-                    )
-            except Membership.DoesNotExist:
-                pass
+            existing_membership = get_membership(self.user)
+            if existing_membership and existing_membership.is_active:
+                raise ValidationError(
+                    "You already have an active membership. Please cancel your current membership before purchasing a new one."
+                )
         
         return cleaned_data
 
+def expiry_years():
+    """This year and the next nine - worked out per form, not frozen at import"""
+    this_year = datetime.now().year
+    return [(i, str(i)) for i in range(this_year, this_year + 10)]
+
 class BillingInfoForm(forms.Form):
     """
     Mock payment form - like in-game purchase screen
@@ -126,7 +130,7 @@ class BillingInfoForm(forms.Form):
     )
     
     expiry_year = forms.ChoiceField(
-        choices=[(i, str(i)) for i in range(datetime.now().year, datetime.now().year + 10)],
+        choices=expiry_years,
         widget=forms.Select(attrs={'class': 'form-select'}),
         label="Expiry Year"
     )
@@ -236,8 +240,8 @@ class MembershipUpgradeForm(forms.Form):
     """
     Membership upgrade form - character class upgrade
     """
-    new_plan = forms.ModelChoiceField(
-        queryset=MembershipPlan.objects.filter(is_active=True),
+    new_plan = CatalogChoiceField(
+        active_plans,
         widget=forms.RadioSelect(attrs={'class': 'form-check-input'}),
         label="Select New Plan"
     )
@@ -256,10 +260,8 @@ class MembershipUpgradeForm(forms.Form):
         
         if self.current_membership:
             # Only show plans that are upgrades (higher price)
-            self.fields['new_plan'].queryset = MembershipPlan.objects.filter(
-                is_active=True,
-                monthly_price__gt=self.current_membership.plan.monthly_price
-            ).order_by('monthly_price')
+            current_price = self.current_membership.plan.monthly_price
+            self.fields['new_plan'].limit_to = lambda plan: plan.monthly_price > current_price
     
     def clean_new_plan(self):
         new_plan = self.cleaned_data.get('new_plan')
@@ -311,8 +313,8 @@ class QuickMembershipForm(forms.Form):
     """
     Simplified membership selection for dashboard or popups
     """
-    plan = forms.ModelChoiceField(
-        queryset=MembershipPlan.objects.filter(is_active=True),
+    plan = CatalogChoiceField(
+        active_plans,
         widget=forms.Select(attrs={'class': 'form-select form-select-lg'}),
         empty_label="Choose Your Plan...",
         label="Select Membership Plan"
@@ -323,7 +325,7 @@ class QuickMembershipForm(forms.Form):
         
         # Customize plan display
         plan_choices = []
-        for plan in MembershipPlan.objects.filter(is_active=True).order_by('sort_order'):
+        for plan in active_plans.all():
             plan_choices.append((
                 plan.id, 
                 f"{plan.name} - R{plan.monthly_price}/month"
@@ -352,8 +354,8 @@ class MembershipGiftForm(forms.Form):
         label="Recipient's Name"
     )
     
-    plan = forms.ModelChoiceField(
-        queryset=MembershipPlan.objects.filter(is_active=True),
+    plan = CatalogChoiceField(
+        active_plans,
         widget=forms.RadioSelect(attrs={'class': 'form-check-input'}),
         label="Gift Plan"
     )
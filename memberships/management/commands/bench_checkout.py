@@ -0,0 +1,110 @@
+# memberships/management/commands/bench_checkout.py
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import scratch_database
+from memberships.models import MembershipPlan, PaymentAttempt
+from memberships.purchase import COOKIE_NAME, signed_purchase
+
+BILLING_FORM = {
+    'full_name': 'Load Test',
+    'email': 'load@example.com',
+    'card_number': '4111111111111111',
+    'expiry_month': '12',
+    'cvv': '123',
+    'address_line1': '1 Bench Street',
+    'city': 'Johannesburg',
+    'province': 'GP',
+    'postal_code': '2000',
+}
+
+
+class Command(BaseCommand):
+    help = 'Load-test checkout with the payment charge inline (old behaviour) and as a background job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=40, help='Checkouts per mode')
+        parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous shoppers')
+        parser.add_argument('--latency', type=float, default=1.0, help='Mock gateway latency in seconds')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            plan = MembershipPlan.objects.create(
+                name='Bench Plan', plan_type='basic', description='Benchmark plan',
+                monthly_price=299, setup_fee=0,
+            )
+
+            results = {}
+            for label, eager in [('inline', True), ('background', False)]:
+                with override_settings(
+                    BACKGROUND_TASKS_EAGER=eager,
+                    MOCK_PAYMENT_LATENCY=options['latency'],
+                    ALLOWED_HOSTS=['*'],
+                ):
+                    results[label] = self.run(label, plan, options)
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+            self.stdout.write(f"{'mode':<12} {'p50 ms':>10} {'p95 ms':>10} {'req/s':>8} {'done in s':>10}")
+            for label, result in results.items():
+                self.stdout.write(
+                    f"{label:<12} {result['p50']:>10.1f} {result['p95']:>10.1f} "
+                    f"{result['throughput']:>8.1f} {result['completed']:>10.2f}"
+                )
+
+    def run(self, label, plan, options):
+        users = User.objects.bulk_create(
+            User(username=f'{label}-shopper{i}') for i in range(options['checkouts'])
+        )
+        checkout_url = reverse('memberships:membership_checkout')
+        local = threading.local()
+
+        def checkout(user):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client()
+            client.force_login(user)
+            client.cookies[COOKIE_NAME] = signed_purchase(user, {
+                'plan_id': plan.id,
+                'start_immediately': True,
+                'billing_cycle': 'monthly',
+                'agree_terms': True,
+            })
+
+            started = time.perf_counter()
+            response = client.post(checkout_url, {**BILLING_FORM, 'expiry_year': str(time.localtime().tm_year + 1)})
+            elapsed = (time.perf_counter() - started) * 1000
+            close_old_connections()
+            if response.status_code != 302:
+                raise RuntimeError(f'Checkout failed with status {response.status_code}')
+            return elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            timings = sorted(pool.map(checkout, users))
+        responded = time.perf_counter() - started
+
+        # Background charges keep running after the responses go out
+        attempts = PaymentAttempt.objects.filter(user__in=users)
+        while attempts.filter(status__in=['pending', 'processing']).exists():
+            time.sleep(0.05)
+        completed = time.perf_counter() - started
+
+        result = {
+            'p50': statistics.median(timings),
+            'p95': timings[int(len(timings) * 0.95) - 1],
+            'throughput': len(timings) / responded,
+            'completed': completed,
+        }
+        self.stdout.write(
+            f"{label:<12} p50 {result['p50']:.1f} ms, p95 {result['p95']:.1f} ms, "
+            f"{result['throughput']:.1f} req/s, all charges settled in {completed:.2f} s"
+        )
+        return result
@@ -0,0 +1,21 @@
+# memberships/management/commands/expire_payment_attempts.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from memberships.payments import expire_stale_attempts
+
+
+class Command(BaseCommand):
+    help = 'Fail payment attempts whose background job died (run every few minutes from a scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=int, default=settings.PAYMENT_ATTEMPT_TIMEOUT,
+            help='Seconds an attempt may stay pending or processing'
+        )
+
+    def handle(self, *args, **options):
+        expired = expire_stale_attempts(options['timeout'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Failed {expired['pending']:,} pending and {expired['processing']:,} processing payment attempts"
+        ))
@@ -0,0 +1,16 @@
+# memberships/middleware.py
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import get_membership
+
+
+class MembershipMiddleware(MiddlewareMixin):
+    """
+    Adds a lazy `request.membership` - the player's current game pass (with
+    its plan), fetched on first use and shared by every view, form and
+    template in the request. Falsy when there is no membership.
+    """
+
+    def process_request(self, request):
+        request.membership = SimpleLazyObject(lambda: get_membership(request.user))
@@ -66,4 +66,63 @@ class Membership(models.Model):
     
     @property
     def is_active(self):
-        return self.status == 'active'
\ No newline at end of file
+        return self.status == 'active'
+
+
+class PaymentAttempt(models.Model):
+    """
+    One checkout charge - the receipt the checkout page watches while the
+    payment gateway does its thing in the background.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payment_attempts')
+    plan = models.ForeignKey(MembershipPlan, on_delete=models.PROTECT)
+    membership = models.ForeignKey(Membership, on_delete=models.SET_NULL, null=True, blank=True)
+    
+    amount = models.DecimalField(max_digits=8, decimal_places=2)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    purchase_data = models.JSONField(default=dict)
+    
+    # Never the full card number
+    card_last4 = models.CharField(max_length=4, blank=True)
+    gateway_reference = models.CharField(max_length=100, blank=True)
+    failure_reason = models.CharField(max_length=200, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()} - {self.plan.name} ({self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+
+def get_membership(user):
+    """
+    The user's Membership with its plan, or None. Loaded once and kept in
+    the user's related-object cache, so request.membership, user.membership
+    and the forms all share a single query.
+    """
+    if not user.is_authenticated:
+        return None
+    
+    related = Membership._meta.get_field('user').remote_field
+    if related.is_cached(user):
+        return related.get_cached_value(user)
+    
+    membership = Membership.objects.select_related('plan').filter(user=user).first()
+    related.set_cached_value(user, membership)
+    if membership:
+        Membership._meta.get_field('user').set_cached_value(membership, user)
+    return membership
@@ -0,0 +1,155 @@
+# memberships/payments.py
+"""
+Payment pipeline - checkout hands the charge to a background job and the
+page polls for the result, so no request thread ever waits on the gateway.
+
+Gateways are pluggable: PAYMENT_GATEWAY names the class to use. The local
+MockPaymentGateway stands in for Stripe, PayFast and friends.
+
+A job lost with its worker (a redeploy, a crash) leaves its attempt
+pending or processing, and the checkout page polling it forever.
+`python manage.py expire_payment_attempts`, run from a scheduler, fails
+attempts that have been stuck longer than PAYMENT_ATTEMPT_TIMEOUT so the
+member is sent back to checkout.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.tasks import run_in_background
+
+
+@dataclass
+class PaymentResult:
+    success: bool
+    reference: str = ''
+    message: str = ''
+
+
+class PaymentGateway:
+    """
+    Interface every payment provider adapter implements.
+    """
+
+    def charge(self, amount, billing_info, reference):
+        """
+        Charge `amount` (a Decimal in rands) and return a PaymentResult.
+        Called from a background job, so it may block.
+        """
+        raise NotImplementedError
+
+
+class MockPaymentGateway(PaymentGateway):
+    """
+    Demo gateway - 4111... cards succeed, 4000... cards are declined,
+    anything else succeeds. Sleeps for MOCK_PAYMENT_LATENCY seconds to
+    behave like a real provider round-trip.
+    """
+
+    def charge(self, amount, billing_info, reference):
+        latency = getattr(settings, 'MOCK_PAYMENT_LATENCY', 1.0)
+        if latency:
+            time.sleep(latency)
+
+        if billing_info.get('card_number', '').startswith('4000'):
+            return PaymentResult(False, message='Card declined')
+        return PaymentResult(True, reference=f'MOCK-{reference}')
+
+
+def get_payment_gateway():
+    return import_string(settings.PAYMENT_GATEWAY)()
+
+
+def start_payment(user, plan, amount, billing_info, purchase_data):
+    """
+    Record a pending payment and queue the charge. Returns the PaymentAttempt
+    the checkout page polls.
+    """
+    from .models import PaymentAttempt
+
+    attempt = PaymentAttempt.objects.create(
+        user=user,
+        plan=plan,
+        amount=amount,
+        purchase_data=purchase_data,
+        card_last4=billing_info.get('card_number', '')[-4:],
+    )
+    # Card details go to the job directly - they are never stored
+    run_in_background(process_payment, attempt.pk, billing_info)
+    return attempt
+
+
+def process_payment(attempt_id, billing_info):
+    """
+    Background job: run the charge and apply the purchase or upgrade.
+    """
+    from .models import PaymentAttempt
+    from .views import create_membership
+
+    # Claim the attempt, so running the job twice can't charge it twice and
+    # an attempt expire_payment_attempts has already failed isn't charged
+    claimed = PaymentAttempt.objects.filter(pk=attempt_id, status='pending').update(
+        status='processing', updated_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    attempt = PaymentAttempt.objects.select_related('user', 'plan').get(pk=attempt_id)
+
+    try:
+        result = get_payment_gateway().charge(attempt.amount, billing_info, attempt.pk)
+    except Exception as e:
+        result = PaymentResult(False, message=str(e) or 'Payment gateway error')
+
+    # Finish only if the attempt is still ours - expire_payment_attempts may
+    # have failed it, and told the member so, while the gateway call ran
+    still_processing = PaymentAttempt.objects.filter(pk=attempt.pk, status='processing')
+    with transaction.atomic():
+        if not result.success:
+            still_processing.update(status='failed', failure_reason=result.message, updated_at=timezone.now())
+            return
+        finished = still_processing.update(
+            status='succeeded', gateway_reference=result.reference, updated_at=timezone.now(),
+        )
+        if not finished:
+            # Charged after all - keep the reference so it can be refunded
+            PaymentAttempt.objects.filter(pk=attempt.pk).update(gateway_reference=result.reference)
+            return
+        if attempt.purchase_data.get('upgrade'):
+            membership = attempt.user.membership
+            membership.plan = attempt.plan
+            membership.save()
+        else:
+            membership = create_membership(attempt.user, attempt.plan, attempt.purchase_data)
+        PaymentAttempt.objects.filter(pk=attempt.pk).update(membership=membership)
+
+
+# Card details are never stored, so a stuck attempt can't be charged again -
+# only failed, with a reason the member sees back at checkout
+STALE_REASONS = {
+    'pending': 'Payment was not processed - please try again',
+    'processing': 'Payment timed out - check your statement before trying again',
+}
+
+
+def expire_stale_attempts(timeout=None):
+    """
+    Fail attempts left pending or processing for longer than `timeout`
+    seconds (default PAYMENT_ATTEMPT_TIMEOUT). Returns {status: count}.
+    """
+    from .models import PaymentAttempt
+
+    if timeout is None:
+        timeout = getattr(settings, 'PAYMENT_ATTEMPT_TIMEOUT', 600)
+    now = timezone.now()
+    expired = {}
+    for status, reason in STALE_REASONS.items():
+        # Conditional on the status, so a job finishing right now wins
+        expired[status] = PaymentAttempt.objects.filter(
+            status=status, updated_at__lt=now - timedelta(seconds=timeout),
+        ).update(status='failed', failure_reason=reason, updated_at=now)
+    return expired
@@ -0,0 +1,59 @@
+# memberships/purchase.py
+"""
+Purchase in progress - the plan and options picked on the purchase page,
+carried over to checkout.
+
+None of it is secret (a plan id and a few choices), so it travels in a
+signed cookie instead of the session and the purchase flow writes no
+session rows. The signature is salted with the member's id, so a cookie
+is useless to anyone else, and it lapses after PURCHASE_COOKIE_MAX_AGE.
+"""
+import json
+
+from django.conf import settings
+from django.core import signing
+
+COOKIE_NAME = 'membership_purchase'
+
+
+def _salt(user):
+    return f'{COOKIE_NAME}:{user.pk}'
+
+
+def _max_age():
+    return getattr(settings, 'PURCHASE_COOKIE_MAX_AGE', 3600)
+
+
+def signed_purchase(user, data):
+    """Cookie value carrying `data` for `user` - what save_purchase sets."""
+    # Same signer request.get_signed_cookie checks against
+    signer = signing.get_cookie_signer(salt=COOKIE_NAME + _salt(user))
+    return signer.sign(json.dumps(data))
+
+
+def save_purchase(response, user, data):
+    response.set_cookie(
+        COOKIE_NAME,
+        signed_purchase(user, data),
+        max_age=_max_age(),
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def load_purchase(request):
+    """The purchase saved for this member, or None if missing, tampered with or expired."""
+    value = request.get_signed_cookie(
+        COOKIE_NAME, default=None, salt=_salt(request.user), max_age=_max_age()
+    )
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def clear_purchase(response):
+    response.delete_cookie(COOKIE_NAME, samesite='Lax')
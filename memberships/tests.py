@@ -1,3 +1,363 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .forms import BillingInfoForm, MembershipUpgradeForm
+from .middleware import MembershipMiddleware
+from .models import MembershipPlan, Membership, PaymentAttempt
+from .purchase import COOKIE_NAME, signed_purchase
+
+
+def billing_data(card_number='4111111111111111'):
+    return {
+        'full_name': 'Test Member',
+        'email': 'member@example.com',
+        'card_number': card_number,
+        'expiry_month': '12',
+        'expiry_year': str(datetime.now().year + 1),
+        'cvv': '123',
+        'address_line1': '1 Test Street',
+        'city': 'Johannesburg',
+        'province': 'GP',
+        'postal_code': '2000',
+    }
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, MOCK_PAYMENT_LATENCY=0)
+class CheckoutPaymentTests(TestCase):
+    """
+    Checkout hands the charge to a background job and returns straight away
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass')
+        self.plan = MembershipPlan.objects.create(
+            name='Basic', plan_type='basic', description='Basic plan',
+            monthly_price=299, setup_fee=100,
+        )
+        self.client.force_login(self.user)
+        self.client.cookies[COOKIE_NAME] = signed_purchase(self.user, {
+            'plan_id': self.plan.id,
+            'start_immediately': True,
+            'billing_cycle': 'monthly',
+            'agree_terms': True,
+        })
+
+    def checkout(self, card_number='4111111111111111', run_jobs=True):
+        with self.captureOnCommitCallbacks(execute=run_jobs):
+            response = self.client.post(reverse('memberships:membership_checkout'), billing_data(card_number))
+        attempt = PaymentAttempt.objects.get(user=self.user)
+        self.assertRedirects(
+            response,
+            reverse('memberships:membership_checkout_status', args=[attempt.id]),
+            fetch_redirect_response=False,
+        )
+        attempt.refresh_from_db()
+        return attempt
+
+    def test_checkout_queues_payment_without_waiting(self):
+        attempt = self.checkout(run_jobs=False)
+
+        self.assertEqual(attempt.status, 'pending')
+        self.assertEqual(attempt.amount, 399)
+        self.assertEqual(attempt.card_last4, '1111')
+        self.assertFalse(hasattr(self.user, 'membership'))
+
+        response = self.client.get(reverse('memberships:membership_checkout_status', args=[attempt.id]))
+        self.assertTemplateUsed(response, 'memberships/processing.html')
+
+        response = self.client.get(reverse('memberships:checkout_status_api', args=[attempt.id]))
+        self.assertEqual(response.json(), {'status': 'pending', 'finished': False})
+
+    def test_successful_payment_activates_membership(self):
+        attempt = self.checkout()
+
+        self.assertEqual(attempt.status, 'succeeded')
+        self.assertEqual(attempt.membership.plan, self.plan)
+        self.assertEqual(attempt.gateway_reference, f'MOCK-{attempt.id}')
+
+        response = self.client.get(reverse('memberships:membership_checkout_status', args=[attempt.id]))
+        self.assertRedirects(response, reverse('memberships:membership_success'), fetch_redirect_response=False)
+        self.assertEqual(self.client.cookies[COOKIE_NAME].value, '')
+
+    def test_declined_card_fails_attempt(self):
+        attempt = self.checkout(card_number='4000000000000002')
+
+        self.assertEqual(attempt.status, 'failed')
+        self.assertEqual(attempt.failure_reason, 'Card declined')
+        self.assertIsNone(attempt.membership)
+
+        response = self.client.get(reverse('memberships:membership_checkout_status', args=[attempt.id]))
+        self.assertRedirects(response, reverse('memberships:membership_checkout'), fetch_redirect_response=False)
+
+    def test_attempt_is_only_charged_once(self):
+        from .payments import process_payment
+
+        attempt = self.checkout()
+        process_payment(attempt.id, billing_data())
+
+        self.assertEqual(PaymentAttempt.objects.filter(status='succeeded').count(), 1)
+
+    def test_stuck_attempts_are_failed(self):
+        from .payments import process_payment
+
+        pending = self.checkout(run_jobs=False)
+        processing = PaymentAttempt.objects.create(user=self.user, plan=self.plan, amount=399, status='processing')
+        fresh = PaymentAttempt.objects.create(user=self.user, plan=self.plan, amount=399)
+        PaymentAttempt.objects.exclude(pk=fresh.pk).update(updated_at=timezone.now() - timedelta(minutes=11))
+
+        out = StringIO()
+        call_command('expire_payment_attempts', stdout=out)
+        self.assertIn('Failed 1 pending and 1 processing', out.getvalue())
+
+        for attempt in (pending, processing, fresh):
+            attempt.refresh_from_db()
+        self.assertEqual((pending.status, processing.status, fresh.status), ('failed', 'failed', 'pending'))
+        self.assertIn('check your statement', processing.failure_reason)
+
+        # The lost job turning up late doesn't charge the expired attempt
+        process_payment(pending.id, billing_data())
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'failed')
+        self.assertFalse(Membership.objects.filter(user=self.user).exists())
+
+        response = self.client.get(reverse('memberships:membership_checkout_status', args=[pending.id]))
+        self.assertRedirects(response, reverse('memberships:membership_checkout'), fetch_redirect_response=False)
+
+    def test_attempt_expired_during_the_charge_stays_failed(self):
+        from .payments import MockPaymentGateway, PaymentResult, expire_stale_attempts, process_payment
+
+        attempt = self.checkout(run_jobs=False)
+
+        def slow_charge(gateway, amount, billing_info, reference):
+            # The sweep runs while the gateway is still thinking
+            PaymentAttempt.objects.filter(pk=attempt.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+            expire_stale_attempts()
+            return PaymentResult(True, reference='LATE-1')
+
+        with mock.patch.object(MockPaymentGateway, 'charge', slow_charge):
+            process_payment(attempt.id, billing_data())
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'failed')
+        self.assertEqual(attempt.gateway_reference, 'LATE-1')
+        self.assertIsNone(attempt.membership)
+        self.assertFalse(Membership.objects.filter(user=self.user).exists())
+
+    def test_other_members_cannot_see_attempt(self):
+        attempt = self.checkout(run_jobs=False)
+        self.client.force_login(User.objects.create_user('someone-else'))
+
+        response = self.client.get(reverse('memberships:checkout_status_api', args=[attempt.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PurchaseCookieTests(TestCase):
+    """
+    The purchase step hands its choices to checkout in a signed cookie,
+    without writing the session
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass')
+        self.plan = MembershipPlan.objects.create(
+            name='Basic', plan_type='basic', description='Basic plan', monthly_price=299,
+        )
+        self.client.force_login(self.user)
+
+    def purchase(self):
+        return self.client.post(
+            reverse('memberships:membership_purchase', args=[self.plan.id]),
+            {'start_immediately': True, 'billing_cycle': 'monthly', 'agree_terms': True},
+        )
+
+    def test_purchase_reaches_checkout_without_session_writes(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.purchase()
+            response = self.client.get(reverse('memberships:membership_checkout'))
+
+        self.assertEqual(response.context['purchase_data']['plan_id'], self.plan.id)
+        # Reads are fine - the purchase itself never writes the session
+        writes = [q for q in captured if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')]
+        self.assertFalse(writes)
+
+    def test_cookie_is_bound_to_the_member(self):
+        self.purchase()
+        self.client.force_login(User.objects.create_user('someone-else'))
+
+        response = self.client.get(reverse('memberships:membership_checkout'))
+        self.assertRedirects(response, reverse('memberships:membership_plans'), fetch_redirect_response=False)
+
+    def test_tampered_cookie_is_ignored(self):
+        self.client.cookies[COOKIE_NAME] = signed_purchase(self.user, {'plan_id': self.plan.id})[:-1]
+
+        response = self.client.get(reverse('memberships:membership_checkout'))
+        self.assertRedirects(response, reverse('memberships:membership_plans'), fetch_redirect_response=False)
+
+
+class MembershipFormTests(TestCase):
+    """
+    Membership forms take plans from the catalog and dates from the clock
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass')
+        self.basic = MembershipPlan.objects.create(
+            name='Basic', plan_type='basic', description='Basic plan', monthly_price=299,
+        )
+        self.premium = MembershipPlan.objects.create(
+            name='Premium', plan_type='premium', description='Premium plan', monthly_price=599,
+        )
+
+    def test_upgrade_offers_only_pricier_plans(self):
+        today = timezone.now().date()
+        membership = Membership.objects.create(
+            user=self.user, plan=self.basic, start_date=today,
+            end_date=today + timedelta(days=20), next_billing_date=today + timedelta(days=20),
+        )
+
+        form = MembershipUpgradeForm(current_membership=membership)
+        self.assertEqual([plan for plan in form.fields['new_plan'].items()], [self.premium])
+        self.assertFalse(MembershipUpgradeForm({'new_plan': self.basic.id}, current_membership=membership).is_valid())
+        self.assertTrue(MembershipUpgradeForm({'new_plan': self.premium.id}, current_membership=membership).is_valid())
+
+    def test_expiry_years_start_this_year(self):
+        later = datetime(datetime.now().year + 3, 1, 1)
+        with mock.patch('memberships.forms.datetime') as fake_datetime:
+            fake_datetime.now.return_value = later
+            choices = list(BillingInfoForm().fields['expiry_year'].choices)
+
+        self.assertEqual(choices[0], (later.year, str(later.year)))
+
+
+class MembershipContextTests(TestCase):
+    """
+    The membership (with its plan) is loaded once per request, however many
+    views, forms and templates look at it
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass')
+        self.basic = MembershipPlan.objects.create(
+            name='Basic', plan_type='basic', description='Basic plan', monthly_price=299,
+        )
+        self.premium = MembershipPlan.objects.create(
+            name='Premium', plan_type='premium', description='Premium plan', monthly_price=599,
+        )
+        self.client.force_login(self.user)
+
+    def join(self):
+        today = timezone.now().date()
+        return Membership.objects.create(
+            user=self.user, plan=self.basic, start_date=today,
+            end_date=today + timedelta(days=20), next_billing_date=today + timedelta(days=20),
+        )
+
+    def get(self, url, queries, method='get', data=None):
+        """Request `url` in exactly `queries` queries (session and user included), one of them for the membership."""
+        with CaptureQueriesContext(connection) as captured:
+            with self.assertNumQueries(queries):
+                response = getattr(self.client, method)(url, data)
+        lookups = [q for q in captured if 'FROM "memberships_membership"' in q['sql']]
+        self.assertEqual(len(lookups), 1, 'membership looked up more than once')
+        return response
+
+    def test_lazy_and_shared_with_user_membership(self):
+        membership = self.join()
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        MembershipMiddleware(lambda request: None).process_request(request)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request.membership.plan.name, 'Basic')
+            self.assertEqual(request.user.membership.pk, membership.pk)
+
+    def test_no_membership_is_falsy(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        MembershipMiddleware(lambda request: None).process_request(request)
+
+        self.assertFalse(request.membership)
+        self.assertFalse(hasattr(request.user, 'membership'))
+
+    def test_plans_page(self):
+        self.join()
+        response = self.get(reverse('memberships:membership_plans'), 4)
+        self.assertTrue(response.context['user_has_membership'])
+
+    def test_purchase_page(self):
+        self.get(reverse('memberships:membership_purchase', args=[self.premium.id]), 4)
+
+    def test_purchase_form_shares_the_lookup(self):
+        response = self.get(
+            reverse('memberships:membership_purchase', args=[self.premium.id]), 4, method='post',
+            data={'start_immediately': True, 'billing_cycle': 'monthly', 'agree_terms': True},
+        )
+        self.assertRedirects(response, reverse('memberships:membership_checkout'), fetch_redirect_response=False)
+
+    def test_success_page(self):
+        self.join()
+        response = self.get(reverse('memberships:membership_success'), 3)
+        self.assertEqual(response.context['plan'], self.basic)
+
+    def test_manage_page(self):
+        self.join()
+        response = self.get(reverse('memberships:membership_manage'), 4)
+        self.assertEqual(list(response.context['upgrade_options']), [self.premium])
+
+    def test_cancel(self):
+        self.join()
+        self.get(reverse('memberships:membership_cancel'), 4, method='post')
+        self.assertEqual(Membership.objects.get(user=self.user).status, 'cancelled')
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True, MOCK_PAYMENT_LATENCY=0)
+    def test_upgrade(self):
+        self.join()
+        self.get(reverse('memberships:membership_upgrade', args=[self.premium.id]), 5, method='post')
+
+    def test_dashboard(self):
+        self.join()
+        response = self.get(reverse('accounts:dashboard'), 14)
+        self.assertEqual(response.context['membership'].plan, self.basic)
+
+
+class MembershipStatusApiTests(TestCase):
+    """
+    The async membership status endpoint polled by the dashboard
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass')
+
+    async def test_reports_active_membership(self):
+        plan = await MembershipPlan.objects.acreate(
+            name='Basic', plan_type='basic', description='Basic plan', monthly_price=299,
+        )
+        today = timezone.now().date()
+        await Membership.objects.acreate(
+            user=self.user, plan=plan, start_date=today,
+            end_date=today + timedelta(days=10), next_billing_date=today + timedelta(days=10),
+        )
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('memberships:membership_status_api'))
+
+        data = response.json()
+        self.assertTrue(data['is_active'])
+        self.assertEqual(data['plan_name'], 'Basic')
+        self.assertEqual(data['days_remaining'], 10)
+
+    async def test_reports_no_membership(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('memberships:membership_status_api'))
+
+        self.assertEqual(response.json(), {'has_membership': False, 'is_active': False})
@@ -12,6 +12,7 @@ urlpatterns = [
     # Purchase flow
     path('purchase/<int:plan_id>/', views.membership_purchase, name='membership_purchase'),
     path('checkout/', views.membership_checkout, name='membership_checkout'),
+    path('checkout/<int:attempt_id>/', views.membership_checkout_status, name='membership_checkout_status'),
     path('success/', views.membership_success, name='membership_success'),
     
     # Management (login required)
@@ -22,4 +23,5 @@ urlpatterns = [
     
     # AJAX endpoints
     path('api/status/', views.check_membership_status, name='membership_status_api'),
+    path('api/checkout/<int:attempt_id>/', views.checkout_status_api, name='checkout_status_api'),
 ]
\ No newline at end of file
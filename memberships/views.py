@@ -6,36 +6,42 @@ from django.utils.decorators import method_decorator
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.db.models import Q
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 
-from .models import MembershipPlan, Membership
-from .forms import MembershipPurchaseForm, BillingInfoForm
+from copy import copy
+from decimal import Decimal
 
+from core.caching import cache_anonymous_page
+from core.catalog import active_plans
+
+from .models import MembershipPlan, Membership, PaymentAttempt
+# .forms (billing) and .payments are imported by the views that use them -
+# most requests never need them, so workers start without them
+from .purchase import clear_purchase, load_purchase, save_purchase
+
+@cache_anonymous_page(catalogs=[active_plans])
 def membership_plans(request):
     """
     Public membership plans display - like character class selection
     Available to all visitors
     """
-    plans = MembershipPlan.objects.filter(is_active=True).order_by('sort_order', 'monthly_price')
+    plans_version, plans, _ = active_plans.snapshot()
     
-    # Convert QuerySet to list and add popular plan indicator
-    plans_list = list(plans)
+    # Copies - the catalog's plans are shared with every other request
+    plans_list = [copy(plan) for plan in plans]
     if len(plans_list) >= 3:
         plans_list[1].is_popular = True
     
     context = {
         'plans': plans_list,  # Use the modified list instead of QuerySet
+        'plans_version': plans_version,  # keys the cached plan cards
         'user_has_membership': False,
     }
     
     # Check if user has active membership
-    if request.user.is_authenticated:
-        try:
-            membership = Membership.objects.get(user=request.user)
-            context['user_has_membership'] = membership.is_active
-            context['current_membership'] = membership
-        except Membership.DoesNotExist:
-            pass
+    if request.membership:
+        context['user_has_membership'] = request.membership.is_active
+        context['current_membership'] = request.membership
     
     return render(request, 'memberships/plans.html', context)
 @login_required
@@ -44,28 +50,29 @@ def membership_purchase(request, plan_id):
     Membership purchase flow - like buying a game upgrade
     Step 1: Plan selection and user info confirmation
     """
-    plan = get_object_or_404(MembershipPlan, id=plan_id, is_active=True)
+    plan = active_plans.get(plan_id)
+    if plan is None:
+        raise Http404('No such membership plan')
     
     # Check if user already has active membership
-    try:
-        existing_membership = Membership.objects.get(user=request.user)
-        if existing_membership.is_active:
-            messages.warning(request, 'You already have an active membership. You can upgrade or cancel your current plan.')
-            return redirect('memberships:membership_manage')
-    except Membership.DoesNotExist:
-        pass
+    if request.membership and request.membership.is_active:
+        messages.warning(request, 'You already have an active membership. You can upgrade or cancel your current plan.')
+        return redirect('memberships:membership_manage')
+    
+    from .forms import MembershipPurchaseForm
     
     if request.method == 'POST':
         form = MembershipPurchaseForm(request.POST, user=request.user, plan=plan)
         if form.is_valid():
-            # Store form data in session for payment step
-            request.session['membership_purchase'] = {
+            # Carry the choices to the payment step in a signed cookie
+            response = redirect('memberships:membership_checkout')
+            save_purchase(response, request.user, {
                 'plan_id': plan.id,
                 'start_immediately': form.cleaned_data['start_immediately'],
                 'billing_cycle': form.cleaned_data['billing_cycle'],
                 'agree_terms': form.cleaned_data['agree_terms'],
-            }
-            return redirect('memberships:membership_checkout')
+            })
+            return response
     else:
         form = MembershipPurchaseForm(user=request.user, plan=plan)
     
@@ -82,42 +89,35 @@ def membership_checkout(request):
     Payment processing page - like in-game store checkout
     Step 2: Payment information and processing
     """
-    # Get purchase data from session
-    purchase_data = request.session.get('membership_purchase')
+    # Get purchase data from the purchase step
+    purchase_data = load_purchase(request)
     if not purchase_data:
         messages.error(request, 'Invalid purchase session. Please select a plan again.')
-        return redirect('memberships:plans')
+        return redirect('memberships:membership_plans')
     
     plan = get_object_or_404(MembershipPlan, id=purchase_data['plan_id'])
     
+    # Calculate total cost
+    total_cost = plan.monthly_price + plan.setup_fee
+    
+    from .forms import BillingInfoForm
+    from .payments import start_payment
+    
     if request.method == 'POST':
         billing_form = BillingInfoForm(request.POST)
         if billing_form.is_valid():
-            # Mock payment processing
-            payment_success = process_mock_payment(
+            # Hand the charge to the payment pipeline and let the page poll for the result
+            attempt = start_payment(
                 user=request.user,
                 plan=plan,
+                amount=total_cost,
                 billing_info=billing_form.cleaned_data,
                 purchase_data=purchase_data
             )
-            
-            if payment_success:
-                # Create membership
-                create_membership(request.user, plan, purchase_data)
-                
-                # Clear session data
-                del request.session['membership_purchase']
-                
-                messages.success(request, f'Welcome to {plan.name}! Your membership is now active.')
-                return redirect('memberships:membership_success')
-            else:
-                messages.error(request, 'Payment processing failed. Please try again.')
+            return redirect('memberships:membership_checkout_status', attempt_id=attempt.id)
     else:
         billing_form = BillingInfoForm()
     
-    # Calculate total cost
-    total_cost = plan.monthly_price + plan.setup_fee
-    
     context = {
         'plan': plan,
         'billing_form': billing_form,
@@ -134,11 +134,10 @@ def membership_success(request):
     Purchase confirmation page - quest completed screen
     """
     # Get user's latest membership
-    try:
-        membership = Membership.objects.get(user=request.user)
-    except Membership.DoesNotExist:
+    membership = request.membership
+    if not membership:
         messages.error(request, 'No membership found.')
-        return redirect('memberships:plans')
+        return redirect('memberships:membership_plans')
     
     context = {
         'membership': membership,
@@ -155,14 +154,11 @@ class MembershipManageView(DetailView):
     context_object_name = 'membership'
     
     def get_object(self):
-        try:
-            return Membership.objects.get(user=self.request.user)
-        except Membership.DoesNotExist:
-            return None
+        return self.request.membership or None
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        membership = self.get_object()
+        membership = self.object
         
         if membership:
             # Calculate usage statistics
@@ -183,12 +179,12 @@ class MembershipManageView(DetailView):
                 context['days_remaining'] = max(0, days_remaining)
             
             # Available upgrade options
-            context['upgrade_options'] = MembershipPlan.objects.filter(
-                is_active=True,
-                monthly_price__gt=membership.plan.monthly_price
-            ).order_by('monthly_price')
+            context['upgrade_options'] = sorted(
+                (plan for plan in active_plans.all() if plan.monthly_price > membership.plan.monthly_price),
+                key=lambda plan: plan.monthly_price
+            )
         
-        context['available_plans'] = MembershipPlan.objects.filter(is_active=True)
+        context['available_plans'] = active_plans.all()
         return context
 
 @login_required
@@ -196,11 +192,10 @@ def membership_cancel(request):
     """
     Membership cancellation - unsubscribe flow
     """
-    try:
-        membership = Membership.objects.get(user=request.user)
-    except Membership.DoesNotExist:
+    membership = request.membership
+    if not membership:
         messages.error(request, 'No active membership found.')
-        return redirect('memberships:plans')
+        return redirect('memberships:membership_plans')
     
     if not membership.is_active:
         messages.warning(request, 'Your membership is already inactive.')
@@ -229,13 +224,14 @@ def membership_upgrade(request, plan_id):
     """
     Upgrade existing membership - character class upgrade
     """
-    new_plan = get_object_or_404(MembershipPlan, id=plan_id, is_active=True)
+    new_plan = active_plans.get(plan_id)
+    if new_plan is None:
+        raise Http404('No such membership plan')
     
-    try:
-        current_membership = Membership.objects.get(user=request.user)
-    except Membership.DoesNotExist:
+    current_membership = request.membership
+    if not current_membership:
         messages.error(request, 'No current membership found.')
-        return redirect('memberships:plans')
+        return redirect('memberships:membership_plans')
     
     # Check if this is actually an upgrade
     if new_plan.monthly_price <= current_membership.plan.monthly_price:
@@ -243,6 +239,8 @@ def membership_upgrade(request, plan_id):
         return redirect('memberships:membership_manage')
     
     if request.method == 'POST':
+        from .payments import start_payment
+        
         # Calculate prorated costs
         days_remaining = (current_membership.end_date - timezone.now().date()).days
         current_daily_rate = current_membership.plan.monthly_price / 30
@@ -250,16 +248,15 @@ def membership_upgrade(request, plan_id):
         
         prorated_cost = (new_daily_rate - current_daily_rate) * days_remaining
         
-        # Mock payment processing for upgrade
-        if process_mock_payment(request.user, new_plan, {}, {'upgrade': True}):
-            # Update membership
-            current_membership.plan = new_plan
-            current_membership.save()
-            
-            messages.success(request, f'Successfully upgraded to {new_plan.name}!')
-            return redirect('memberships:membership_manage')
-        else:
-            messages.error(request, 'Upgrade payment failed. Please try again.')
+        # Upgrade charges go through the same payment pipeline as purchases
+        attempt = start_payment(
+            user=request.user,
+            plan=new_plan,
+            amount=max(prorated_cost, Decimal('0')).quantize(Decimal('0.01')),
+            billing_info={},
+            purchase_data={'upgrade': True}
+        )
+        return redirect('memberships:membership_checkout_status', attempt_id=attempt.id)
     
     # Calculate upgrade costs
     days_remaining = (current_membership.end_date - timezone.now().date()).days
@@ -280,11 +277,10 @@ def membership_billing_history(request):
     """
     Billing history and invoices - transaction log
     """
-    try:
-        membership = Membership.objects.get(user=request.user)
-    except Membership.DoesNotExist:
+    membership = request.membership
+    if not membership:
         messages.error(request, 'No membership found.')
-        return redirect('memberships:plans')
+        return redirect('memberships:membership_plans')
     
     # Mock billing history (you would integrate with actual payment provider)
     mock_transactions = generate_mock_billing_history(membership)
@@ -295,11 +291,12 @@ def membership_billing_history(request):
     }
     return render(request, 'memberships/billing_history.html', context)
 
+@cache_anonymous_page(catalogs=[active_plans])
 def membership_compare(request):
     """
     Plan comparison tool - feature matrix
     """
-    plans = MembershipPlan.objects.filter(is_active=True).order_by('sort_order', 'monthly_price')
+    plans_version, plans, _ = active_plans.snapshot()
     
     # Create feature comparison matrix
     features = [
@@ -308,31 +305,66 @@ def membership_compare(request):
         {'name': 'Personal Training', 'key': 'personal_training_sessions'},
         {'name': 'Guest Passes', 'key': 'guest_passes'},
     ]
+    # One row per feature, one value per plan (templates cannot look up by key)
+    for feature in features:
+        feature['values'] = [getattr(plan, feature['key']) for plan in plans]
     
     context = {
         'plans': plans,
+        'plans_version': plans_version,  # keys the cached feature matrix
         'features': features,
     }
     return render(request, 'memberships/compare.html', context)
 
-# Helper Functions
+@login_required
+def membership_checkout_status(request, attempt_id):
+    """
+    Payment in progress - loading screen while the gateway works.
+    Once the background charge finishes, sends the player on to the result.
+    """
+    attempt = get_object_or_404(
+        PaymentAttempt.objects.select_related('plan'),
+        id=attempt_id,
+        user=request.user
+    )
+    is_upgrade = attempt.purchase_data.get('upgrade', False)
+    
+    if attempt.status == 'succeeded':
+        if is_upgrade:
+            messages.success(request, f'Successfully upgraded to {attempt.plan.name}!')
+            return redirect('memberships:membership_manage')
+        
+        # Purchase done - drop the cookie
+        messages.success(request, f'Welcome to {attempt.plan.name}! Your membership is now active.')
+        response = redirect('memberships:membership_success')
+        clear_purchase(response)
+        return response
+    
+    if attempt.status == 'failed':
+        if is_upgrade:
+            messages.error(request, 'Upgrade payment failed. Please try again.')
+            return redirect('memberships:membership_manage')
+        messages.error(request, 'Payment processing failed. Please try again.')
+        return redirect('memberships:membership_checkout')
+    
+    context = {
+        'attempt': attempt,
+        'plan': attempt.plan,
+    }
+    return render(request, 'memberships/processing.html', context)
 
-def process_mock_payment(user, plan, billing_info, purchase_data):
+@login_required
+def checkout_status_api(request, attempt_id):
     """
-    Mock payment processing - simulates successful payment
-    In production, integrate with Stripe, PayFast, or other payment provider
+    AJAX endpoint polled by the processing page
     """
-    # Simulate payment processing delay
-    import time
-    time.sleep(1)
-    
-    # Mock validation
-    if billing_info.get('card_number', '').startswith('4111'):
-        return True  # Success
-    elif billing_info.get('card_number', '').startswith('4000'):
-        return False  # Decline
-    else:
-        return True  # Default success for demo
+    attempt = get_object_or_404(PaymentAttempt, id=attempt_id, user=request.user)
+    return JsonResponse({
+        'status': attempt.status,
+        'finished': attempt.is_finished,
+    })
+
+# Helper Functions
 
 def create_membership(user, plan, purchase_data):
     """
@@ -381,13 +413,14 @@ def generate_mock_billing_history(membership):
     return transactions[:6]  # Last 6 transactions
 
 @login_required
-def check_membership_status(request):
+async def check_membership_status(request):
     """
     AJAX endpoint for checking membership status
-    Used for dashboard updates
+    Used for dashboard updates - async so polling does not tie up workers
     """
+    user = await request.auser()
     try:
-        membership = Membership.objects.get(user=request.user)
+        membership = await Membership.objects.select_related('plan').aget(user=user)
         data = {
             'has_membership': True,
             'is_active': membership.is_active,
@@ -0,0 +1,9 @@
+"""
+Admin URLs, kept out of the root URLconf so the admin.py modules are only
+imported once somebody uses the admin.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -14,6 +14,8 @@ from pathlib import Path
 import os
 from decouple import config
 
+from core.database import database_from_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,7 +39,9 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 # Application definition
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are discovered when the admin is first used, not at
+    # start-up (see timmy_gym_demo/admin_urls.py)
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -62,6 +66,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'memberships.middleware.MembershipMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,14 +95,97 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'timmy_gym_demo.wsgi.application'
 
-# Database
+# Database - DATABASE_URL picks the backend (see core/database.py);
+# without one the app runs on the local SQLite file
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_from_url(
+        config('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+        # Keep connections open between requests, checking them first
+        conn_max_age=config('CONN_MAX_AGE', default=60, cast=int),
+        health_checks=True,
+        # Django's psycopg pool instead of persistent connections (PostgreSQL only)
+        pool={
+            'min_size': config('DATABASE_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DATABASE_POOL_TIMEOUT', default=10, cast=int),
+        } if config('DATABASE_POOL', default=False, cast=bool) else None,
+    )
+}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {
+        # A file rather than shared-cache memory, so threaded tests get real
+        # SQLite locking (busy timeout) instead of "table is locked" errors
+        'NAME': BASE_DIR / 'test_db.sqlite3',
     }
+
+# SQLite connection PRAGMAs (WAL, busy timeout in ms, synchronous=NORMAL)
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)
+
+# Cache - local memory by default; point CACHE_BACKEND at the file or
+# database backend to share entries between worker processes
+# (the database backend needs `python manage.py createcachetable`)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='timmy-gym'),
+    },
+    # Kept apart so cached pages can't crowd sessions out
+    'sessions': {
+        'BACKEND': config('SESSION_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('SESSION_CACHE_LOCATION', default='timmy-gym-sessions'),
+        'OPTIONS': {'MAX_ENTRIES': config('SESSION_CACHE_MAX_ENTRIES', default=10000, cast=int)},
+    },
 }
 
+# Caches that live inside one process - each gunicorn worker gets its own
+PROCESS_LOCAL_CACHES = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+# Sessions - plain database sessions unless SESSION_CACHE_BACKEND is shared
+# between worker processes (file, database, redis, memcached). Then
+# cached_db answers reads from the 'sessions' cache and only touches
+# django_session when a session changes. A per-process session cache would
+# let a logged-out session live on in the other workers, so the system
+# checks refuse that combination (core/checks.py). Set SESSION_ENGINE to
+# django.contrib.sessions.backends.signed_cookies to drop the table entirely.
+# Prune expired rows daily with `python manage.py prune_sessions`.
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default=(
+        'django.contrib.sessions.backends.db' if CACHES['sessions']['BACKEND'] in PROCESS_LOCAL_CACHES
+        else 'django.contrib.sessions.backends.cached_db'
+    ),
+)
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Seconds a purchase may sit between the plan page and checkout (kept in
+# a signed cookie, see memberships/purchase.py)
+PURCHASE_COOKIE_MAX_AGE = config('PURCHASE_COOKIE_MAX_AGE', default=3600, cast=int)
+
+# Seconds a worker trusts the catalog versions it last read (core/catalog.py)
+# before checking the database again - how long a plan, service or trainer
+# change can take to reach the other worker processes
+CATALOG_VERSION_TIMEOUT = config('CATALOG_VERSION_TIMEOUT', default=5, cast=int)
+
+# Seconds an available-times answer may be served from the cache. Bookings
+# invalidate it sooner (see bookings/caching.py), but only in the cache they
+# write to: with a per-process cache the other workers keep offering the old
+# times until their entry runs out, so the default is short unless the cache
+# is shared. reserve() still refuses a full slot either way.
+AVAILABILITY_CACHE_TIMEOUT = config(
+    'AVAILABILITY_CACHE_TIMEOUT',
+    default=30 if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES else 300,
+    cast=int,
+)
+
+# Seconds an anonymous visitor's copy of a public page is kept; plan and
+# service changes retire cached pages in every worker within
+# CATALOG_VERSION_TIMEOUT, since pages are keyed on the catalog versions
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -127,14 +215,33 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# Conditional whitenoise configuration
-if not DEBUG:
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Bundles come from `python manage.py build_assets` (see core/assets.py);
+# outside DEBUG collectstatic hashes and precompresses them (core/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'core.storage.StaticBundleStorage'
+        ),
+    },
+}
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads over FILE_UPLOAD_MAX_SIZE are cut off as they stream in (core/uploads.py);
+# anything over FILE_UPLOAD_MAX_MEMORY_SIZE (2.5 MB) spools to a temporary file
+FILE_UPLOAD_MAX_SIZE = config('FILE_UPLOAD_MAX_SIZE', default=5 * 1024 * 1024, cast=int)
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 # Bootstrap 5 Configuration
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -147,6 +254,14 @@ LOGOUT_REDIRECT_URL = '/'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Payments - checkout charges run as background jobs (see core/tasks.py)
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='memberships.payments.MockPaymentGateway')
+MOCK_PAYMENT_LATENCY = config('MOCK_PAYMENT_LATENCY', default=1.0, cast=float)
+# Seconds before expire_payment_attempts fails an attempt whose job never finished
+PAYMENT_ATTEMPT_TIMEOUT = config('PAYMENT_ATTEMPT_TIMEOUT', default=600, cast=int)
+BACKGROUND_WORKERS = config('BACKGROUND_WORKERS', default=4, cast=int)
+BACKGROUND_TASKS_EAGER = config('BACKGROUND_TASKS_EAGER', default=False, cast=bool)
+
 # Additional debugging for template issues
 if DEBUG:
     LOGGING = {
@@ -15,13 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
 from django.urls import path, include
+from django.urls.resolvers import RoutePattern, URLResolver
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Imported on the first admin request (or admin: reverse), unlike include()
+    URLResolver(RoutePattern('admin/'), 'timmy_gym_demo.admin_urls', app_name='admin', namespace='admin'),
     path('', include('core.urls')),
     path('accounts/', include('accounts.urls')), 
     path('bookings/', include('bookings.urls')),  # Booking system